@@ -1,29 +1,38 @@
 """Command-line interface for KAVM"""
 
+import io
 import json
 import logging
 import os
 import subprocess
 import sys
+import time
 from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from queue import Queue
 from subprocess import CalledProcessError
-from typing import Any, Callable, Dict, Final, Iterable, List, Optional, TypeVar
+from typing import Any, Callable, Dict, Final, Iterable, List, Optional, Tuple, TypeVar
 
 from pyk.cli.utils import dir_path, file_path
 from pyk.kast.inner import KApply
 from pyk.kast.manip import minimize_term
-from pyk.kcfg.explore import KCFGExplore
+from pyk.kast.outer import KClaim
 from pyk.kcfg.kcfg import KCFG
 from pyk.kcfg.show import KCFGShow
 from pyk.kcfg.tui import KCFGViewer
-from pyk.kore import syntax as kore
 from pyk.ktool.kprove import KoreExecLogFormat
-from pyk.proof.reachability import APRProof, APRProver
+from pyk.proof.reachability import APRProof
 from pyk.utils import BugReport
 
+from kavm import instrumentation
+from kavm.algod import iter_state_dumps
+from kavm.bench import BenchCorpus, bench, compare_to_baseline, format_report, read_report, write_report
 from kavm.kavm import KAVM
 from kavm.kompile import kompile
+from kavm.kore_parser import read_state_dumps
+from kavm.parallel_prover import ParallelAPRProver, parallel_kcfg_explores
+from kavm.proof_cache import ProofCache, spec_digest
 from kavm.scenario import KAVMScenario
 
 T = TypeVar('T')
@@ -76,9 +85,38 @@ def exec_prove(
     haskell_log_format: str = KoreExecLogFormat.ONELINE.value,
     haskell_log_debug_transition: bool = True,
     haskell_log_entries: Iterable[str] = (),
+    proof_cache: bool = False,
+    use_directory: Optional[Path] = None,
     **kwargs: Any,
 ) -> None:
-    kavm = KAVM(definition_dir=definition_dir)
+    cache: Optional[ProofCache] = None
+    if proof_cache:
+        use_directory = use_directory if use_directory else Path('.kavm')
+        use_directory.mkdir(parents=True, exist_ok=True)
+        cache = ProofCache(use_directory / 'proof-cache')
+    kavm = KAVM(definition_dir=definition_dir, use_directory=use_directory)
+
+    # skip the claims that have already been proved against this definition and spec with the same options
+    pending_claims: Dict[str, str] = {}
+    if cache is not None:
+        cache_options = {'depth': depth, 'smt_timeout': smt_timeout}
+        cache_spec = spec_digest(spec_file)
+        spec_claims = kavm.get_claims(
+            spec_file,
+            claim_labels=list(claims) if claims else None,
+            exclude_claim_labels=list(exclude_claims) if exclude_claims else None,
+        )
+        for claim in spec_claims:
+            cache_key = cache.key(claim, definition_dir, cache_options, spec=cache_spec)
+            if cache.is_proved(cache_key):
+                _LOGGER.info(f'Skipping claim {claim.label}: already proved')
+                exclude_claims = [*exclude_claims, claim.label]
+            else:
+                pending_claims[claim.label] = cache_key
+        if not pending_claims:
+            _LOGGER.info('All claims have already been proved')
+            return
+
     prove_args = []
     haskell_args = []
     for de in debug_equations:
@@ -108,6 +146,9 @@ def exec_prove(
         if not (type(final_state) is KApply and final_state.label.name == '#Top'):
             _LOGGER.error(f'Proof failed! See log file: {spec_file.resolve().name}.debug-log')
             sys.exit(1)
+        if cache is not None:
+            for claim_label, cache_key in pending_claims.items():
+                cache.record_proved(cache_key, claim_label)
     except RuntimeError as e:
         error_msg = f'Proof failed! See log file: {spec_file.resolve().name}.debug-log'
         _LOGGER.error(error_msg)
@@ -173,32 +214,6 @@ def exec_kast(
         exit(err.returncode)
 
 
-def top_down_kore(f: Callable[[kore.Pattern], kore.Pattern], pattern: kore.Pattern) -> kore.Pattern:
-    return f(pattern).map_pattern(lambda _kpattern: top_down_kore(f, _kpattern))  # type: ignore
-
-
-def get_state_dumps_kore(input: kore.Pattern) -> Optional[kore.Pattern]:
-    state_dumps_cell_symbol = "Lbl'-LT-'state-dumps'-GT-'"
-
-    result = None
-
-    def get_it(input: kore.Pattern) -> kore.Pattern:
-        nonlocal result
-        if isinstance(input, kore.App) and input.symbol == state_dumps_cell_symbol:
-            result = input
-        return input
-
-    top_down_kore(get_it, input)
-    if isinstance(result, kore.App):
-        return result.patterns[0].app.patterns[0].patterns[0]  # type: ignore
-    else:
-        return None
-
-
-def kore_json_to_dict(input: kore.Pattern) -> Dict[str, Any]:
-    return {}
-
-
 def exec_run(
     definition_dir: Path,
     input_file: Path,
@@ -208,6 +223,9 @@ def exec_run(
     avm_json_parser: Path,
     output: str,
     depth: Optional[int],
+    checkpoint_dir: Optional[Path] = None,
+    checkpoint_after: Optional[List[int]] = None,
+    resume_from: Optional[Path] = None,
     **kwargs: Any,
 ) -> None:
     kavm = KAVM(definition_dir=definition_dir)
@@ -219,9 +237,20 @@ def exec_run(
     try:
         if input_file.suffix == '.json':
             scenario = KAVMScenario.from_json(input_file.read_text(), teal_sources_dir)
-            final_state, kavm_stderr = kavm.run_avm_json(
-                scenario=scenario, depth=depth, rerun_on_error=True, check=False
-            )
+            # the state dumps are read directly from the KORE text, there is no need to parse the whole configuration
+            run_output = 'text' if output == 'final-state-json' else 'kore'
+            if checkpoint_dir or resume_from:
+                final_state, kavm_stderr = kavm.run_with_checkpoints(
+                    scenario=scenario,
+                    checkpoint_dir=checkpoint_dir if checkpoint_dir else resume_from.parent,  # type: ignore
+                    checkpoint_after=checkpoint_after,
+                    depth=depth,
+                    resume_from=resume_from,
+                )
+            else:
+                final_state, kavm_stderr = kavm.run_avm_json(
+                    scenario=scenario, depth=depth, rerun_on_error=True, output=run_output
+                )
             if output == 'kore':
                 print(final_state)
                 exit(0)
@@ -230,15 +259,12 @@ def exec_run(
                 print(kavm.pretty_print(final_state_kast))
             if output == 'final-state-json':
                 _LOGGER.info('Extracting <state_dumps> cell from KORE output')
-                state_dumps_kore = get_state_dumps_kore(final_state)
-                assert state_dumps_kore
-                _LOGGER.info('Converting KORE => Kast')
-                state_dumps = kavm.kore_to_kast(state_dumps_kore)
-                _LOGGER.info('Pretty-printing <state_dumps> JSON')
-                state_dump_str = kavm.pretty_print(state_dumps).replace(', .JSONs', '').replace('.JSONs', '')
-                print(json.dumps(json.loads(state_dump_str), indent=4))
+                final_state_text = final_state if isinstance(final_state, str) else final_state.text
+                state_dumps = read_state_dumps(final_state_text)
+                assert state_dumps
+                print(json.dumps(state_dumps[-1], indent=4))
             if output == 'stderr-json':
-                print(json.dumps(json.loads(kavm_stderr), indent=4))
+                print(json.dumps(last_state_dump(kavm_stderr), indent=4))
             exit(0)
         else:
             print(f'Unrecognized input file extension: {input_file.suffix}')
@@ -250,6 +276,139 @@ def exec_run(
         _LOGGER.critical(stderr)
 
 
+def exec_run_batch(
+    definition_dir: Path,
+    inputs: List[Path],
+    teal_sources_dir: Optional[Path],
+    exclude: Optional[Path],
+    workers: Optional[int],
+    depth: Optional[int],
+    use_directory: Optional[Path] = None,
+    **kwargs: Any,
+) -> None:
+    """
+    Run many JSON scenarios in parallel and report the result of each one as a line of JSON on stdout.
+    Inputs can be scenario files, directories of *.json scenarios or manifests listing one scenario per line.
+    """
+    use_directory = use_directory if use_directory else Path('.kavm')
+    use_directory.mkdir(parents=True, exist_ok=True)
+    kavm = KAVM(definition_dir=definition_dir, use_directory=use_directory)
+
+    excluded = set(read_manifest(exclude)) if exclude else set()
+    scenario_files = [
+        scenario_file for scenario_file in collect_scenario_files(inputs) if scenario_file not in excluded
+    ]
+
+    failed = 0
+    for result in kavm.run_many(scenario_files, teal_sources_dir=teal_sources_dir, depth=depth, workers=workers):
+        if result['returncode'] != 0:
+            failed += 1
+        print(json.dumps(result), flush=True)
+
+    _LOGGER.info(f'Ran {len(scenario_files)} scenarios, {failed} failed')
+    exit(1 if failed else 0)
+
+
+def read_manifest(manifest: Path) -> List[Path]:
+    """Read a list of scenario files, one per line and relative to the manifest"""
+    lines = (line.strip() for line in manifest.read_text().splitlines())
+    return [(manifest.parent / line).resolve() for line in lines if line and not line.startswith('#')]
+
+
+def collect_scenario_files(inputs: Iterable[Path]) -> List[Path]:
+    scenario_files: List[Path] = []
+    for input_path in inputs:
+        if input_path.is_dir():
+            scenario_files += sorted(path.resolve() for path in input_path.glob('*.json'))
+        elif input_path.suffix == '.json':
+            scenario_files.append(input_path.resolve())
+        else:
+            scenario_files += read_manifest(input_path)
+    return scenario_files
+
+
+def last_state_dump(kavm_stderr: str) -> Dict[str, Any]:
+    """The state dump of the last stage in the stderr of KAVM, which has a dump for every stage"""
+    state_dumps = list(iter_state_dumps(io.StringIO(kavm_stderr)))
+    if not state_dumps:
+        raise ValueError('KAVM has not dumped the final state')
+    return state_dumps[-1]
+
+
+def exec_serve(
+    definition_dir: Path,
+    teal_sources_dir: Optional[Path],
+    depth: Optional[int],
+    **kwargs: Any,
+) -> None:
+    """
+    Evaluate JSON scenarios read from stdin, one per line, and report each result
+    as a line of JSON on stdout. The definition is loaded and the interpreter is resolved
+    only once for the whole session.
+    """
+    kavm = KAVM(definition_dir=definition_dir)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response: Dict[str, Any]
+        try:
+            scenario = KAVMScenario.from_json(line, teal_sources_dir)
+            _, kavm_stderr = kavm.run_avm_json(scenario=scenario, depth=depth)
+            response = {'returncode': 0, 'final-state': last_state_dump(kavm_stderr)}
+        except RuntimeError as err:
+            response = {'returncode': 1, 'error': str(err.args[0])}
+        except ValueError as err:
+            response = {'returncode': 1, 'error': str(err)}
+        print(json.dumps(response), flush=True)
+
+
+def parse_bench_corpus(spec: str) -> BenchCorpus:
+    """Parse a NAME=SCENARIOS[,TEAL_SOURCES_DIR] corpus specification, see `collect_scenario_files`"""
+    name, sep, paths = spec.partition('=')
+    if not sep or not name or not paths:
+        raise ValueError(f'Expected NAME=SCENARIOS[,TEAL_SOURCES_DIR], got: {spec}')
+    scenarios, _, teal_sources = paths.partition(',')
+    scenarios_path = Path(scenarios)
+    if teal_sources:
+        teal_sources_dir = Path(teal_sources)
+    else:
+        teal_sources_dir = scenarios_path if scenarios_path.is_dir() else scenarios_path.parent
+    return BenchCorpus(name, collect_scenario_files([scenarios_path]), teal_sources_dir)
+
+
+def exec_bench(
+    definition_dir: Path,
+    corpora: List[BenchCorpus],
+    repeat: int,
+    depth: Optional[int],
+    warm_teal_cache: bool,
+    output: Optional[Path],
+    baseline: Optional[Path],
+    save_baseline: Optional[Path],
+    threshold: float,
+    min_delta: float,
+    **kwargs: Any,
+) -> None:
+    """
+    Benchmark the simulation pipeline on corpora of JSON scenarios and print the per-phase totals.
+    Exit with 1 if a phase of a corpus has regressed compared to the baseline.
+    """
+    kavm = KAVM(definition_dir=definition_dir)
+    report = bench(kavm, corpora, repeat=repeat, depth=depth, warm_teal_cache=warm_teal_cache)
+    print(format_report(report))
+    if output:
+        write_report(report, output)
+    if save_baseline:
+        write_report(report, save_baseline)
+        _LOGGER.info(f'Saved the baseline {save_baseline}')
+    if baseline:
+        regressions = compare_to_baseline(report, read_report(baseline), threshold=threshold, min_delta=min_delta)
+        for regression in regressions:
+            _LOGGER.error(f'Regression: {regression}')
+        exit(1 if regressions else 0)
+
+
 def exec_env(
     **kwargs: Any,
 ) -> None:
@@ -302,37 +461,136 @@ def exec_kcfg_show(
     print('\n'.join(proof.summary))
 
 
+def collect_spec_files(inputs: Iterable[Path]) -> List[Path]:
+    spec_files: List[Path] = []
+    for input_path in inputs:
+        if input_path.is_dir():
+            spec_files += sorted([*input_path.rglob('*-spec.k'), *input_path.rglob('*-spec.md')])
+        else:
+            spec_files.append(input_path)
+    return spec_files
+
+
+def spec_modules(spec_files: List[Path], spec_module: Optional[str] = None) -> List[Tuple[Path, str]]:
+    """
+    Pair every spec file with the name of its spec module: `spec_module` if given, which requires a single spec file,
+    and otherwise the upper-cased name of the file, e.g. SUM-SPEC for sum-spec.k
+    """
+    if spec_module and len(spec_files) != 1:
+        raise ValueError(f'--spec-module {spec_module} needs a single spec file, got {len(spec_files)}')
+    return [
+        (spec_file, spec_module if spec_module else spec_file.name.removesuffix('.k').removesuffix('.md').upper())
+        for spec_file in spec_files
+    ]
+
+
+def kcfg_prove_claim(
+    kavm: KAVM,
+    claim: KClaim,
+    claim_label: str,
+    ports: 'Queue[int]',
+    workers: int = 1,
+    timeout: Optional[float] = None,
+    bug_report: Optional[BugReport] = None,
+) -> Dict[str, Any]:
+    """
+    Prove a claim with the RPC-based prover, saving the APRProof in the use directory.
+    Stop advancing the proof once `timeout` seconds have passed, a soft limit that lets the nodes being advanced
+    at that moment complete, and report the outcome as a dictionary.
+    """
+    start = time.perf_counter()
+    terminal_rules = ['AVM-EXECUTION.starttx', 'AVM-EXECUTION.endtx', 'AVM-PANIC.panic']
+
+    cfg, init_node, target_node = KCFG.from_claim(kavm.definition, claim)
+    proof = APRProof(
+        id=claim_label, kcfg=cfg, init=init_node, target=target_node, proof_dir=kavm.use_directory, logs={}
+    )
+
+    port = ports.get()
+    try:
+        with parallel_kcfg_explores(kavm, workers, port, bug_report) as kcfg_explores:
+            prover = ParallelAPRProver(proof, kcfg_explores)
+            prover.advance_proof(terminal_rules=terminal_rules, timeout=timeout)
+    finally:
+        ports.put(port)
+    # the prover only stops with pending nodes once the timeout has passed
+    timed_out = bool(proof.pending)
+
+    return {
+        'claim': claim_label,
+        'status': 'timeout' if timed_out else proof.status.value,
+        'nodes': len(proof.kcfg.nodes),
+        'pending': len(proof.pending),
+        'time': time.perf_counter() - start,
+    }
+
+
 def exec_kcfg_prove(
     definition_dir: Path,
-    spec_file: Path,
-    claim_id: str,
+    spec_files: List[Path],
+    claim_ids: List[str],
     kore_rpc_port: int,
     bug_report: bool = False,
     spec_module: Optional[str] = None,
     use_directory: Optional[Path] = None,
+    workers: int = 1,
+    jobs: int = 1,
+    all_claims: bool = False,
+    timeout: Optional[float] = None,
     **kwargs: Any,
 ) -> None:
+    """
+    Prove claims from spec files, or directories of *-spec.k and *-spec.md files, with the RPC-based prover.
+    Up to `jobs` claims are proved at the same time, each with `workers` kore-rpc servers of its own.
+    Report the outcome of every claim as JSON on stdout, and exit with 1 if any of them was not proved.
+    """
+    if not claim_ids and not all_claims:
+        raise ValueError('Specify the claims to prove or pass --all')
+    spec_file_modules = spec_modules(collect_spec_files(spec_files), spec_module)
+
     default_kavm_dir = Path('.kavm')
     default_kavm_dir.mkdir(parents=True, exist_ok=True)
     use_directory = use_directory if use_directory else default_kavm_dir
     bug_report_path = BugReport(use_directory / 'kavm-bug') if bug_report else None
     kavm = KAVM(definition_dir=definition_dir, use_directory=use_directory, bug_report=bug_report_path)
 
-    spec_module = spec_module if spec_module else spec_file.name.removesuffix('.k').removesuffix('.md').upper()
-    claim_label = f'{spec_module}.{claim_id}'
-    claims = kavm.get_claims(spec_file, spec_module_name=spec_module, claim_labels=[claim_label])
-
-    cfg, init_node, target_node = KCFG.from_claim(kavm.definition, claims[0])
-
-    proof = APRProof(
-        id=claim_label, kcfg=cfg, init=init_node, target=target_node, proof_dir=kavm.use_directory, logs={}
-    )
-
-    with KCFGExplore(kavm, port=kore_rpc_port, bug_report=bug_report_path) as kcfg_explore:
-        prover = APRProver(proof, kcfg_explore=kcfg_explore)
-        prover.advance_proof(
-            terminal_rules=['AVM-EXECUTION.starttx', 'AVM-EXECUTION.endtx', 'AVM-PANIC.panic'],
-        )
+    claims: List[Tuple[str, KClaim]] = []
+    for spec_file, module_name in spec_file_modules:
+        # parse every spec file only once, whatever the number of claims to prove from it
+        wanted_labels = {f'{module_name}.{claim_id}' for claim_id in claim_ids}
+        for claim in kavm.get_claims(spec_file, spec_module_name=module_name):
+            claim_label = claim.label if claim.label.startswith(f'{module_name}.') else f'{module_name}.{claim.label}'
+            if all_claims or claim_label in wanted_labels:
+                claims.append((claim_label, claim))
+    if not claims:
+        raise ValueError(f'No claims to prove in {[str(spec_file) for spec_file, _ in spec_file_modules]}')
+
+    # every job owns the kore-rpc ports PORT+N*WORKERS to PORT+(N+1)*WORKERS-1 while proving a claim
+    jobs = min(jobs, len(claims))
+    ports: 'Queue[int]' = Queue()
+    for job in range(jobs):
+        ports.put(kore_rpc_port + job * workers)
+
+    results: List[Dict[str, Any]] = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(
+                kcfg_prove_claim, kavm, claim, claim_label, ports, workers, timeout, bug_report_path
+            ): claim_label
+            for claim_label, claim in claims
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as err:
+                _LOGGER.error(f'Failed to prove {futures[future]}: {err}')
+                result = {'claim': futures[future], 'status': 'error', 'error': f'{type(err).__name__}: {err}'}
+            _LOGGER.info(f'{result["claim"]}: {result["status"]}')
+            results.append(result)
+
+    print(json.dumps(sorted(results, key=lambda result: result['claim']), indent=4))
+    if any(result['status'] != 'passed' for result in results):
+        exit(1)
 
 
 def main() -> None:
@@ -340,6 +598,8 @@ def main() -> None:
     parser = create_argument_parser()
     args = parser.parse_args()
     logging.basicConfig(level=_loglevel(args), format=_LOG_FORMAT)
+    if args.trace:
+        instrumentation.enable(args.trace)
 
     if (not 'definition_dir' in vars(args)) or (not args.definition_dir):
         env_definition_dir = os.environ.get('KAVM_DEFINITION_DIR')
@@ -370,6 +630,12 @@ def create_argument_parser() -> ArgumentParser:
     shared_args = ArgumentParser(add_help=False)
     shared_args.add_argument('--verbose', '-v', default=False, action='store_true', help='Verbose output.')
     shared_args.add_argument('--debug', default=False, action='store_true', help='Debug output.')
+    shared_args.add_argument(
+        '--trace',
+        dest='trace',
+        type=Path,
+        help='Record the time spent in the phases of KAVM and write it to FILE as a Chrome trace on exit',
+    )
 
     command_parser = parser.add_subparsers(dest='command', required=True, help='Command to execute')
 
@@ -452,6 +718,19 @@ def create_argument_parser() -> ArgumentParser:
         type=list_of(str, delim=','),
         default=[],
     )
+    prove_subparser.add_argument(
+        '--proof-cache',
+        dest='proof_cache',
+        default=False,
+        action='store_true',
+        help='Skip the claims already proved against the same definition and record the newly proved ones',
+    )
+    prove_subparser.add_argument(
+        '--use-directory',
+        dest='use_directory',
+        type=Path,
+        help='Directory of the prover, and of the proof cache that defaults to .kavm with --proof-cache',
+    )
 
     # kore-repl
     kore_repl_subparser = command_parser.add_parser(
@@ -536,6 +815,168 @@ def create_argument_parser() -> ArgumentParser:
         type=int,
         help='Execute at most N rewrite steps',
     )
+    run_subparser.add_argument(
+        '--checkpoint-dir',
+        dest='checkpoint_dir',
+        type=Path,
+        help='Save the configuration after submit-transactions stages to DIR/stage-N.kore',
+    )
+    run_subparser.add_argument(
+        '--checkpoint-after',
+        dest='checkpoint_after',
+        type=int,
+        nargs='+',
+        help='Numbers of the submit-transactions stages, counting from 1, to save checkpoints after. Default: all',
+    )
+    run_subparser.add_argument(
+        '--resume-from',
+        dest='resume_from',
+        type=file_path,
+        help='Skip the stages up to a stage-N.kore checkpoint of the same scenario and continue from it',
+    )
+
+    # run-batch
+    run_batch_subparser = command_parser.add_parser(
+        'run-batch', help='Run many KAVM simulations in parallel', parents=[shared_args]
+    )
+    run_batch_subparser.add_argument(
+        '--definition-dir',
+        dest='definition_dir',
+        type=dir_path,
+        help='Path to definition to use',
+    )
+    run_batch_subparser.add_argument(
+        'inputs',
+        type=Path,
+        nargs='+',
+        help='Scenario files, directories of scenario files or manifests listing one scenario file per line',
+    )
+    run_batch_subparser.add_argument(
+        '--teal-sources-dir',
+        dest='teal_sources_dir',
+        type=dir_path,
+        help='Path to directory containing .teal files used by the scenarios',
+    )
+    run_batch_subparser.add_argument(
+        '--exclude',
+        dest='exclude',
+        type=file_path,
+        help='Manifest of scenario files to skip',
+    )
+    run_batch_subparser.add_argument(
+        '--workers',
+        dest='workers',
+        type=int,
+        help='Number of worker processes, defaults to the number of CPUs',
+    )
+    run_batch_subparser.add_argument(
+        '--depth',
+        dest='depth',
+        type=int,
+        help='Execute at most N rewrite steps per scenario',
+    )
+    run_batch_subparser.add_argument(
+        '--use-directory',
+        dest='use_directory',
+        type=Path,
+        help='Directory to keep the cache of parsed TEAL programs in, defaults to .kavm',
+    )
+
+    # serve
+    serve_subparser = command_parser.add_parser(
+        'serve', help='Evaluate JSON scenarios read from stdin, one per line', parents=[shared_args]
+    )
+    serve_subparser.add_argument(
+        '--definition-dir',
+        dest='definition_dir',
+        type=dir_path,
+        help='Path to definition to use',
+    )
+    serve_subparser.add_argument(
+        '--teal-sources-dir',
+        dest='teal_sources_dir',
+        type=dir_path,
+        help='Path to directory containing .teal files used by the scenarios',
+    )
+    serve_subparser.add_argument(
+        '--depth',
+        dest='depth',
+        type=int,
+        help='Execute at most N rewrite steps per scenario',
+    )
+
+    # bench
+    bench_subparser = command_parser.add_parser(
+        'bench', help='Benchmark the phases of KAVM simulations', parents=[shared_args]
+    )
+    bench_subparser.add_argument(
+        '--definition-dir',
+        dest='definition_dir',
+        type=dir_path,
+        help='Path to definition to use',
+    )
+    bench_subparser.add_argument(
+        'corpora',
+        type=parse_bench_corpus,
+        nargs='+',
+        metavar='NAME=SCENARIOS[,TEAL_SOURCES_DIR]',
+        help=(
+            'Corpus of scenario files, given as a scenario file, a directory of scenario files or a manifest; '
+            'TEAL programs are looked up next to the scenarios by default'
+        ),
+    )
+    bench_subparser.add_argument(
+        '--repeat',
+        dest='repeat',
+        type=int,
+        default=3,
+        help='Run every scenario N times and report the median, 3 by default',
+    )
+    bench_subparser.add_argument(
+        '--depth',
+        dest='depth',
+        type=int,
+        help='Execute at most N rewrite steps per scenario',
+    )
+    bench_subparser.add_argument(
+        '--warm-teal-cache',
+        dest='warm_teal_cache',
+        default=False,
+        action='store_true',
+        help='Parse TEAL programs through the cache of parsed programs instead of parsing them every time',
+    )
+    bench_subparser.add_argument(
+        '--output',
+        dest='output',
+        type=Path,
+        help='Write the full report, with the timings of every scenario, to a JSON file',
+    )
+    bench_subparser.add_argument(
+        '--baseline',
+        dest='baseline',
+        type=file_path,
+        help='Compare to the report of an earlier run and fail on regressions',
+    )
+    bench_subparser.add_argument(
+        '--save-baseline',
+        dest='save_baseline',
+        type=Path,
+        help='Save the report as a baseline for later runs',
+    )
+    bench_subparser.add_argument(
+        '--threshold',
+        dest='threshold',
+        type=float,
+        default=0.2,
+        help='Relative slowdown of a phase that counts as a regression, 0.2 by default',
+    )
+    bench_subparser.add_argument(
+        '--min-delta',
+        dest='min_delta',
+        type=float,
+        default=0.05,
+        help='Ignore slowdowns of fewer than N seconds, 0.05 by default',
+    )
 
     # kcfg-view
     kcfg_view_subparser = command_parser.add_parser('kcfg-view', help='Explore KCFG', parents=[shared_args])
@@ -571,9 +1012,46 @@ def create_argument_parser() -> ArgumentParser:
     )
     kcfg_prove_subparser.add_argument('--definition-dir', dest='definition_dir', type=dir_path)
     kcfg_prove_subparser.add_argument('--bug-report', dest='bug_report', default=False, action='store_true')
-    kcfg_prove_subparser.add_argument('spec_file', type=file_path, help='Path to the K spec file')
-    kcfg_prove_subparser.add_argument('claim_id', type=str, help='Claim from "spec_file" to prove')
+    kcfg_prove_subparser.add_argument(
+        'spec_files',
+        type=Path,
+        nargs='+',
+        help='Paths to K spec files or to directories to search for *-spec.k and *-spec.md files in',
+    )
+    kcfg_prove_subparser.add_argument(
+        '--claim', dest='claim_ids', action='append', default=[], help='Claim to prove, can be given several times'
+    )
+    kcfg_prove_subparser.add_argument(
+        '--all', dest='all_claims', default=False, action='store_true', help='Prove all claims of the spec files'
+    )
     kcfg_prove_subparser.add_argument('--port', dest='kore_rpc_port', required=True, type=int, help='Port for kore-rpc')
+    kcfg_prove_subparser.add_argument(
+        '--workers',
+        dest='workers',
+        type=int,
+        default=1,
+        help='Expand up to N frontier nodes of a claim at once, running N kore-rpc servers per claim',
+    )
+    kcfg_prove_subparser.add_argument(
+        '--jobs',
+        dest='jobs',
+        type=int,
+        default=1,
+        help='Prove up to N claims at once, using the kore-rpc ports from PORT to PORT+N*WORKERS-1',
+    )
+    kcfg_prove_subparser.add_argument(
+        '--timeout',
+        dest='timeout',
+        type=float,
+        help='Stop advancing the proof of a claim after N seconds and report it as timed out, '
+        'the nodes being advanced at that moment are completed first',
+    )
+    kcfg_prove_subparser.add_argument(
+        '--use-directory',
+        dest='use_directory',
+        type=Path,
+        help='Directory to save the proofs in, defaults to .kavm',
+    )
 
     return parser
 
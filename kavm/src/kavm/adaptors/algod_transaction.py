@@ -1,5 +1,5 @@
 from base64 import b64decode, b64encode
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
 
 from algosdk.constants import APPCALL_TXN, ASSETTRANSFER_TXN, PAYMENT_TXN
 from algosdk.encoding import decode_address, encode_address
@@ -20,7 +20,15 @@ from pyk.prelude.kint import intToken
 from pyk.prelude.string import stringToken
 
 from kavm.constants import ZERO_ADDRESS
-from kavm.pyk_utils import algorand_address_to_k_bytes, maybe_tvalue, token_or_expr, tvalue_bytes_list, tvalue_list
+from kavm.kast.templates import empty_config
+from kavm.pyk_utils import (
+    algorand_address_to_k_bytes,
+    box_references_list,
+    maybe_tvalue,
+    token_or_expr,
+    tvalue_bytes_list,
+    tvalue_list,
+)
 
 
 class KAVMApplyData:
@@ -229,9 +237,9 @@ def transaction_k_term(kavm: Any, txn: Transaction, txid: str, symbolic_fields_s
             "<transaction>",
             [
                 KApply("<txID>", stringToken(txid)),
-                kavm.definition.empty_config(KSort('TxHeaderCell')),
+                empty_config(kavm, KSort('TxHeaderCell')),
                 KApply("<txnTypeSpecificFields>", type_specific_fields),
-                kavm.definition.empty_config(KSort('ApplyDataCell')),
+                empty_config(kavm, KSort('ApplyDataCell')),
                 KApply("<txnExecutionContext>", KVariable('TXNEXECUTIONCONTEXT_CELL')),
                 KApply("<resume>", KVariable('RESUME_CELL')),
             ],
@@ -281,7 +289,7 @@ def transaction_k_term(kavm: Any, txn: Transaction, txid: str, symbolic_fields_s
             }
         )
         type_specific_fields_cell = [
-            kavm.definition.empty_config(KSort('PayTxFieldsCell')),
+            empty_config(kavm, KSort('PayTxFieldsCell')),
             KApply('.AppCallTxFieldsCell'),
             KApply('.KeyRegTxFieldsCell'),
             KApply('.AssetConfigTxFieldsCell'),
@@ -304,7 +312,7 @@ def transaction_k_term(kavm: Any, txn: Transaction, txid: str, symbolic_fields_s
             KApply('.AppCallTxFieldsCell'),
             KApply('.KeyRegTxFieldsCell'),
             KApply('.AssetConfigTxFieldsCell'),
-            kavm.definition.empty_config(KSort('AssetTransferTxFieldsCell')),
+            empty_config(kavm, KSort('AssetTransferTxFieldsCell')),
             KApply('.AssetFreezeTxFieldsCell'),
         ]
     if txn.type == APPCALL_TXN:
@@ -351,12 +359,12 @@ def transaction_k_term(kavm: Any, txn: Transaction, txid: str, symbolic_fields_s
                 'EXTRAPROGRAMPAGES_CELL': maybe_tvalue(txn.extra_pages)
                 if txn.extra_pages is not None
                 else maybe_tvalue(0),
-                'BOXREFERENCES_CELL': KToken(".TValuePairList", "TValuePairList"),
+                'BOXREFERENCES_CELL': box_references_list(txn.boxes if txn.boxes else []),
             }
         )
         type_specific_fields_cell = [
             KApply('.PayTxFieldsCell'),
-            kavm.definition.empty_config(KSort('AppCallTxFieldsCell')),
+            empty_config(kavm, KSort('AppCallTxFieldsCell')),
             KApply('.KeyRegTxFieldsCell'),
             KApply('.AssetConfigTxFieldsCell'),
             KApply('.AssetTransferTxFieldsCell'),
@@ -377,3 +385,10 @@ def transaction_k_term(kavm: Any, txn: Transaction, txid: str, symbolic_fields_s
     transaction_cell = fields_subst.apply(empty_transaction_cell(type_specific_fields_cell))  # type: ignore
 
     return transaction_cell
+
+
+def transaction_k_terms(
+    kavm: Any, txns: Iterable[Tuple[Transaction, str]], symbolic_fields_subst: Optional[Subst] = None
+) -> List[KInner]:
+    """Convert pairs of Transaction objects and their ids to K cells, sharing the cached configuration templates"""
+    return [transaction_k_term(kavm, txn, txid, symbolic_fields_subst) for txn, txid in txns]
@@ -1,10 +1,14 @@
+import asyncio
 import json
 import logging
 import os
+import tempfile
+import threading
 from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from pprint import PrettyPrinter
-from typing import Any, Dict, Final, Iterable, List, Optional, cast
+from typing import Any, Dict, Final, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple, cast
 
 import msgpack
 from algosdk import encoding
@@ -19,14 +23,17 @@ from algosdk.atomic_transaction_composer import (
     error,
     transaction,
 )
+from algosdk.constants import appcall_txn, assetconfig_txn, assetfreeze_txn, assettransfer_txn
 from algosdk.error import AlgodHTTPError
-from algosdk.future.transaction import PaymentTxn, Transaction
+from algosdk.future.transaction import PaymentTxn, SignedTransaction, Transaction
+from algosdk.logic import get_application_address
 from algosdk.v2client import algod
 from pyk.kore.syntax import Pattern
 
 from kavm import constants
 from kavm.adaptors.algod_account import KAVMAccount
 from kavm.adaptors.algod_transaction import KAVMTransaction
+from kavm.instrumentation import span, traced
 from kavm.kavm import KAVM
 from kavm.scenario import KAVMScenario, _sort_dict
 
@@ -53,6 +60,102 @@ def msgpack_decode_txn_list(enc: bytes) -> List[Transaction]:
     return deserialized
 
 
+class _JSONStreamReader:
+    """Read JSON tokens and values from a text stream without loading it into memory as a whole"""
+
+    _WHITESPACE: Final = ' \t\n\r'
+
+    def __init__(self, stream: TextIO, chunk_size: int) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buffer = ''
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> Optional[str]:
+        """The next non-whitespace character, or None at the end of the stream"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if char is None or char not in expected:
+            raise json.JSONDecodeError(f'Expected one of {expected!r}', self._buffer, self._pos)
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # the value may continue in the next chunk, read larger chunks to not re-decode it too often
+                if not self._fill():
+                    raise
+                self._chunk_size *= 2
+                continue
+            # a number or a literal ending with the buffer may continue in the next chunk as well
+            if end == len(self._buffer) and not isinstance(value, (dict, list, str)) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def iter_state_dump_items(stream: TextIO, chunk_size: int = 1 << 16) -> Iterator[Tuple[int, str, Any]]:
+    """
+    Decode the state dumps KAVM writes after each submit-transactions stage
+    (`{"accounts": [...], "transactions": [...]}`, one after another), item by item.
+
+    Yields triples of the index of the dump, the key of the field and, for array fields, each of their
+    elements, so that callers can process accounts and transactions as they are read.
+    """
+    reader = _JSONStreamReader(stream, chunk_size)
+    dump_idx = 0
+    while reader.peek() is not None:
+        reader.take('{')
+        if reader.peek() == '}':
+            reader.take('}')
+        else:
+            while True:
+                key = reader.value()
+                reader.take(':')
+                if reader.peek() != '[':
+                    yield dump_idx, key, reader.value()
+                else:
+                    reader.take('[')
+                    if reader.peek() == ']':
+                        reader.take(']')
+                    else:
+                        while True:
+                            yield dump_idx, key, reader.value()
+                            if reader.take(',]') == ']':
+                                break
+                if reader.take(',}') == '}':
+                    break
+        dump_idx += 1
+
+
+def iter_state_dumps(stream: TextIO, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Decode the state dumps KAVM writes after each submit-transactions stage, one after another, dump by dump"""
+    reader = _JSONStreamReader(stream, chunk_size)
+    while reader.peek() is not None:
+        yield reader.value()
+
+
 class KAVMClient(algod.AlgodClient):
     """
     Mock class for algod. Forwards all requests to KAVM
@@ -60,6 +163,20 @@ class KAVMClient(algod.AlgodClient):
     Instead of establishing a connection with algod:
     * initialize KAVM,
     * pretend it is algod.
+
+    In the incremental mode, every transaction group is evaluated on top of the final configuration
+    of the previous one, and only the accounts KAVM has not seen yet are set up,
+    instead of setting up the whole network from scratch for every group.
+
+    In the block mode, enabled by `block_size`, submitted groups are queued and evaluated together in a single
+    interpreter run, one "submit-transactions" stage per group, when `block_size` groups are queued or, if given,
+    `block_timeout` seconds after the first one. Submitting a group returns the real id of its first transaction,
+    and looking up a pending transaction waits until the queued block is evaluated. If a block fails, its groups
+    are evaluated again one by one, and looking up the transactions of the failing groups raises their error.
+
+    The `/teal/dryrun` and `/transactions/simulate` endpoints evaluate transaction groups against the committed
+    state without changing it. They start from the configuration after the setup of the committed accounts,
+    which is built once and reused until an account changes, or, in the incremental mode, from the last one.
     """
 
     def __init__(
@@ -68,12 +185,18 @@ class KAVMClient(algod.AlgodClient):
         algod_token: Optional[str] = None,
         algod_address: Optional[str] = None,
         log_level: Optional[int] = None,
+        incremental: bool = False,
+        block_size: Optional[int] = None,
+        block_timeout: Optional[float] = None,
     ) -> None:
         super().__init__(algod_token, algod_address)
+        if block_size is not None and block_size < 1:
+            raise ValueError(f'Expected a positive block size, got: {block_size}')
         self.pretty_printer = PrettyPrinter(width=41, compact=True)
 
-        # self._apps = AppCellMap()
+        # the committed transactions by their KAVM and their real ids, and the last one committed
         self._committed_txns: Dict[str, Dict[str, Any]] = {}
+        self._last_committed_txn: Optional[Dict[str, Any]] = None
         self._faucet_address = faucet_address
         self._accounts: Dict[str, KAVMAccount] = {
             self._faucet_address: KAVMAccount(address=faucet_address, amount=constants.FAUCET_ALGO_SUPPLY)
@@ -81,7 +204,40 @@ class KAVMClient(algod.AlgodClient):
         self._decompiled_teal_dir_path = Path('./.decompiled-teal').resolve()
         self._decompiled_teal_dir_path.mkdir(exist_ok=True)
 
+        # the applications and assets created by the tracked accounts, and their creators
+        self._apps: Dict[int, Dict[str, Any]] = {}
         self._app_creators: Dict[int, str] = {}
+        self._assets: Dict[int, Dict[str, Any]] = {}
+        self._asset_creators: Dict[int, str] = {}
+
+        # the state dumps are written into a dedicated file, and the accounts are rebuilt only when their dumps change
+        self._state_dump_dir = tempfile.TemporaryDirectory(prefix='kavm-client-')
+        self._state_dump_path = Path(self._state_dump_dir.name) / 'state-dump.json'
+        self._account_dumps: Dict[str, Dict[str, Any]] = {}
+
+        # the final configuration of the last evaluated group and the accounts it knows about
+        self._incremental = incremental
+        self._last_state: Optional[Pattern] = None
+        self._last_state_accounts: Set[str] = set()
+
+        # incremented whenever a tracked account changes, to know when the cached setup configuration is stale
+        self._state_version = 0
+        self._setup_state: Optional[Tuple[int, Pattern, FrozenSet[str]]] = None
+
+        # the groups queued in the block mode, the real ids of their transactions and the failed ones
+        self._block_size = block_size
+        self._block_timeout = block_timeout
+        self._block_lock = threading.RLock()
+        self._block: List[List[Transaction]] = []
+        self._block_done = threading.Event()
+        self._block_timer: Optional[threading.Timer] = None
+        self._failed_txids: Dict[str, Exception] = {}
+
+        # the evaluated scenarios are saved into KAVM_SCENARIO_RECORD_DIR, if set, to be replayed by `kavm bench`
+        scenario_record_dir = os.environ.get('KAVM_SCENARIO_RECORD_DIR')
+        self._scenario_record_dir = Path(scenario_record_dir) if scenario_record_dir else None
+        self._recorded_scenarios = 0
+
         # Initialize KAVM, fetching the K definition dir from the environment
         definition_dir = os.environ.get('KAVM_DEFINITION_DIR')
         if definition_dir is not None:
@@ -113,9 +269,13 @@ class KAVMClient(algod.AlgodClient):
         """
 
         if method == 'GET':
-            return self._handle_get_requests(requrl)
+            if requrl.startswith('/transactions/pending/'):
+                self._await_block()
+            with self._block_lock:
+                return self._handle_get_requests(requrl)
         elif method == 'POST':
-            return self._handle_post_requests(requrl, data)
+            with self._block_lock:
+                return self._handle_post_requests(requrl, data)
         else:
             raise NotImplementedError(f'{method} {requrl}')
 
@@ -137,13 +297,16 @@ class KAVMClient(algod.AlgodClient):
                 }
             elif params[0] == 'pending':
                 if len(params) >= 2:
+                    if params[1] in self._failed_txids:
+                        raise self._failed_txids[params[1]]
                     try:
                         return self._committed_txns[params[1]]
                     # hack to temporarily make py-algorand-sdk happy:
                     # if the txn id is not found, return the last committed txn
                     except KeyError:
-                        (_, txn) = sorted(self._committed_txns.items())[-1]
-                        return txn
+                        if self._last_committed_txn is None:
+                            raise ValueError(f'Cannot find transaction {params[1]}') from None
+                        return self._last_committed_txn
                 else:
                     raise NotImplementedError(f'Endpoint not implemented: {requrl}')
             else:
@@ -164,16 +327,15 @@ class KAVMClient(algod.AlgodClient):
         elif endpoint == 'applications':
             app_id = int(params[0])
             try:
-                creator_address = self._app_creators[app_id]
+                return self._apps[app_id]
             except KeyError as e:
-                raise ValueError(f'Cannot find creator of app {app_id}') from e
+                raise ValueError(f'Cannot find app with id {app_id}') from e
+        elif endpoint == 'assets':
+            asset_id = int(params[0])
             try:
-                result = list(filter(lambda app: app['id'] == app_id, self._accounts[creator_address].created_apps))
-                return result[0]
-            except (KeyError, IndexError) as e:
-                raise ValueError(
-                    f'Cannot find app with id {app_id} in account {self._accounts[creator_address]}'
-                ) from e
+                return self._assets[asset_id]
+            except KeyError as e:
+                raise ValueError(f'Cannot find asset with id {asset_id}') from e
         elif endpoint == 'status':
             return {
                 'catchup-time': 0,
@@ -221,12 +383,20 @@ class KAVMClient(algod.AlgodClient):
             f'POST {requrl} {txn_msg}'
             # log decoded transaction as submitted
 
+            if self._block_size is not None:
+                return self._queue_transactions(txns)
             return self._eval_transactions(txns)
 
             # _LOGGER.debug(proc_result.stdout)
             # assert False
 
             # return self.kavm.eval_transactions(kavm_txns, known_addresses)
+        elif requrl == '/teal/dryrun':
+            assert data is not None, 'attempt to dry-run an empty request!'
+            return self._handle_dryrun(data)
+        elif requrl == '/transactions/simulate':
+            assert data is not None, 'attempt to simulate an empty transaction group!'
+            return self._handle_simulate(data)
         elif requrl == '/teal/compile':
             assert data is not None, 'attempt to compile an empty TEAL program!'
             # we do not actually compile the program since KAVM needs the source code
@@ -238,10 +408,11 @@ class KAVMClient(algod.AlgodClient):
         # Construct a json scenario with no transactions and execute just the setup-network stage
         scenario = self._construct_scenario(accounts=self._accounts.values(), transactions=[])
         final_state, kavm_stderr = self.kavm.run_avm_json(
-            scenario=scenario, existing_decompiled_teal_dir=self._decompiled_teal_dir_path, check=False, output="pretty"
+            scenario=scenario, existing_decompiled_teal_dir=self._decompiled_teal_dir_path, output="pretty"
         )
         return final_state
 
+    @traced('client.eval_transactions')
     def _eval_transactions(self, txns: List[Transaction]) -> Dict[str, str]:
         """
         Evaluate a transaction group
@@ -253,25 +424,37 @@ class KAVMClient(algod.AlgodClient):
         Construct a simulation scenario, serialize it into JSON and submit to KAVM.
         Parse KAVM's resulting configuration and update the account state in KAVMClient.
         """
+        (dumped_txns,) = self._eval_groups([txns])
+        return {'txId': dumped_txns[0]['id']}
 
-        # we'll need too keep track of all addresses the transactions mention to
-        # make KAVM aware of the new ones, so we preprocess the transactions
-        # to dicover new addresses and initialize them with 0 balance
-        for txn in txns:
-            if not txn.sender in self._accounts.keys():
-                self._accounts[txn.sender] = KAVMAccount(address=txn.sender, amount=0)
-            if hasattr(txn, 'receiver'):
-                txn = cast(PaymentTxn, txn)
-                if not txn.receiver in self._accounts.keys():
-                    self._accounts[txn.receiver] = KAVMAccount(address=txn.receiver, amount=0)
-
-        scenario = self._construct_scenario(accounts=self._accounts.values(), transactions=txns)
+    def _eval_groups(self, groups: List[List[Transaction]]) -> List[List[Dict[str, Any]]]:
+        """
+        Evaluate consecutive transaction groups in a single interpreter run, one "submit-transactions" stage
+        per group, and return the transactions KAVM has confirmed for each of them
+        """
+
+        for txns in groups:
+            self._discover_accounts(txns)
+
+        if self._incremental and self._last_state is not None:
+            new_accounts = [acc for addr, acc in self._accounts.items() if addr not in self._last_state_accounts]
+            scenario = self._construct_block_scenario(accounts=new_accounts, groups=groups)
+        else:
+            scenario = self._construct_block_scenario(accounts=self._accounts.values(), groups=groups)
         self._last_scenario = scenario
+        if self._scenario_record_dir is not None:
+            self._record_scenario(
+                self._construct_block_scenario(accounts=self._accounts.values(), groups=groups)
+                if self._incremental
+                else scenario
+            )
 
         try:
-            final_state, kavm_stderr = self.kavm.run_avm_json(
+            final_state, _ = self.kavm.run_avm_json(
                 scenario=scenario,
                 existing_decompiled_teal_dir=self._decompiled_teal_dir_path,
+                initial_state=self._last_state if self._incremental else None,
+                state_dump=self._state_dump_path,
             )
         except RuntimeError as e:
             _LOGGER.critical(
@@ -282,45 +465,304 @@ class KAVMClient(algod.AlgodClient):
             ) from e
 
         try:
-            # on succeful execution, the final state will be serialized and prineted to stderr
-            state_dump = json.loads(kavm_stderr)
-            assert type(state_dump) is dict
-        except json.decoder.JSONDecodeError as e:
-            _LOGGER.critical(f'Failed to parse the final state JSON: {e}')
+            # on succeful execution, the final state is serialized into the state dump file
+            with span('client.apply_state_dump'), self._state_dump_path.open() as state_dump:
+                dumped_accounts, dumped_txns = self._apply_state_dump(state_dump, stages=len(groups))
+        except ValueError as e:
+            _LOGGER.critical(f'Failed to read the final state JSON: {e}')
             raise AlgodHTTPError(msg='KAVM has failed, see logs for reasons') from e
 
-        _LOGGER.debug(f'Successfully parsed final state JSON: {json.dumps(state_dump, indent=4)}')
+        _LOGGER.debug(f'Parsed the final state: {dumped_accounts} accounts, {len(groups)} transaction groups')
+        for txns, group_dumped_txns in zip(groups, dumped_txns):
+            self._commit_txns(txns, group_dumped_txns)
+        if self._incremental:
+            self._last_state = final_state
+            self._last_state_accounts = set(self._accounts.keys())
+        return dumped_txns
+
+    def _queue_transactions(self, txns: List[Transaction]) -> Dict[str, str]:
+        """Add a transaction group to the block, evaluating the block if it is full"""
+        assert self._block_size is not None
+        self._block.append(txns)
+        if len(self._block) >= self._block_size:
+            self.flush_block()
+        elif self._block_timeout is not None and self._block_timer is None:
+            self._block_timer = threading.Timer(self._block_timeout, self.flush_block)
+            self._block_timer.daemon = True
+            self._block_timer.start()
+        return {'txId': txns[0].get_txid()}
+
+    def flush_block(self) -> None:
+        """Evaluate the transaction groups queued in the block mode now"""
+        with self._block_lock:
+            if self._block_timer is not None:
+                self._block_timer.cancel()
+                self._block_timer = None
+            groups, self._block = self._block, []
+            done, self._block_done = self._block_done, threading.Event()
+            try:
+                if groups:
+                    self._eval_block(groups)
+            except Exception as e:
+                # the block may be evaluated by the timer thread, so the error is only reported on lookup
+                _LOGGER.error(f'Failed to evaluate a block of {len(groups)} transaction groups: {e}')
+                txids = [txn.get_txid() for txns in groups for txn in txns]
+                self._failed_txids.update((txid, e) for txid in txids if txid not in self._committed_txns)
+            finally:
+                done.set()
+
+    @traced('client.eval_block')
+    def _eval_block(self, groups: List[List[Transaction]]) -> None:
+        """Evaluate a block of transaction groups, recording the error of every group that fails"""
+        try:
+            self._eval_groups(groups)
+            return
+        except AlgodHTTPError as e:
+            if len(groups) == 1:
+                self._failed_txids.update((txn.get_txid(), e) for txn in groups[0])
+                return
+        _LOGGER.warning(f'A block of {len(groups)} transaction groups has failed, evaluating the groups one by one')
+        for txns in groups:
+            try:
+                self._eval_groups([txns])
+            except AlgodHTTPError as e:
+                self._failed_txids.update((txn.get_txid(), e) for txn in txns)
+
+    def _await_block(self) -> None:
+        """Wait until the groups queued in the block mode are evaluated, evaluating them now if there is no timeout"""
+        with self._block_lock:
+            if not self._block:
+                return
+            done = self._block_done
+        if self._block_timeout is None or not done.wait(self._block_timeout):
+            self.flush_block()
+
+    def _discover_accounts(self, txns: Iterable[Transaction]) -> None:
+        """
+        Keep track of all addresses the transactions mention, to make KAVM aware of the new ones:
+        unknown senders and receivers are initialized with 0 balance
+        """
+        for address in _mentioned_addresses(txns):
+            if address not in self._accounts:
+                self._accounts[address] = KAVMAccount(address=address, amount=0)
+
+    def _record_scenario(self, scenario: KAVMScenario) -> None:
+        """Save a self-contained scenario, together with its TEAL programs, into the scenario record directory"""
+        assert self._scenario_record_dir is not None
+        self._scenario_record_dir.mkdir(parents=True, exist_ok=True)
+        for teal_file, teal_src in scenario._teal_programs.items():
+            (self._scenario_record_dir / teal_file).write_text(teal_src)
+        scenario_file = self._scenario_record_dir / f'{os.getpid()}-{self._recorded_scenarios:04}.json'
+        scenario_file.write_text(scenario.to_json(indent=2))
+        self._recorded_scenarios += 1
+        _LOGGER.debug(f'Recorded the scenario {scenario_file}')
+
+    def _apply_state_dump(self, state_dump: TextIO, stages: int = 1) -> Tuple[int, List[List[Dict[str, Any]]]]:
+        """
+        Update the tracked accounts from the last of the KAVM state dumps of `stages` "submit-transactions" stages,
+        rebuilding only the accounts that have changed since the previous dump, and return the number of dumped
+        accounts and the dumped transactions of every stage. Raise a ValueError, without updating any account,
+        if the dump of a stage is missing.
+        """
+        account_dumps: List[Dict[str, Any]] = []
+        dumped_txns: List[List[Dict[str, Any]]] = [[] for _ in range(stages)]
+        for dump_idx, key, item in iter_state_dump_items(state_dump):
+            if key == 'accounts' and dump_idx == stages - 1:
+                account_dumps.append(item)
+            elif key == 'transactions' and dump_idx < stages:
+                dumped_txns[dump_idx].append(item)
+        # a stage always confirms at least one transaction, without any KAVM has not dumped its final state
+        if not all(dumped_txns):
+            raise ValueError(f'Expected a state dump for each of the {stages} stages')
+        dumped_addresses: Set[str] = set()
+        for account_dump in account_dumps:
+            dumped_addresses.add(account_dump['address'])
+            self._update_account(account_dump)
         # substitute the tracked accounts by KAVM's state
-        self._accounts = {}
-        for acc_dict in KAVMScenario.sanitize_accounts(state_dump['accounts']):
-            acc_dict_translated = {KAVMAccount.inverted_attribute_map[k]: v for k, v in acc_dict.items()}
-            self._accounts[acc_dict_translated['address']] = KAVMAccount(**acc_dict_translated)
-            # update app creators
-            for addr, acc in self._accounts.items():
-                for app in acc.created_apps:
-                    self._app_creators[app['id']] = addr
-        # merge confirmed transactions with the ones received from KAVM
-        for txn in state_dump['transactions']:
+        for address in set(self._accounts.keys()) - dumped_addresses:
+            self._remove_account(address)
+        return len(dumped_addresses), dumped_txns
+
+    def _update_account(self, account_dump: Dict[str, Any]) -> bool:
+        """Rebuild a tracked account from its state dump, unless it has not changed, and return whether it has"""
+        address = account_dump['address']
+        if self._account_dumps.get(address) == account_dump and address in self._accounts:
+            return False
+        self._account_dumps[address] = account_dump
+        (acc_dict,) = KAVMScenario.sanitize_accounts([account_dump])
+        acc_dict_translated = {KAVMAccount.inverted_attribute_map[k]: v for k, v in acc_dict.items()}
+        self._unindex_account(address)
+        self._accounts[address] = KAVMAccount(**acc_dict_translated)
+        self._index_account(address)
+        self._state_version += 1
+        return True
+
+    def _remove_account(self, address: str) -> None:
+        self._unindex_account(address)
+        del self._accounts[address]
+        self._account_dumps.pop(address, None)
+        self._state_version += 1
+
+    def _index_account(self, address: str) -> None:
+        """Add the applications and assets created by a tracked account to the indexes"""
+        account = self._accounts[address]
+        for app in account.created_apps or []:
+            self._apps[app['id']] = app
+            self._app_creators[app['id']] = address
+        for asset in account.created_assets or []:
+            self._assets[asset['index']] = asset
+            self._asset_creators[asset['index']] = address
+
+    def _unindex_account(self, address: str) -> None:
+        """Remove the applications and assets created by a tracked account from the indexes"""
+        account = self._accounts.get(address)
+        if account is None:
+            return
+        for app in account.created_apps or []:
+            if self._app_creators.get(app['id']) == address:
+                del self._apps[app['id']]
+                del self._app_creators[app['id']]
+        for asset in account.created_assets or []:
+            if self._asset_creators.get(asset['index']) == address:
+                del self._assets[asset['index']]
+                del self._asset_creators[asset['index']]
+
+    def _commit_txns(self, txns: List[Transaction], dumped_txns: List[Dict[str, Any]]) -> None:
+        """
+        Merge the transactions of an evaluated group with the confirmed transactions received from KAVM
+
+        They are available by their KAVM ids, which are reused by every group, and also by their real ids
+        if KAVM has confirmed the whole group.
+        """
+        for txn in dumped_txns:
             self._committed_txns[txn['id']] = txn['params']
-        return {'txId': state_dump['transactions'][0]['id']}
+        if len(dumped_txns) == len(txns):
+            for txn, dumped_txn in zip(txns, dumped_txns):
+                self._committed_txns[txn.get_txid()] = dumped_txn['params']
+        if dumped_txns:
+            self._last_committed_txn = dumped_txns[-1]['params']
+
+    def _handle_dryrun(self, data: bytes) -> Dict[str, Any]:
+        """Dry-run the transactions of a msgpack-encoded DryrunRequest as a group, in the style of algod's response"""
+        request = msgpack.unpackb(data)
+        txns = [encoding.future_msgpack_decode(txn).transaction for txn in request.get('txns') or []]
+        error, (dumped_txns,) = self._dry_run([txns])
+        if error is not None:
+            results = [{'disassembly': [], 'app-call-messages': ['REJECT', error]} for _ in txns]
+        else:
+            results = [
+                {'disassembly': [], 'app-call-messages': ['PASS'], 'logs': dumped_txn['params'].get('logs') or []}
+                for dumped_txn in dumped_txns
+            ]
+        return {'error': error or '', 'protocol-version': 'kavm', 'txns': results}
+
+    def _handle_simulate(self, data: bytes) -> Dict[str, Any]:
+        """
+        Simulate transaction groups, given as a msgpack-encoded simulate request with "txn-groups"
+        or as concatenated signed transactions forming a single group, in the style of algod's response
+        """
+        unpacker = msgpack.Unpacker()
+        unpacker.feed(data)
+        request = unpacker.unpack()
+        if isinstance(request, dict) and 'txn-groups' in request:
+            groups = [
+                [encoding.future_msgpack_decode(txn).transaction for txn in group.get('txns') or []]
+                for group in request['txn-groups']
+            ]
+        else:
+            groups = [[txn.transaction for txn in msgpack_decode_txn_list(data)]]
+        error, dumped_txns = self._dry_run(groups)
+        txn_groups: List[Dict[str, Any]] = [
+            {'txn-results': [{'txn-result': dumped_txn['params']} for dumped_txn in group_dumped_txns]}
+            for group_dumped_txns in dumped_txns
+        ]
+        if error is not None:
+            for txn_group in txn_groups:
+                txn_group['failure-message'] = error
+        return {'version': 1, 'last-round': 1, 'would-succeed': error is None, 'txn-groups': txn_groups}
+
+    @traced('client.dry_run')
+    def _dry_run(self, groups: List[List[Transaction]]) -> Tuple[Optional[str], List[List[Dict[str, Any]]]]:
+        """
+        Evaluate consecutive transaction groups against the committed state without changing it
+
+        Return the return status of KAVM if the evaluation fails, or None, and the transactions KAVM has confirmed
+        for each group, none if the evaluation fails.
+        """
+        initial_state, known_addresses = self._setup_configuration()
+        accounts = [acc for addr, acc in self._accounts.items() if addr not in known_addresses]
+        # the accounts the groups mention are only known to this evaluation
+        addresses = dict.fromkeys(address for txns in groups for address in _mentioned_addresses(txns))
+        accounts += [KAVMAccount(address=address, amount=0) for address in addresses if address not in self._accounts]
+        scenario = self._construct_block_scenario(accounts=accounts, groups=groups)
+
+        dumped_txns: List[List[Dict[str, Any]]] = [[] for _ in groups]
+        with tempfile.TemporaryDirectory(prefix='kavm-dry-run-') as tmp_dir:
+            state_dump_path = Path(tmp_dir) / 'state-dump.json'
+            try:
+                self.kavm.run_avm_json(
+                    scenario=scenario,
+                    existing_decompiled_teal_dir=self._decompiled_teal_dir_path,
+                    output='text',
+                    initial_state=initial_state,
+                    state_dump=state_dump_path,
+                )
+            except RuntimeError as e:
+                return (str(e.args[0]) if e.args and e.args[0] else 'KAVM has failed'), dumped_txns
+            with state_dump_path.open() as state_dump:
+                for dump_idx, key, item in iter_state_dump_items(state_dump):
+                    if key == 'transactions' and dump_idx < len(groups):
+                        dumped_txns[dump_idx].append(item)
+        return None, dumped_txns
+
+    def _setup_configuration(self) -> Tuple[Pattern, FrozenSet[str]]:
+        """
+        A configuration with the committed state and the addresses of the accounts it knows about: the final
+        configuration of the last group in the incremental mode, and otherwise the configuration after setting up
+        the tracked accounts, built on first use and whenever an account has changed since
+        """
+        if self._incremental and self._last_state is not None:
+            return self._last_state, frozenset(self._last_state_accounts)
+        if self._setup_state is None or self._setup_state[0] != self._state_version:
+            _LOGGER.info('Setting up the tracked accounts for dry runs')
+            scenario = self._construct_block_scenario(accounts=self._accounts.values(), groups=[])
+            with tempfile.TemporaryDirectory(prefix='kavm-dry-run-') as tmp_dir:
+                state, _ = self.kavm.run_avm_json(
+                    scenario=scenario,
+                    existing_decompiled_teal_dir=self._decompiled_teal_dir_path,
+                    state_dump=Path(tmp_dir) / 'state-dump.json',
+                )
+            self._setup_state = (self._state_version, state, frozenset(self._accounts))
+        _, state, addresses = self._setup_state
+        return state, addresses
 
     def _construct_scenario(self, accounts: Iterable[KAVMAccount], transactions: Iterable[Transaction]) -> KAVMScenario:
         """Construct a JSON simulation scenario to run on KAVM"""
+        return self._construct_block_scenario(accounts, [transactions])
+
+    @traced('client.construct_scenario')
+    def _construct_block_scenario(
+        self, accounts: Iterable[KAVMAccount], groups: Iterable[Iterable[Transaction]]
+    ) -> KAVMScenario:
+        """Construct a JSON simulation scenario with a "submit-transactions" stage for every transaction group"""
         scenario = KAVMScenario.from_json(
             scenario_json_str=json.dumps(
                 {
                     "stages": [
                         {"stage-type": "setup-network", "data": {"accounts": [acc.dictify() for acc in accounts]}},
-                        {
-                            "stage-type": "submit-transactions",
-                            "data": {
-                                "transactions": [
-                                    KAVMTransaction.sanitize_byte_fields(_sort_dict(txn.dictify()))
-                                    for txn in transactions
-                                ]
-                            },
-                            "expected-returncode": 0,
-                        },
+                        *(
+                            {
+                                "stage-type": "submit-transactions",
+                                "data": {
+                                    "transactions": [
+                                        KAVMTransaction.sanitize_byte_fields(_sort_dict(txn.dictify()))
+                                        for txn in transactions
+                                    ]
+                                },
+                                "expected-returncode": 0,
+                            }
+                            for transactions in groups
+                        ),
                     ]
                 }
             ),
@@ -329,6 +771,254 @@ class KAVMClient(algod.AlgodClient):
         return scenario
 
 
+class _GroupTicket(NamedTuple):
+    """A transaction group admitted to AsyncKAVMClient, `footprint` is None if it must run alone"""
+
+    footprint: Optional[FrozenSet[str]]
+    done: asyncio.Event
+
+
+class _GroupSnapshot(NamedTuple):
+    """The state of AsyncKAVMClient a transaction group was evaluated against"""
+
+    versions: Dict[str, int]
+    account_dumps: Dict[str, Dict[str, Any]]
+    addresses: FrozenSet[str]
+    created_ids: FrozenSet[Tuple[str, int]]
+    creation_epoch: int
+
+
+def _mentioned_addresses(txns: Iterable[Transaction]) -> Iterator[str]:
+    """The senders and receivers of payment transactions"""
+    for txn in txns:
+        yield txn.sender
+        if hasattr(txn, 'receiver'):
+            yield cast(PaymentTxn, txn).receiver
+
+
+def _footprints_conflict(footprint: Optional[FrozenSet[str]], other: Optional[FrozenSet[str]]) -> bool:
+    return footprint is None or other is None or not footprint.isdisjoint(other)
+
+
+def _created_ids(account_dumps: Iterable[Dict[str, Any]]) -> FrozenSet[Tuple[str, int]]:
+    """The ids of the applications and assets created by the dumped accounts"""
+    ids: Set[Tuple[str, int]] = set()
+    for account_dump in account_dumps:
+        ids.update(('app', app['id']) for app in account_dump.get('created-apps') or [])
+        ids.update(('asset', asset['index']) for asset in account_dump.get('created-assets') or [])
+    return frozenset(ids)
+
+
+class AsyncKAVMClient(KAVMClient):
+    """
+    KAVMClient with asyncio methods that evaluate independent transaction groups concurrently
+
+    Every group is evaluated by an interpreter run on a pool of worker threads, against a snapshot of the accounts
+    taken when the group is started, and its results are committed when the run completes. Groups are ordered
+    by their footprint, the accounts they may read or write, see `group_footprint`: a group waits for the earlier
+    groups with overlapping footprints, groups with disjoint footprints run at the same time.
+
+    Before committing, a group is validated against the accounts committed in the meantime: if it has changed
+    an account outside its footprint, if an account of its footprint has changed since the snapshot or if it has
+    created an application or asset while another group did, it is evaluated again, alone.
+    The asynchronous methods have an `_async` suffix, the synchronous ones of KAVMClient, which algosdk helpers
+    like `wait_for_confirmation` call, keep working but must not be used while asynchronous requests are running.
+    """
+
+    def __init__(
+        self,
+        faucet_address: str,
+        algod_token: Optional[str] = None,
+        algod_address: Optional[str] = None,
+        log_level: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> None:
+        super().__init__(faucet_address, algod_token, algod_address, log_level)
+        self._pool = ThreadPoolExecutor(max_workers=workers if workers else os.cpu_count())
+        self._in_flight: List[_GroupTicket] = []
+        self._account_versions: Dict[str, int] = {}
+        self._creation_epoch = 0
+
+    def close(self) -> None:
+        """Shut down the worker threads"""
+        self._pool.shutdown()
+
+    async def __aenter__(self) -> 'AsyncKAVMClient':
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.close()
+
+    async def send_transaction_async(self, txn: SignedTransaction) -> str:
+        """Evaluate a signed transaction and return its id"""
+        return await self.send_transactions_async([txn])
+
+    async def send_transactions_async(self, txns: Iterable[SignedTransaction]) -> str:
+        """Evaluate a group of signed transactions and return the id of the first one"""
+        result = await self._eval_transactions_async([txn.transaction for txn in txns])
+        return result['txId']
+
+    async def pending_transaction_info_async(self, txid: str) -> Dict[str, Any]:
+        """The committed transaction `txid`, once all groups submitted so far are committed"""
+        await self._settle(None)
+        return self._handle_get_requests(f'/transactions/pending/{txid}')
+
+    async def account_info_async(self, address: str) -> Dict[str, Any]:
+        """The state of an account, once the groups submitted so far that may change it are committed"""
+        await self._settle(frozenset([address]))
+        return self._handle_get_requests(f'/accounts/{address}')
+
+    def group_footprint(self, txns: Iterable[Transaction]) -> FrozenSet[str]:
+        """
+        The addresses of the accounts a transaction group may read or write: the accounts the transactions mention,
+        the accounts of the applications they call or reference and the creators of those applications and assets,
+        which hold their global state and parameters
+        """
+        footprint: Set[str] = set()
+        for txn in txns:
+            footprint.add(txn.sender)
+            for field in ('receiver', 'close_remainder_to', 'close_assets_to', 'revocation_target', 'target'):
+                address = getattr(txn, field, None)
+                if address:
+                    footprint.add(address)
+            footprint.update(getattr(txn, 'accounts', None) or [])
+            app_ids: List[int] = []
+            asset_ids: List[int] = list(getattr(txn, 'foreign_assets', None) or [])
+            if txn.type == appcall_txn:
+                app_ids = [txn.index, *(getattr(txn, 'foreign_apps', None) or [])]
+            elif txn.type in (assettransfer_txn, assetconfig_txn, assetfreeze_txn):
+                asset_ids.append(txn.index)
+            for app_id in app_ids:
+                if app_id:
+                    footprint.add(get_application_address(app_id))
+                    if app_id in self._app_creators:
+                        footprint.add(self._app_creators[app_id])
+            for asset_id in asset_ids:
+                if asset_id in self._asset_creators:
+                    footprint.add(self._asset_creators[asset_id])
+        return frozenset(footprint)
+
+    async def _admit(self, footprint: Optional[FrozenSet[str]]) -> _GroupTicket:
+        """Wait until the earlier groups that conflict with a footprint are committed"""
+        blockers = [ticket.done for ticket in self._in_flight if _footprints_conflict(ticket.footprint, footprint)]
+        ticket = _GroupTicket(footprint, asyncio.Event())
+        self._in_flight.append(ticket)
+        for done in blockers:
+            await done.wait()
+        return ticket
+
+    def _release(self, ticket: _GroupTicket) -> None:
+        self._in_flight.remove(ticket)
+        ticket.done.set()
+
+    async def _settle(self, footprint: Optional[FrozenSet[str]]) -> None:
+        for done in [ticket.done for ticket in self._in_flight if _footprints_conflict(ticket.footprint, footprint)]:
+            await done.wait()
+
+    async def _eval_transactions_async(self, txns: List[Transaction], exclusive: bool = False) -> Dict[str, str]:
+        footprint = None if exclusive else self.group_footprint(txns)
+        ticket = await self._admit(footprint)
+        try:
+            self._discover_accounts(txns)
+            snapshot = self._snapshot(footprint)
+            scenario = self._construct_scenario(accounts=self._accounts.values(), transactions=txns)
+            self._store_teal_programs(scenario)
+            dump_items = await asyncio.get_running_loop().run_in_executor(self._pool, self._evaluate, scenario)
+            result = self._commit(txns, snapshot, footprint, dump_items)
+        finally:
+            self._release(ticket)
+        if result is None:
+            _LOGGER.info('Transaction group conflicts with a concurrent one, evaluating it again alone')
+            return await self._eval_transactions_async(txns, exclusive=True)
+        return result
+
+    def _snapshot(self, footprint: Optional[FrozenSet[str]]) -> _GroupSnapshot:
+        addresses = frozenset(self._accounts)
+        return _GroupSnapshot(
+            versions={address: self._account_versions.get(address, 0) for address in footprint or addresses},
+            account_dumps=dict(self._account_dumps),
+            addresses=addresses,
+            created_ids=_created_ids(self._account_dumps.values()),
+            creation_epoch=self._creation_epoch,
+        )
+
+    def _store_teal_programs(self, scenario: KAVMScenario) -> None:
+        """Save the TEAL programs of a scenario for later scenarios to read, without rewriting existing files"""
+        for teal_file, teal_src in scenario._teal_programs.items():
+            teal_path = self._decompiled_teal_dir_path / teal_file
+            if not teal_path.exists():
+                tmp_path = teal_path.with_suffix(f'.{os.getpid()}.tmp')
+                tmp_path.write_text(teal_src)
+                tmp_path.replace(teal_path)
+
+    def _evaluate(self, scenario: KAVMScenario) -> List[Tuple[str, Any]]:
+        """Run a scenario on the interpreter and return the items of its state dump, called on a worker thread"""
+        with tempfile.TemporaryDirectory(prefix='kavm-client-') as tmp_dir:
+            state_dump_path = Path(tmp_dir) / 'state-dump.json'
+            try:
+                # the TEAL programs are written to a fresh directory, concurrent runs must not share files
+                self.kavm.run_avm_json(scenario=scenario, output='text', state_dump=state_dump_path)
+            except RuntimeError as e:
+                _LOGGER.critical(
+                    f'Transaction group evaluation failed, last generated scenario was: {json.dumps(scenario.dictify(), indent=4)}'
+                )
+                raise AlgodHTTPError(
+                    msg='KAVM has failed, rerun witn --log-level=ERROR to see the executed JSON scenario'
+                ) from e
+            try:
+                with span('client.read_state_dump'), state_dump_path.open() as state_dump:
+                    dump_items = [(key, item) for _, key, item in iter_state_dump_items(state_dump)]
+            except json.decoder.JSONDecodeError as e:
+                _LOGGER.critical(f'Failed to parse the final state JSON: {e}')
+                raise AlgodHTTPError(msg='KAVM has failed, see logs for reasons') from e
+            # a stage always confirms at least one transaction, without any KAVM has not dumped its final state
+            if not any(key == 'transactions' for key, _ in dump_items):
+                _LOGGER.critical('KAVM has not dumped the final state')
+                raise AlgodHTTPError(msg='KAVM has failed, see logs for reasons')
+            return dump_items
+
+    def _commit(
+        self,
+        txns: List[Transaction],
+        snapshot: _GroupSnapshot,
+        footprint: Optional[FrozenSet[str]],
+        dump_items: List[Tuple[str, Any]],
+    ) -> Optional[Dict[str, str]]:
+        """Apply the state dump of a group evaluated against a snapshot, or return None if it must be re-evaluated"""
+        account_dumps = [item for key, item in dump_items if key == 'accounts']
+        dumped_txns = [item for key, item in dump_items if key == 'transactions']
+
+        if any(self._account_versions.get(address, 0) != version for address, version in snapshot.versions.items()):
+            return None
+        creates = not _created_ids(account_dumps) <= snapshot.created_ids
+        if creates and self._creation_epoch != snapshot.creation_epoch:
+            return None
+        if footprint is not None:
+            for account_dump in account_dumps:
+                address = account_dump['address']
+                previous = snapshot.account_dumps.get(address)
+                if address not in footprint and previous is not None and previous != account_dump:
+                    _LOGGER.warning(f'Transaction group has changed the account {address} outside its footprint')
+                    return None
+
+        changed = footprint if footprint is not None else snapshot.addresses
+        dumped_addresses = set()
+        for account_dump in account_dumps:
+            address = account_dump['address']
+            dumped_addresses.add(address)
+            if (address in changed or address not in self._account_dumps) and self._update_account(account_dump):
+                self._account_versions[address] = self._account_versions.get(address, 0) + 1
+        for address in (changed & snapshot.addresses) - dumped_addresses:
+            if address in self._accounts:
+                self._remove_account(address)
+                self._account_versions[address] = self._account_versions.get(address, 0) + 1
+        if creates:
+            self._creation_epoch += 1
+
+        self._commit_txns(txns, dumped_txns)
+        return {'txId': dumped_txns[0]['id']}
+
+
 class KAVMAtomicTransactionComposer(AtomicTransactionComposer):
     """
     This class overrides the 'execute' method of the base AtomicTransactionComposer class
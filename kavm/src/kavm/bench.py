@@ -0,0 +1,181 @@
+"""
+Benchmark the simulation pipeline of KAVM phase by phase.
+
+A corpus is a set of JSON scenarios, e.g. tests/json-scenarios or the scenarios recorded by KAVMClient
+while running the contract tests, see the KAVM_SCENARIO_RECORD_DIR environment variable.
+Every scenario is run through the same phases as `KAVM.run_avm_json`, each one timed separately,
+and the timings of a run are compared to a stored baseline to detect regressions.
+"""
+
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Final, Iterable, Iterator, List, NamedTuple, Optional
+
+from tabulate import tabulate
+
+from kavm.kavm import KAVM
+from kavm.kore_parser import read_state_dumps
+from kavm.kore_utils import kore_teal_programs_map
+from kavm.scenario import KAVMScenario
+from kavm.teal_cache import TealProgramCache
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# 'encode-kore' and 'interpreter' were timed together as 'krun' before the interpreter was run directly,
+# a phase that is missing from a baseline is not compared, see `compare_to_baseline`
+BENCH_PHASES: Final = (
+    'sanitize',
+    'write-teal',
+    'parse-teal',
+    'encode-kore',
+    'interpreter',
+    'parse-kore',
+    'decode-state-dumps',
+)
+
+PhaseTimings = Dict[str, float]
+
+
+class BenchCorpus(NamedTuple):
+    name: str
+    scenario_files: List[Path]
+    teal_sources_dir: Optional[Path]
+
+
+@contextmanager
+def _timed(timings: PhaseTimings, phase: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] += time.perf_counter() - start
+
+
+def bench_scenario(
+    kavm: KAVM,
+    scenario_file: Path,
+    teal_sources_dir: Optional[Path] = None,
+    depth: Optional[int] = None,
+    warm_teal_cache: bool = False,
+) -> PhaseTimings:
+    """
+    Run a JSON scenario once and return the time spent in every phase, in seconds
+
+    TEAL programs are parsed without the cache of parsed programs, unless `warm_teal_cache` is set.
+    Scenarios that are expected to fail are timed as well, the exit code of the interpreter is not checked.
+    """
+    timings = dict.fromkeys(BENCH_PHASES, 0.0)
+    with _timed(timings, 'sanitize'):
+        scenario = KAVMScenario.from_json(scenario_file.read_text(), teal_sources_dir)
+    teal_cache = kavm.teal_cache if warm_teal_cache else TealProgramCache(kavm._teal_parser)
+    with tempfile.TemporaryDirectory() as tmp_teal_dir:
+        teal_dir = Path(tmp_teal_dir)
+        with _timed(timings, 'write-teal'):
+            for teal_file, teal_src in scenario._teal_programs.items():
+                (teal_dir / teal_file).write_text(teal_src)
+        with _timed(timings, 'parse-teal'):
+            teal_programs = kore_teal_programs_map(
+                (teal_file, teal_cache.parse(teal_dir / teal_file)) for teal_file in scenario._teal_programs
+            )
+        os.environ['KAVM_DEFINITION_DIR'] = str(kavm.definition_dir)
+        with _timed(timings, 'encode-kore'):
+            init_config = kavm.executor.init_config(scenario.dictify(), teal_programs.text)
+        with _timed(timings, 'interpreter'):
+            result = kavm.executor.execute(init_config, depth=depth)
+    with _timed(timings, 'parse-kore'):
+        kavm._parse_kore(result.output)
+    with _timed(timings, 'decode-state-dumps'):
+        read_state_dumps(result.output)
+    return timings
+
+
+def bench_corpus(
+    kavm: KAVM,
+    corpus: BenchCorpus,
+    repeat: int = 3,
+    depth: Optional[int] = None,
+    warm_teal_cache: bool = False,
+) -> Dict[str, Any]:
+    """
+    Benchmark every scenario of a corpus `repeat` times and report the median timings of each scenario,
+    together with the totals of the corpus per phase
+    """
+    scenarios: Dict[str, PhaseTimings] = {}
+    for scenario_file in corpus.scenario_files:
+        _LOGGER.info(f'Benchmarking {corpus.name}: {scenario_file}')
+        runs = [
+            bench_scenario(kavm, scenario_file, corpus.teal_sources_dir, depth, warm_teal_cache) for _ in range(repeat)
+        ]
+        scenarios[scenario_file.name] = {phase: statistics.median(run[phase] for run in runs) for phase in BENCH_PHASES}
+    phases = {phase: sum(timings[phase] for timings in scenarios.values()) for phase in BENCH_PHASES}
+    return {'phases': phases, 'total': sum(phases.values()), 'scenarios': scenarios}
+
+
+def bench(
+    kavm: KAVM,
+    corpora: Iterable[BenchCorpus],
+    repeat: int = 3,
+    depth: Optional[int] = None,
+    warm_teal_cache: bool = False,
+) -> Dict[str, Any]:
+    """Benchmark several corpora, the result is the report format of `compare_to_baseline`"""
+    return {
+        'repeat': repeat,
+        'corpora': {corpus.name: bench_corpus(kavm, corpus, repeat, depth, warm_teal_cache) for corpus in corpora},
+    }
+
+
+def compare_to_baseline(
+    report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2, min_delta: float = 0.05
+) -> List[str]:
+    """
+    Compare the per-phase totals of the corpora of a report to a baseline report
+
+    A phase, or the total of a corpus, has regressed if it is slower than in the baseline by more than `threshold`,
+    relative to the baseline, and by more than `min_delta` seconds, to ignore noise in the fast phases.
+    Corpora or phases missing from either report are not compared. Return a description of every regression.
+    """
+    regressions = []
+    for name, corpus in report['corpora'].items():
+        baseline_corpus = baseline.get('corpora', {}).get(name)
+        if baseline_corpus is None:
+            _LOGGER.warning(f'No baseline for corpus {name}')
+            continue
+        measurements = [
+            (phase, corpus['phases'].get(phase), baseline_corpus['phases'].get(phase)) for phase in BENCH_PHASES
+        ]
+        measurements.append(('total', corpus['total'], baseline_corpus['total']))
+        for phase, current, previous in measurements:
+            if current is None or previous is None:
+                continue
+            if current - previous > min_delta and current > previous * (1 + threshold):
+                slowdown = f' (+{(current / previous - 1) * 100:.0f}%)' if previous > 0 else ''
+                regressions.append(f'{name}/{phase}: {current:.3f}s, baseline {previous:.3f}s{slowdown}')
+    return regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """A table of the per-phase totals of every corpus of a report, in seconds"""
+    table: Dict[str, List[Any]] = {'corpus': [], 'scenarios': [], **{phase: [] for phase in BENCH_PHASES}, 'total': []}
+    for name, corpus in report['corpora'].items():
+        table['corpus'].append(name)
+        table['scenarios'].append(len(corpus['scenarios']))
+        for phase in BENCH_PHASES:
+            table[phase].append(corpus['phases'][phase])
+        table['total'].append(corpus['total'])
+    return tabulate(table, headers=list(table.keys()), tablefmt='github', floatfmt='.3f')
+
+
+def read_report(file: Path) -> Dict[str, Any]:
+    return json.loads(file.read_text())
+
+
+def write_report(report: Dict[str, Any], file: Path) -> None:
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(json.dumps(report, indent=2, sort_keys=True) + '\n')
@@ -0,0 +1,59 @@
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Final, Tuple
+
+from pyk.kast.outer import KDefinition, read_kast_definition
+from pyk.kast.pretty import SymbolTable
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+_DefinitionKey = Tuple[Path, int]
+
+_LOCK: Final = threading.RLock()
+_DEFINITIONS: Final[Dict[_DefinitionKey, KDefinition]] = {}
+_SYMBOL_TABLES: Final[Dict[Tuple[_DefinitionKey, str], SymbolTable]] = {}
+_DIGESTS: Final[Dict[_DefinitionKey, str]] = {}
+
+
+def definition_key(definition_dir: Path) -> _DefinitionKey:
+    """
+    Identify a kompiled definition by its directory and the modification time of its compiled.json,
+    so that re-kompiling the definition in place yields a different key
+    """
+    compiled_json = definition_dir / 'compiled.json'
+    return definition_dir.resolve(), compiled_json.stat().st_mtime_ns
+
+
+def load_definition(definition_dir: Path) -> KDefinition:
+    """Read the KAST definition of a kompiled definition, reusing the copy already loaded by this process"""
+    key = definition_key(definition_dir)
+    with _LOCK:
+        if key not in _DEFINITIONS:
+            _LOGGER.info(f'Loading definition {definition_dir}')
+            _DEFINITIONS[key] = read_kast_definition(definition_dir / 'compiled.json')
+        return _DEFINITIONS[key]
+
+
+def definition_digest(definition_dir: Path) -> str:
+    """The SHA-256 digest of the compiled.json of a kompiled definition, computed once per process"""
+    key = definition_key(definition_dir)
+    with _LOCK:
+        if key not in _DIGESTS:
+            _DIGESTS[key] = hashlib.sha256((definition_dir / 'compiled.json').read_bytes()).hexdigest()
+        return _DIGESTS[key]
+
+
+def load_symbol_table(definition_dir: Path, name: str, build: Callable[[], SymbolTable]) -> SymbolTable:
+    """
+    Get the symbol table called `name` of a kompiled definition, calling `build` to construct it on first use.
+
+    Different names allow keeping several symbol tables, e.g. patched for pretty-printing claims, per definition.
+    The returned symbol table is shared, callers must not modify it.
+    """
+    key = (definition_key(definition_dir), name)
+    with _LOCK:
+        if key not in _SYMBOL_TABLES:
+            _SYMBOL_TABLES[key] = build()
+        return _SYMBOL_TABLES[key]
@@ -0,0 +1,175 @@
+import itertools
+import json
+import logging
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Final, NamedTuple, Optional, Union
+
+from pyk.kore import syntax as kore
+
+from kavm.instrumentation import count, span
+from kavm.kore_parser import parse_kore, parse_kore_file
+from kavm.kore_utils import (
+    KORE_MAP_UNION,
+    kore_get_cell,
+    kore_init_config,
+    kore_json,
+    kore_k_sequence,
+    kore_set_cells,
+)
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class KAVMExecutionResult(NamedTuple):
+    returncode: int
+    output: str
+    stderr: str
+    pattern: Optional[kore.Pattern] = None
+
+
+class KAVMExecutor:
+    """
+    Execute KAVM scenarios on the kompiled LLVM interpreter directly.
+
+    krun starts the K frontend for every call only to parse the configuration variables,
+    build the initial configuration and print the result. The executor keeps everything
+    that does not depend on the scenario resolved once per process and talks to the
+    interpreter binary itself: the scenario JSON is encoded in KORE directly, the initial
+    configuration is assembled in KORE and the final configuration is read back as KORE.
+    """
+
+    definition_dir: Path
+
+    _interpreter: Path
+    _scenario_parser: Path
+    _scratch: tempfile.TemporaryDirectory
+    _counter: 'itertools.count[int]'
+
+    def __init__(self, definition_dir: Path, scenario_parser: Optional[Path] = None) -> None:
+        self.definition_dir = definition_dir
+        self._interpreter = definition_dir / 'interpreter'
+        if not self._interpreter.is_file():
+            raise RuntimeError(f'Cannot find the LLVM interpreter in {definition_dir}, is it an LLVM definition?')
+        self._scenario_parser = (
+            scenario_parser if scenario_parser else definition_dir / 'parser_JSON_AVM-TESTING-SYNTAX'
+        )
+        self._scratch = tempfile.TemporaryDirectory(prefix='kavm-executor-')
+        self._counter = itertools.count()
+
+    def _scratch_file(self, suffix: str) -> Path:
+        return Path(self._scratch.name) / f'{next(self._counter)}{suffix}'
+
+    def parse_scenario(self, scenario_json: Union[str, Dict[str, Any]]) -> str:
+        """
+        Convert a JSON scenario, as text or as the dictionary of `KAVMScenario.dictify`, into the KORE text of its term
+
+        The scenario is encoded in KORE directly, the Bison parser is only run on scenarios with values the encoder
+        leaves to it, like floats. Dictionaries are encoded with sorted keys, as `KAVMScenario.to_json` writes them.
+        """
+        try:
+            with span('executor.encode_scenario'):
+                if isinstance(scenario_json, str):
+                    return kore_json(json.loads(scenario_json))
+                return kore_json(scenario_json, sort_keys=True)
+        except TypeError as err:
+            _LOGGER.debug(f'Parsing the scenario with {self._scenario_parser}: {err}')
+        if not isinstance(scenario_json, str):
+            scenario_json = json.dumps(scenario_json, sort_keys=True)
+        return self._parse_scenario_with_bison(scenario_json)
+
+    def _parse_scenario_with_bison(self, scenario_json: str) -> str:
+        scenario_file = self._scratch_file('.json')
+        scenario_file.write_text(scenario_json)
+        count('executor.bytes_written', len(scenario_json))
+        try:
+            with span('executor.parse_scenario'):
+                result = subprocess.run(
+                    [str(self._scenario_parser), str(scenario_file)], stdout=subprocess.PIPE, check=True, text=True
+                )
+        finally:
+            scenario_file.unlink()
+        return result.stdout
+
+    def init_config(self, scenario_json: Union[str, Dict[str, Any]], teal_programs: str) -> str:
+        """Construct the initial configuration for a JSON scenario and a KORE map of parsed TEAL programs"""
+        return kore_init_config(self.parse_scenario(scenario_json), teal_programs)
+
+    def resume_config(
+        self,
+        state: kore.Pattern,
+        scenario_json: Union[str, Dict[str, Any]],
+        teal_programs: Optional[kore.Pattern] = None,
+    ) -> str:
+        """
+        Construct a configuration that evaluates a JSON scenario on top of the final configuration of an earlier run.
+
+        The result cells are reset to their initial values and the programs in `teal_programs`,
+        which must not be known to `state` yet, are added to its `<tealPrograms>` cell.
+        """
+        pgm = parse_kore(self.parse_scenario(scenario_json))
+        contents: Dict[str, kore.Pattern] = {
+            'k': kore_k_sequence('JSON', pgm),
+            'returncode': kore.DV(kore.SortApp('SortInt'), kore.String('4')),
+            'returnstatus': kore.DV(kore.SortApp('SortString'), kore.String('')),
+            'state-dumps': kore.App("Lbl'Stop'List", (), ()),
+        }
+        if teal_programs is not None:
+            teal_programs_cell = kore_get_cell(state, 'tealPrograms')
+            if teal_programs_cell is None:
+                raise RuntimeError('Cannot resume from a configuration without the <tealPrograms> cell')
+            contents['tealPrograms'] = kore.App(KORE_MAP_UNION, (), (teal_programs_cell.patterns[0], teal_programs))
+        return kore_set_cells(state, contents).text
+
+    def execute(
+        self,
+        config: str,
+        depth: Optional[int] = None,
+        state_dump: Optional[Path] = None,
+        parse_output: bool = False,
+    ) -> KAVMExecutionResult:
+        """
+        Rewrite a KORE configuration with the interpreter and return its exit code, final configuration and stderr
+
+        The semantics writes the state dumps to stderr. If `state_dump` is given, stderr is written to that file
+        as the interpreter produces it instead of being buffered in memory, and the returned stderr is empty.
+        If `parse_output` is set and the interpreter succeeds, the final configuration is parsed straight from
+        the memory-mapped output file into `pattern`, and the returned output text is empty.
+        """
+        input_file = self._scratch_file('.input.kore')
+        output_file = self._scratch_file('.output.kore')
+        with span('executor.write_config'):
+            input_file.write_text(config)
+        count('executor.bytes_written', len(config))
+        command = [str(self._interpreter), str(input_file), str(-1 if depth is None else depth), str(output_file)]
+        _LOGGER.debug(f'Running: {" ".join(command)}')
+        try:
+            with span('executor.interpreter', depth=depth):
+                if state_dump is None:
+                    proc_result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+                else:
+                    with state_dump.open('w') as state_dump_file:
+                        proc_result = subprocess.run(
+                            command, stdout=subprocess.DEVNULL, stderr=state_dump_file, text=True
+                        )
+            stderr = proc_result.stderr if proc_result.stderr is not None else ''
+            if proc_result.returncode < 0 or not output_file.exists():
+                raise RuntimeError(
+                    f'The KAVM interpreter has crashed with exit code {proc_result.returncode}', '', stderr
+                )
+            if parse_output and proc_result.returncode == 0:
+                with span('kavm.parse_kore'):
+                    pattern = parse_kore_file(output_file)
+                return KAVMExecutionResult(proc_result.returncode, '', stderr, pattern)
+            with span('executor.read_output'):
+                output = output_file.read_text()
+            count('executor.bytes_read', len(output))
+            return KAVMExecutionResult(proc_result.returncode, output, stderr)
+        finally:
+            input_file.unlink(missing_ok=True)
+            output_file.unlink(missing_ok=True)
+
+    def run(self, scenario_json: str, teal_programs: str, depth: Optional[int] = None) -> KAVMExecutionResult:
+        """Execute a JSON scenario against a KORE map of parsed TEAL programs"""
+        return self.execute(self.init_config(scenario_json, teal_programs), depth=depth)
@@ -0,0 +1,156 @@
+"""
+Lightweight phase instrumentation for KAVM.
+
+Phases are recorded as spans, with `span` or the `traced` decorator, and sizes, like the bytes of KORE
+written to and read back from the interpreter, with `count`. Recording is disabled by default, and then
+both cost no more than a function call. When enabled, with `enable` or by setting the KAVM_TRACE
+environment variable to a file name, spans are timed with the monotonic `time.perf_counter_ns` and can be
+summarized with `summary` or exported with `write_chrome_trace`, in the Trace Event Format that
+chrome://tracing and Perfetto open. With KAVM_TRACE, the trace is written to that file when the process exits.
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Final, Iterator, List, NamedTuple, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class Span(NamedTuple):
+    name: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+    args: Dict[str, Any]
+
+
+class Tracer:
+    """Collects the spans and counters of a process, can be used from several threads"""
+
+    enabled: bool
+    _lock: threading.Lock
+    _spans: List[Span]
+    _counters: Dict[str, int]
+    _origin_ns: int
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._spans = []
+        self._counters = {}
+        self._origin_ns = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            with self._lock:
+                self._spans.append(Span(name, start - self._origin_ns, duration, threading.get_ident(), args))
+
+    def count(self, name: str, value: int = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @property
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    @property
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans = []
+            self._counters = {}
+            self._origin_ns = time.perf_counter_ns()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """The number of calls and the total time in seconds of every phase, and the value of every counter"""
+        phases: Dict[str, Any] = {}
+        for span in self.spans:
+            phase = phases.setdefault(span.name, {'calls': 0, 'total': 0.0})
+            phase['calls'] += 1
+            phase['total'] += span.duration_ns / 1e9
+        return {'phases': phases, 'counters': self.counters}
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """The recorded spans as complete events, and the counters as counter events, of the Trace Event Format"""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {
+                'name': span.name,
+                'ph': 'X',
+                'ts': span.start_ns / 1000,
+                'dur': span.duration_ns / 1000,
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': {key: str(value) for key, value in span.args.items()},
+            }
+            for span in self.spans
+        ]
+        timestamp = (time.perf_counter_ns() - self._origin_ns) / 1000
+        events += [
+            {'name': name, 'ph': 'C', 'ts': timestamp, 'pid': pid, 'args': {name: value}}
+            for name, value in self.counters.items()
+        ]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, file: Path) -> None:
+        file.write_text(json.dumps(self.chrome_trace()))
+
+
+TRACER: Final = Tracer()
+
+
+def enable(trace_file: Optional[Path] = None) -> None:
+    """Start recording spans and counters, writing them as a Chrome trace to `trace_file`, if given, on exit"""
+    TRACER.enabled = True
+    if trace_file is not None:
+        atexit.register(TRACER.write_chrome_trace, trace_file)
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """Record the time spent in a block as a span of the process-wide tracer"""
+    return TRACER.span(name, **args)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add `value` to a counter of the process-wide tracer"""
+    TRACER.count(name, value)
+
+
+def traced(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Record every call of a function as a span called `name`"""
+
+    def decorator(f: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(f)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not TRACER.enabled:
+                return f(*args, **kwargs)
+            with TRACER.span(name):
+                return f(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+if os.environ.get('KAVM_TRACE'):
+    enable(Path(os.environ['KAVM_TRACE']))
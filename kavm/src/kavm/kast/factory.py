@@ -1,56 +1,86 @@
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Optional, Union
+from typing import Dict, Final, Iterable, List, Optional, Tuple, Union
 
-from pyk.dequote import dequote_string
 from pyk.kast.inner import KApply, KInner, KLabel, KSort, KToken, Subst, build_assoc
-from pyk.kast.manip import split_config_from
 from pyk.prelude.kint import intToken
 from pyk.prelude.string import stringToken
 
 from kavm.adaptors.teal_key_value import raw_list_state_to_dict_bytes_bytes, raw_list_state_to_dict_bytes_ints
 from kavm.constants import MIN_BALANCE
+from kavm.instrumentation import traced
+from kavm.kast.templates import cell_template
 from kavm.kavm import KAVM
 from kavm.pyk_utils import algorand_address_to_k_bytes, map_bytes_bytes, map_bytes_ints, token_or_expr
 
+HEX_TOKEN: Final = KSort('HexToken')
+
+_TEAL_PROGRAM_TERMS_CAPACITY: Final = 64
+_TEAL_PROGRAM_TERMS: Final['OrderedDict[str, KInner]'] = OrderedDict()
+_TEAL_PROGRAM_TERMS_LOCK: Final = threading.Lock()
+
+
+def hex_token_to_string(token: KToken) -> KToken:
+    """Convert a `0x`-prefixed hex token into a string token with one character per byte"""
+    return stringToken(bytes.fromhex(token.token[2:]).decode('latin-1'))
+
 
 def preprocess_teal_program(term: KInner) -> KInner:
-    '''Preprocess parsed TEAL program by converting hex tokens to strings'''
-
-    def preprocess_teal_program_impl(term: KInner) -> KInner:
-        def hex_token_to_k_string(ht: str) -> str:
-            string = ""
-            for i in range(0, len(ht), 2):
-                string += "\\x"
-                string += ht[i] + ht[i + 1]
-            return string
-
-        if type(term) is KApply:
-            if len(term.args) == 0:
-                return term
+    '''
+    Preprocess parsed TEAL program by converting hex tokens to strings
+
+    The term is traversed iteratively, in post-order, and only the applications above hex tokens are rebuilt,
+    all other subterms are shared with the original term.
+    '''
+    results: List[KInner] = []
+    stack: List[Tuple[KInner, bool]] = [(term, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if type(current) is KApply and current.args:
+            if not expanded:
+                stack.append((current, True))
+                stack.extend((arg, False) for arg in reversed(current.args))
+                continue
+            arity = len(current.args)
+            args = results[-arity:]
+            del results[-arity:]
+            if all(new_arg is arg for new_arg, arg in zip(args, current.args)):
+                results.append(current)
             else:
-                result = KApply(label=term.label, args=[preprocess_teal_program_impl(arg) for arg in term.args])
-                return result
+                results.append(KApply(label=current.label, args=args))
+        elif type(current) is KToken and current.sort == HEX_TOKEN:
+            results.append(hex_token_to_string(current))
         else:
-            if type(term) is KToken:
-                if term.sort == KSort(name="HexToken"):
-                    return stringToken(dequote_string(hex_token_to_k_string(term.token[2:])))
-
-                else:
-                    return term
-            else:
-                return term
-
-    return preprocess_teal_program_impl(term)
+            results.append(current)
+    (result,) = results
+    return result
 
 
 class KAVMTermFactory:
     def __init__(self, kavm: KAVM):
         self._kavm = kavm
 
+    def teal_program_term(self, teal_file: Path) -> KInner:
+        """The parsed and preprocessed TEAL program in a file, memoized by the hash of its source"""
+        key = self._kavm.teal_cache.key(teal_file.read_text())
+        with _TEAL_PROGRAM_TERMS_LOCK:
+            term = _TEAL_PROGRAM_TERMS.get(key)
+            if term is not None:
+                _TEAL_PROGRAM_TERMS.move_to_end(key)
+                return term
+        term = preprocess_teal_program(self._kavm.kore_to_kast(self._kavm.parse_teal(teal_file)))
+        with _TEAL_PROGRAM_TERMS_LOCK:
+            _TEAL_PROGRAM_TERMS[key] = term
+            while len(_TEAL_PROGRAM_TERMS) > _TEAL_PROGRAM_TERMS_CAPACITY:
+                _TEAL_PROGRAM_TERMS.popitem(last=False)
+        return term
+
+    @traced('factory.asset_cell')
     def asset_cell(self, sdk_asset_dict: Dict, symbolic_fields_subst: Optional[Subst] = None) -> KInner:
         symbolic_fields_subst = symbolic_fields_subst if symbolic_fields_subst else Subst({})
 
-        symbolic_asset_cell, _ = split_config_from(self._kavm.definition.init_config(KSort('AssetCellMap')))
+        symbolic_asset_cell, _ = cell_template(self._kavm, KSort('AssetCellMap'))
 
         sdk_fields_subst = Subst(
             {
@@ -73,10 +103,11 @@ class KAVMTermFactory:
 
         return asset_cell
 
+    @traced('factory.opt_in_asset_cell')
     def opt_in_asset_cell(self, sdk_asset_holding: Dict, symbolic_fields_subst: Optional[Subst] = None) -> KInner:
         symbolic_fields_subst = symbolic_fields_subst if symbolic_fields_subst else Subst({})
 
-        symbolic_opt_in_asset_cell, _ = split_config_from(self._kavm.definition.init_config(KSort('OptInAssetCellMap')))
+        symbolic_opt_in_asset_cell, _ = cell_template(self._kavm, KSort('OptInAssetCellMap'))
 
         sdk_fields_subst = Subst(
             {
@@ -90,6 +121,7 @@ class KAVMTermFactory:
 
         return opt_in_asset_cell
 
+    @traced('factory.account_cell')
     def account_cell(
         self,
         sdk_account_dict: Dict,
@@ -98,9 +130,7 @@ class KAVMTermFactory:
     ) -> KInner:
         symbolic_fields_subst = symbolic_fields_subst if symbolic_fields_subst else Subst({})
 
-        symbolic_account_cell, default_fields_subst = split_config_from(
-            self._kavm.definition.init_config(KSort('AccountCellMap'))
-        )
+        symbolic_account_cell, default_fields_subst = cell_template(self._kavm, KSort('AccountCellMap'))
 
         try:
             assert sdk_account_dict['apps-local-state']
@@ -158,12 +188,33 @@ class KAVMTermFactory:
 
         return account_cell
 
+    @traced('factory.account_cells')
+    def account_cells(
+        self,
+        sdk_account_dicts: Iterable[Dict],
+        teal_sources_dir: Path,
+        symbolic_fields_substs: Optional[Dict[str, Subst]] = None,
+    ) -> List[KInner]:
+        """
+        Build the <account> cells of many accounts, sharing the cached configuration templates
+
+        `symbolic_fields_substs` maps account addresses to the substitutions of their symbolic fields.
+        """
+        symbolic_fields_substs = symbolic_fields_substs if symbolic_fields_substs else {}
+        return [
+            self.account_cell(
+                sdk_account_dict, teal_sources_dir, symbolic_fields_substs.get(sdk_account_dict['address'])
+            )
+            for sdk_account_dict in sdk_account_dicts
+        ]
+
+    @traced('factory.app_cell')
     def app_cell(
         self, sdk_app_dict: Dict, teal_sources_dir: Path, symbolic_fields_subst: Optional[Subst] = None
     ) -> KInner:
         symbolic_fields_subst = symbolic_fields_subst if symbolic_fields_subst else Subst({})
 
-        symbolic_app_cell, _ = split_config_from(self._kavm.definition.init_config(KSort('AppCellMap')))
+        symbolic_app_cell, _ = cell_template(self._kavm, KSort('AppCellMap'))
 
         try:
             global_num_uint = sdk_app_dict['params']['global-state-schema']['num-uint']
@@ -195,9 +246,7 @@ class KAVMTermFactory:
 
         try:
             approval_pgm_path = teal_sources_dir / sdk_app_dict['params']['approval-program']
-            approval_pgm_term = preprocess_teal_program(
-                self._kavm.kore_to_kast(self._kavm.parse_teal(approval_pgm_path))
-            )
+            approval_pgm_term = self.teal_program_term(approval_pgm_path)
         except Exception as e:
             approval_pgm_term = KApply(
                 label=KLabel(name='int__TEAL-OPCODES_PseudoOpCode_PseudoTUInt64', params=()),
@@ -206,7 +255,7 @@ class KAVMTermFactory:
             raise e
         try:
             clear_pgm_path = teal_sources_dir / sdk_app_dict['params']['clear-state-program']
-            clear_pgm_term = preprocess_teal_program(self._kavm.kore_to_kast(self._kavm.parse_teal(clear_pgm_path)))
+            clear_pgm_term = self.teal_program_term(clear_pgm_path)
 
         except Exception as e:
             clear_pgm_term = KApply(
@@ -236,12 +285,13 @@ class KAVMTermFactory:
 
         return app_cell
 
+    @traced('factory.opt_in_app_cell')
     def opt_in_app_cell(self, sdk_app_local_state: Dict, symbolic_fields_subst: Optional[Subst] = None) -> KInner:
         raise NotImplementedError()
 
         symbolic_fields_subst = symbolic_fields_subst if symbolic_fields_subst else Subst({})
 
-        symbolic_opt_in_app_cell, _ = split_config_from(self._kavm.definition.init_config(KSort('OptInAssetCellMap')))
+        symbolic_opt_in_app_cell, _ = cell_template(self._kavm, KSort('OptInAssetCellMap'))
 
         sdk_fields_subst = Subst({})
 
@@ -0,0 +1,40 @@
+import threading
+from pathlib import Path
+from typing import Any, Dict, Final, Tuple
+
+from pyk.kast.inner import KInner, KSort
+from pyk.kast.manip import split_config_from
+
+_LOCK: Final = threading.Lock()
+_CELL_TEMPLATES: Final[Dict[Tuple[Path, KSort], Tuple[KInner, Dict[str, KInner]]]] = {}
+_EMPTY_CONFIGS: Final[Dict[Tuple[Path, KSort], KInner]] = {}
+
+
+def cell_template(kavm: Any, sort: KSort) -> Tuple[KInner, Dict[str, KInner]]:
+    """
+    The symbolic configuration of a cell sort split into a template with one variable per cell
+    and a substitution holding the initial values of the cells.
+
+    Computing the initial configuration walks the whole definition, so the result is computed
+    once per definition and sort and shared afterwards. Every caller gets its own copy of the substitution.
+    """
+    key = (kavm.definition_dir, sort)
+    with _LOCK:
+        template = _CELL_TEMPLATES.get(key)
+    if template is None:
+        template = split_config_from(kavm.definition.init_config(sort))
+        with _LOCK:
+            template = _CELL_TEMPLATES.setdefault(key, template)
+    config, subst = template
+    return config, dict(subst)
+
+
+def empty_config(kavm: Any, sort: KSort) -> KInner:
+    """The configuration of a cell sort with every leaf cell holding a variable, cached per definition and sort"""
+    key = (kavm.definition_dir, sort)
+    with _LOCK:
+        if key in _EMPTY_CONFIGS:
+            return _EMPTY_CONFIGS[key]
+    config = kavm.definition.empty_config(sort)
+    with _LOCK:
+        return _EMPTY_CONFIGS.setdefault(key, config)
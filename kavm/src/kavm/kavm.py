@@ -1,22 +1,30 @@
 import logging
 import os
+import re
 import subprocess
 import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from subprocess import CompletedProcess
-from typing import Final, Iterable, List, Optional, Tuple, Union, cast
+from typing import Any, Container, Dict, Final, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
-from pyk.kast.inner import KSort, KToken
-from pyk.kast.manip import get_cell
+from pyk.kast.inner import KSort
+from pyk.kast.outer import KDefinition
 from pyk.kast.pretty import SymbolTable, paren
 from pyk.kore import syntax as kore
-from pyk.kore.parser import KoreParser
 from pyk.ktool.kprove import KProve
-from pyk.ktool.krun import KRun, KRunOutput, _krun
+from pyk.ktool.krun import KRun
 from pyk.prelude.k import K
 from pyk.utils import BugReport, run_process
 
+from kavm.definition_registry import load_definition, load_symbol_table
+from kavm.executor import KAVMExecutionResult, KAVMExecutor
+from kavm.instrumentation import count, span, traced
+from kavm.kore_parser import parse_kore, parse_kore_file
+from kavm.kore_utils import kore_get_cell, kore_get_cell_str, kore_map_items, kore_teal_programs_map, kore_unwrap_str
 from kavm.scenario import KAVMScenario
+from kavm.teal_cache import TealProgramCache
 
 _LOGGER: Final = logging.getLogger(__name__)
 
@@ -60,122 +68,243 @@ class KAVM(KRun, KProve):
         self._scenario_parser = (
             scenario_parser if scenario_parser else definition_dir / 'parser_JSON_AVM-TESTING-SYNTAX'
         )
+        self._executor: Optional[KAVMExecutor] = None
+
+    @property
+    def definition(self) -> KDefinition:
+        """The KAST definition, loaded once per process and shared by all KAVM instances of the same definition"""
+        if self._definition is None:
+            self._definition = load_definition(self.definition_dir)
+        return self._definition
+
+    @property
+    def symbol_table(self) -> SymbolTable:
+        """The symbol table for pretty-printing, built once per process and definition"""
+        if self._symbol_table is None:
+            self._symbol_table = load_symbol_table(self.definition_dir, 'kavm', lambda: super(KAVM, self).symbol_table)
+        return self._symbol_table
 
     def parse_teal(self, file: Optional[Path]) -> kore.Pattern:
-        '''Parse a TEAL program with the fast Bison parser'''
+        '''Parse a TEAL program with the fast Bison parser, reusing earlier results for the same source'''
         if not (file):
             # return an error program
-            return KoreParser(
+            return parse_kore(
                 "inj{SortPseudoOpCode{}, SortTealInputPgm{}}(Lblint'UndsUnds'TEAL-OPCODES'Unds'PseudoOpCode'Unds'PseudoTUInt64{}(inj{SortInt{}, SortPseudoTUInt64{}}(\\dv{SortInt{}}(\"1\"))))"
-            ).pattern()
+            )
 
-        command = [str(self._teal_parser)] + [str(file)]
-        result = subprocess.run(command, stdout=subprocess.PIPE, check=True, text=True)
-        return KoreParser(result.stdout).pattern()
+        with span('kavm.parse_teal', file=file.name):
+            return self.teal_cache.parse(file)
 
+    @property
+    def teal_cache(self) -> TealProgramCache:
+        """The cache of parsed TEAL programs, persisted under the use directory"""
+        cache_dir = self.use_directory / 'teal-cache' if self.use_directory else None
+        return TealProgramCache.for_parser(self._teal_parser, cache_dir)
+
+    @traced('kavm.parse_teals')
     def parse_teals(self, teal_paths: Iterable[str], teal_sources_dir: Path) -> kore.Pattern:
         """Parse several TEAL progams and combine them into a single Kore pattern"""
+        return kore_teal_programs_map(
+            (str(teal_path), self.parse_teal(teal_sources_dir / teal_path)) for teal_path in teal_paths
+        )
 
-        map_union_op = "Lbl'Unds'Map'Unds'{}"
-        map_item_op = "Lbl'UndsPipe'-'-GT-Unds'{}"
-        empty_map_label = "Lbl'Stop'Map{}()"
-        current_teal_pgms_map = empty_map_label
-        for teal_path in teal_paths:
-            teal_path_parsed = 'inj{SortString{},SortKItem{}}(\\dv{SortString{}}("' + str(teal_path) + '"))'
-            teal_parsed = (
-                'inj{SortTealInputPgm{},SortKItem{}}(' + self.parse_teal(teal_sources_dir / teal_path).text + ')'
-            )
-            teal_kore_map_item = map_item_op + '(' + teal_path_parsed + ',' + teal_parsed + ')'
-            current_teal_pgms_map = map_union_op + "(" + current_teal_pgms_map + "," + teal_kore_map_item + ")"
+    @property
+    def executor(self) -> KAVMExecutor:
+        """The interpreter executor of this definition, resolved on first use and kept for the lifetime of the object"""
+        if self._executor is None:
+            self._executor = KAVMExecutor(self.definition_dir, scenario_parser=self._scenario_parser)
+        return self._executor
 
-        return KoreParser(current_teal_pgms_map).pattern()
+    def parse_scenario_teals(
+        self, scenario: KAVMScenario, decompiled_teal_dir: Optional[Path] = None, exclude: Container[str] = ()
+    ) -> kore.Pattern:
+        """Write out the TEAL programs of a scenario, except for the excluded ones, and parse them into a KORE map"""
+        if decompiled_teal_dir is None:
+            with tempfile.TemporaryDirectory() as tmp_teal_dir:
+                return self.parse_scenario_teals(scenario, Path(tmp_teal_dir), exclude)
+        teal_files = [teal_file for teal_file in scenario._teal_programs.keys() if teal_file not in exclude]
+        with span('kavm.write_teals'):
+            for teal_file in teal_files:
+                teal_src = scenario._teal_programs[teal_file]
+                (decompiled_teal_dir / teal_file).write_text(teal_src)
+                count('teal.bytes_written', len(teal_src))
+        return self.parse_teals(teal_files, decompiled_teal_dir)
 
+    @staticmethod
+    def teal_program_names(config: kore.Pattern) -> Set[str]:
+        """The names of the TEAL programs known to a KAVM configuration"""
+        teal_programs_cell = kore_get_cell(config, 'tealPrograms')
+        if teal_programs_cell is None:
+            return set()
+        names = (kore_unwrap_str(key) for key, _ in kore_map_items(teal_programs_cell.patterns[0]))
+        return {name for name in names if name is not None}
+
+    def run_scenario(
+        self,
+        scenario: KAVMScenario,
+        depth: Optional[int] = None,
+        existing_decompiled_teal_dir: Optional[Path] = None,
+        initial_state: Optional[kore.Pattern] = None,
+        state_dump: Optional[Path] = None,
+        parse_output: bool = False,
+    ) -> KAVMExecutionResult:
+        """
+        Execute an AVM simulation scenario on the LLVM interpreter and return the raw result
+
+        If `initial_state` is given, the scenario is evaluated on top of that configuration,
+        typically the final configuration of an earlier run, instead of the initial one.
+        If `state_dump` is given, the JSON state dumps of the run are written to that file instead of stderr.
+        If `parse_output` is set, the final configuration of a successful run is returned parsed, see `execute`.
+        """
+        if initial_state is None:
+            _LOGGER.info('Parsing TEAL_PROGRAMS')
+            parsed_teal = self.parse_scenario_teals(scenario, existing_decompiled_teal_dir)
+            _LOGGER.info('Constructing the initial configuration')
+            with span('kavm.init_config'):
+                init_config = self.executor.init_config(scenario.dictify(), parsed_teal.text)
+        else:
+            known_teal_programs = self.teal_program_names(initial_state)
+            new_teal_programs = None
+            if not set(scenario._teal_programs.keys()).issubset(known_teal_programs):
+                _LOGGER.info('Parsing new TEAL_PROGRAMS')
+                new_teal_programs = self.parse_scenario_teals(
+                    scenario, existing_decompiled_teal_dir, exclude=known_teal_programs
+                )
+            _LOGGER.info('Constructing the configuration from the initial state')
+            with span('kavm.resume_config'):
+                init_config = self.executor.resume_config(initial_state, scenario.dictify(), new_teal_programs)
+        _LOGGER.info('Running KAVM')
+        os.environ['KAVM_DEFINITION_DIR'] = str(self.definition_dir)
+        return self.executor.execute(init_config, depth=depth, state_dump=state_dump, parse_output=parse_output)
+
+    @traced('kavm.run_avm_json')
     def run_avm_json(
         self,
         scenario: KAVMScenario,
         depth: Optional[int] = None,
-        profile: bool = False,
-        check: bool = True,
         existing_decompiled_teal_dir: Optional[Path] = None,
         rerun_on_error: bool = False,
         output: str = "kore",
+        initial_state: Optional[kore.Pattern] = None,
+        state_dump: Optional[Path] = None,
     ) -> Tuple[kore.Pattern, str]:
-        """Run an AVM simulaion scenario with krun"""
+        """
+        Run an AVM simulaion scenario on the LLVM interpreter, see `run_scenario`
 
-        with tempfile.NamedTemporaryFile('w+t', delete=False) as tmp_scenario_file, (
-            existing_decompiled_teal_dir if existing_decompiled_teal_dir else tempfile.TemporaryDirectory()  # type: ignore
-        ) as decompiled_teal_dir, tempfile.NamedTemporaryFile('w+t', delete=False) as tmp_teals_file:
-            _LOGGER.info('Parsing TEAL_PROGRAMS')
-            for teal_file, teal_src in scenario._teal_programs.items():
-                (Path(decompiled_teal_dir) / teal_file).write_text(teal_src)
-            parsed_teal = self.parse_teals(scenario._teal_programs.keys(), Path(decompiled_teal_dir))
-            tmp_teals_file.write(parsed_teal.text)
-            tmp_teals_file.flush()
-
-            _LOGGER.info(f'Writing scenario JSON to {tmp_scenario_file.name}')
-            tmp_scenario_file.write(scenario.to_json())
-            tmp_scenario_file.flush()
-            _LOGGER.info('Running KAVM')
-            os.environ['KAVM_DEFINITION_DIR'] = str(self.definition_dir)
-
-            try:
-                if output == "kore":
-                    proc_result = _krun(
-                        input_file=Path(tmp_scenario_file.name),
-                        definition_dir=self.definition_dir,
-                        output=KRunOutput.KORE,
-                        depth=depth,
-                        no_expand_macros=False,
-                        check=check,
-                        cmap={'TEAL_PROGRAMS': tmp_teals_file.name},
-                        pmap={'TEAL_PROGRAMS': str(self._catcat_parser)},
-                        pipe_stderr=True,
-                    )
-                    if proc_result.returncode != 0:
-                        raise RuntimeError('Non-zero exit-code from krun.')
-
-                    parser = KoreParser(proc_result.stdout)
-                    final_pattern = parser.pattern()
-                    assert parser.eof
-                if output == "pretty":
-                    proc_result = _krun(
-                        input_file=Path(tmp_scenario_file.name),
-                        definition_dir=self.definition_dir,
-                        output=KRunOutput.PRETTY,
-                        depth=depth,
-                        no_expand_macros=False,
-                        check=check,
-                        cmap={'TEAL_PROGRAMS': tmp_teals_file.name},
-                        pmap={'TEAL_PROGRAMS': str(self._catcat_parser)},
-                        pipe_stderr=True,
-                    )
-                    if proc_result.returncode != 0:
-                        raise RuntimeError('Non-zero exit-code from krun.')
-
-                    final_pattern = proc_result.stdout
-
-                return final_pattern, proc_result.stderr
-            except RuntimeError as err:
-                # if _krun has thtown a RuntimeError, rerun with --output pretty to see the final state quicker
-                if rerun_on_error:
-                    rerun_result = _krun(
-                        input_file=Path(tmp_scenario_file.name),
-                        definition_dir=self.definition_dir,
-                        output=KRunOutput.PRETTY,
-                        depth=depth,
-                        no_expand_macros=False,
-                        check=False,
-                        cmap={'TEAL_PROGRAMS': tmp_teals_file.name},
-                        pmap={'TEAL_PROGRAMS': str(self._catcat_parser)},
-                        pipe_stderr=True,
-                    )
-                    raise RuntimeError(f'Final configuration was: {rerun_result.stdout}') from err
-                # otherwise, try to establish the reason from the output Kore
-                else:
-                    parser = KoreParser(err.args[1])
-                    final_pattern = parser.pattern()
-                    returnstatus = cast(KToken, get_cell(self.kore_to_kast(final_pattern), 'RETURNSTATUS_CELL')).token
-                    raise RuntimeError(returnstatus) from err
+        Raise a RuntimeError with the return status, or, if `rerun_on_error` is set, the pretty-printed
+        final configuration, if the scenario fails. The scenario is executed only once in either case.
+        The final configuration is returned parsed by default, pretty-printed if `output` is "pretty"
+        and as the unparsed KORE text if `output` is "text".
+        A scenario without "submit-transactions" stages only sets up the network and leaves the return code at 4,
+        which counts as success.
+        """
+
+        result = self.run_scenario(
+            scenario, depth, existing_decompiled_teal_dir, initial_state, state_dump, parse_output=output == "kore"
+        )
+
+        setup_only = result.returncode == 4 and not scenario.execution_stages
+        if result.returncode != 0 and not setup_only:
+            # show the pretty-printed final state of the failed run
+            if rerun_on_error:
+                final_state = self.pretty_print(self.kore_to_kast(self._parse_kore(result.output)))
+                raise RuntimeError(f'Final configuration was: {final_state}', result.output, result.stderr)
+            # otherwise, establish the reason from the output Kore
+            returnstatus = kore_get_cell_str(result.output, 'returnstatus')
+            raise RuntimeError(returnstatus, result.output, result.stderr)
+
+        if output == "pretty":
+            return self.pretty_print(self.kore_to_kast(self._parse_kore(result.output))), result.stderr  # type: ignore
+        if output == "text":
+            return result.output, result.stderr  # type: ignore
+        if result.pattern is None:
+            # only the configuration of a successful run is parsed by the executor
+            return self._parse_kore(result.output), result.stderr
+        return result.pattern, result.stderr
+
+    def run_with_checkpoints(
+        self,
+        scenario: KAVMScenario,
+        checkpoint_dir: Path,
+        checkpoint_after: Optional[Iterable[int]] = None,
+        depth: Optional[int] = None,
+        existing_decompiled_teal_dir: Optional[Path] = None,
+        resume_from: Optional[Path] = None,
+    ) -> Tuple[kore.Pattern, str]:
+        """
+        Run a multi-stage AVM simulation scenario, saving the configuration after the given stages
+
+        The checkpoint taken after stage N, counting "submit-transactions" stages from 1, is written to
+        `checkpoint_dir/stage-N.kore`; by default a checkpoint is taken after every stage.
+        The final configuration is always saved. If `resume_from` is a checkpoint saved by an earlier run of
+        the same scenario, the stages up to that checkpoint are skipped and the simulation continues from it.
+        Raise a RuntimeError if a stage fails, see `run_avm_json`.
+        """
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        if checkpoint_after is None:
+            checkpoint_after = range(1, len(scenario.execution_stages) + 1)
+        state = None
+        last_stage = 0
+        if resume_from is not None:
+            state, last_stage = self.load_checkpoint(resume_from)
+            scenario = scenario.after_stage(last_stage)
+            checkpoint_after = [stage - last_stage for stage in checkpoint_after]
+        stderrs = []
+        for segment in scenario.split(checkpoint_after):
+            state, stderr = self.run_avm_json(
+                segment,
+                depth=depth,
+                existing_decompiled_teal_dir=existing_decompiled_teal_dir,
+                initial_state=state,
+            )
+            stderrs.append(stderr)
+            last_stage += len(segment.execution_stages)
+            checkpoint_file = checkpoint_dir / f'stage-{last_stage}.kore'
+            _LOGGER.info(f'Saving checkpoint {checkpoint_file}')
+            checkpoint_file.write_text(state.text)
+        assert state is not None
+        return state, ''.join(stderrs)
+
+    @staticmethod
+    def load_checkpoint(checkpoint_file: Path) -> Tuple[kore.Pattern, int]:
+        """Load a checkpoint saved by `run_with_checkpoints` and the number of the stage it was taken after"""
+        match = re.fullmatch(r'stage-(\d+)\.kore', checkpoint_file.name)
+        if not match:
+            raise ValueError(f'Not a KAVM checkpoint file: {checkpoint_file}')
+        with span('kavm.parse_kore'):
+            return parse_kore_file(checkpoint_file), int(match.group(1))
+
+    def run_many(
+        self,
+        scenario_files: Iterable[Path],
+        teal_sources_dir: Optional[Path] = None,
+        depth: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run JSON scenarios on a pool of worker processes and yield their results as they complete.
+
+        Every worker loads the definition once and parses TEAL programs through the on-disk cache in
+        the use directory, so programs shared by several scenarios are parsed only once.
+        Each result records the scenario file, the exit code, the return status and the wall-clock
+        time of the run in seconds.
+        """
+        with ProcessPoolExecutor(
+            max_workers=workers if workers else os.cpu_count(),
+            initializer=_init_run_many_worker,
+            initargs=(self.definition_dir, self.use_directory),
+        ) as pool:
+            futures = [
+                pool.submit(_run_many_worker, scenario_file, teal_sources_dir, depth)
+                for scenario_file in scenario_files
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    @staticmethod
+    def _parse_kore(text: str) -> kore.Pattern:
+        with span('kavm.parse_kore'):
+            return parse_kore(text)
 
     def kast(
         self,
@@ -221,3 +350,30 @@ class KAVM(KRun, KProve):
     @staticmethod
     def concrete_rules() -> List[str]:
         return []
+
+
+_RUN_MANY_KAVM: Optional[KAVM] = None
+
+
+def _init_run_many_worker(definition_dir: Path, use_directory: Optional[Path]) -> None:
+    global _RUN_MANY_KAVM
+    _RUN_MANY_KAVM = KAVM(definition_dir=definition_dir, use_directory=use_directory)
+
+
+def _run_many_worker(scenario_file: Path, teal_sources_dir: Optional[Path], depth: Optional[int]) -> Dict[str, Any]:
+    assert _RUN_MANY_KAVM is not None, 'the worker has not been initialized'
+    start = time.perf_counter()
+    try:
+        scenario = KAVMScenario.from_json(scenario_file.read_text(), teal_sources_dir)
+        result = _RUN_MANY_KAVM.run_scenario(scenario, depth=depth)
+        returncode = result.returncode
+        status = kore_get_cell_str(result.output, 'returnstatus')
+    except (ValueError, OSError, RuntimeError, subprocess.CalledProcessError) as err:
+        returncode = -1
+        status = f'{type(err).__name__}: {err}'
+    return {
+        'scenario': str(scenario_file),
+        'returncode': returncode,
+        'status': status,
+        'time': time.perf_counter() - start,
+    }
@@ -0,0 +1,276 @@
+"""
+A fast parser for concrete KORE patterns.
+
+The final configurations of the interpreter run into megabytes, and `KoreParser` needs them as a single
+`str` and descends into nested patterns recursively. `parse_kore` tokenizes a bytes-like object with a single
+regular expression and builds the `pyk.kore.syntax` patterns bottom-up with an explicit stack, so it works
+directly on a memory-mapped file, see `parse_kore_file`, and on patterns of any depth.
+
+Only the constructs of concrete patterns are supported: applications, domain values, `\\left-assoc` and
+`\\right-assoc`. Anything else, like variables or matching logic connectives, falls back to `KoreParser`,
+as do string literals with escape sequences, so the result is always what `KoreParser` would have returned.
+
+To extract a single cell of a configuration, like the state dumps, `read_cell` scans the text for the cell's symbol
+and only parses the pattern inside it. `kore_to_json` decodes the JSON terms the semantics stores in the
+configuration, iteratively as well, so deeply nested terms, like long lists, do not hit the recursion limit.
+"""
+
+import logging
+import mmap
+import re
+from pathlib import Path
+from typing import Any, Dict, Final, Iterator, List, Optional, Tuple, Union
+
+from pyk.kore import syntax as kore
+from pyk.kore.parser import KoreParser
+
+from kavm.instrumentation import count
+from kavm.kore_utils import kore_cell_symbol
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# a symbol or sort name, a string literal, punctuation, or any other character, which is an error
+_TOKEN_RE: Final = re.compile(rb'\s*(?:(\\?[A-Za-z][A-Za-z0-9\'\-]*)|"((?:[^"\\]|\\.)*)"|([{}(),])|(\S))')
+
+KORE_DV: Final = b'\\dv'
+KORE_LEFT_ASSOC: Final = b'\\left-assoc'
+KORE_RIGHT_ASSOC: Final = b'\\right-assoc'
+
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+class UnsupportedKore(ValueError):
+    """Raised by the fast parser for well-formed KORE outside the concrete fragment it supports"""
+
+
+def _expect(tokens: Iterator[re.Match], punctuation: bytes) -> None:
+    match = next(tokens, None)
+    if match is None:
+        raise ValueError(f'Expected {punctuation.decode()!r} at the end of the KORE input')
+    if match.group(3) != punctuation:
+        if punctuation == b'{':
+            # a name without parameters is a variable
+            raise UnsupportedKore(f'Variable or unexpected {match.group().strip()!r} at position {match.start()}')
+        raise ValueError(f'Expected {punctuation.decode()!r} at position {match.start()}')
+
+
+def _read_sorts(tokens: Iterator[re.Match], sort_cache: Dict[bytes, kore.Sort]) -> Tuple[kore.Sort, ...]:
+    """Read the sort parameters of a symbol, which must start with the next token"""
+    _expect(tokens, b'{')
+    stack: List[Tuple[Optional[bytes], List[kore.Sort]]] = [(None, [])]
+    for match in tokens:
+        name, _, punctuation, _ = match.groups()
+        if name is not None:
+            _expect(tokens, b'{')
+            stack.append((name, []))
+        elif punctuation == b'}':
+            name, params = stack.pop()
+            if name is None:
+                return tuple(params)
+            if params:
+                sort: kore.Sort = kore.SortApp(name.decode(), tuple(params))
+            else:
+                sort = sort_cache.get(name) or sort_cache.setdefault(name, kore.SortApp(name.decode()))
+            stack[-1][1].append(sort)
+        elif punctuation != b',':
+            raise ValueError(f'Unexpected {match.group().strip()!r} in sort parameters at position {match.start()}')
+    raise ValueError('Unexpected end of the KORE input in sort parameters')
+
+
+def _string(body: bytes) -> kore.String:
+    if b'\\' not in body:
+        return kore.String(body.decode())
+    # leave escape sequences to pyk, so their decoding matches `KoreParser`
+    return KoreParser(f'\\dv{{SortString{{}}}}("{body.decode()}")').pattern().value  # type: ignore
+
+
+def _build(symbol: bytes, sorts: Tuple[kore.Sort, ...], args: List) -> kore.Pattern:
+    if symbol == KORE_DV:
+        if len(sorts) != 1 or len(args) != 1 or not isinstance(args[0], bytes):
+            raise ValueError('Malformed domain value')
+        return kore.DV(sorts[0], _string(args[0]))
+    if symbol == KORE_LEFT_ASSOC or symbol == KORE_RIGHT_ASSOC:
+        if sorts or len(args) != 1 or not isinstance(args[0], kore.App):
+            raise ValueError(f'Malformed {symbol.decode()}')
+        return kore.LeftAssoc(args[0]) if symbol == KORE_LEFT_ASSOC else kore.RightAssoc(args[0])
+    if symbol.startswith(b'\\'):
+        raise UnsupportedKore(f'Unsupported KORE connective {symbol.decode()}')
+    return kore.App(symbol.decode(), sorts, tuple(args))
+
+
+def _parse_concrete(data: Buffer, pos: int = 0) -> Tuple[kore.Pattern, int]:
+    """Parse the concrete pattern starting at `pos` and return it together with the position after it"""
+    tokens = _TOKEN_RE.finditer(data, pos)  # type: ignore
+    sort_cache: Dict[bytes, kore.Sort] = {}
+    # the symbol, sorts and arguments parsed so far of every enclosing application
+    stack: List[Tuple[bytes, Tuple[kore.Sort, ...], List]] = []
+    result: Optional[kore.Pattern] = None
+    end = pos
+    # set after '(' and ',', where the next token must start an argument, or be the ')' of an empty application
+    separated = False
+    for match in tokens:
+        symbol, string, punctuation, _ = match.groups()
+        if symbol is not None:
+            sorts = _read_sorts(tokens, sort_cache)
+            _expect(tokens, b'(')
+            stack.append((symbol, sorts, []))
+            separated = True
+        elif string is not None:
+            if not stack or stack[-1][0] != KORE_DV:
+                raise ValueError(f'Unexpected string literal at position {match.start()}')
+            stack[-1][2].append(string)
+            separated = False
+        elif punctuation == b')' and stack and not (separated and stack[-1][2]):
+            symbol, sorts, args = stack.pop()
+            pattern = _build(symbol, sorts, args)
+            if not stack:
+                result = pattern
+                end = match.end()
+                break
+            stack[-1][2].append(pattern)
+            separated = False
+        elif punctuation == b',' and stack and not separated:
+            separated = True
+        else:
+            raise ValueError(f'Unexpected {match.group().strip()!r} at position {match.start()}')
+    if result is None:
+        raise ValueError('Unexpected end of the KORE input')
+    return result, end
+
+
+def _parse_with_pyk(text: str) -> kore.Pattern:
+    parser = KoreParser(text)
+    pattern = parser.pattern()
+    if not parser.eof:
+        raise ValueError('Unexpected KORE text after the pattern')
+    return pattern
+
+
+def parse_kore(data: Union[str, Buffer]) -> kore.Pattern:
+    """Parse a single KORE pattern, falling back to `KoreParser` outside of the concrete fragment"""
+    buffer = data.encode() if isinstance(data, str) else data
+    count('kore.bytes_parsed', len(buffer))
+    try:
+        pattern, end = _parse_concrete(buffer)
+    except UnsupportedKore as err:
+        _LOGGER.debug(f'Parsing KORE with KoreParser: {err}')
+        return _parse_with_pyk(data if isinstance(data, str) else bytes(data).decode())
+    trailing = _TOKEN_RE.match(buffer, end)  # type: ignore
+    if trailing is not None:
+        raise ValueError(f'Unexpected {trailing.group().strip()!r} after the pattern at position {trailing.start()}')
+    return pattern
+
+
+def parse_kore_file(file: Path) -> kore.Pattern:
+    """Parse the KORE pattern in a file through a memory map, without reading the file into a `str`"""
+    with file.open('rb') as f:
+        if f.seek(0, 2) == 0:
+            raise ValueError(f'Empty KORE file: {file}')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return parse_kore(data)
+
+
+def read_cell(data: Union[str, Buffer], cell_name: str) -> Optional[kore.Pattern]:
+    """Find the first occurrence of a cell in the KORE text of a configuration and parse its contents"""
+    buffer = data.encode() if isinstance(data, str) else data
+    match = re.search(re.escape(kore_cell_symbol(cell_name).encode()) + rb'\{\}\(', buffer)  # type: ignore
+    if not match:
+        return None
+    content, _ = _parse_concrete(buffer, match.end())
+    return content
+
+
+class _JSONs:
+    """The items of a `JSONs` list in reverse order, to prepend the heads of the cons cells in constant time"""
+
+    __slots__ = ('reversed_items',)
+
+    def __init__(self, reversed_items: List[Any]) -> None:
+        self.reversed_items = reversed_items
+
+
+class _JSONEntry:
+    __slots__ = ('key', 'value')
+
+    def __init__(self, key: str, value: Any) -> None:
+        self.key = key
+        self.value = value
+
+
+def _decode_dv(dv: kore.DV) -> Any:
+    sort = dv.sort.name
+    value = dv.value.value
+    if sort == 'SortString':
+        return value
+    if sort == 'SortInt':
+        return int(value)
+    if sort == 'SortBool':
+        return value == 'true'
+    if sort == 'SortFloat':
+        return float(value)
+    raise ValueError(f'Cannot decode a domain value of sort {sort}')
+
+
+def _combine(symbol: str, args: List[Any]) -> Any:
+    if symbol == 'inj':
+        return args[0]
+    if symbol == 'LblJSONs':
+        tail = args[-1]
+        tail.reversed_items.extend(reversed(args[:-1]))
+        return tail
+    if symbol == "Lbl'Stop'List'LBraQuot'JSONs'QuotRBra'":
+        return _JSONs([])
+    if symbol == 'LblJSONEntry':
+        return _JSONEntry(args[0], args[1])
+    if symbol == 'LblJSONObject':
+        return {entry.key: entry.value for entry in reversed(args[0].reversed_items)}
+    if symbol == 'LblJSONList':
+        return list(reversed(args[0].reversed_items))
+    if symbol == 'LblJSONnull':
+        return None
+    if symbol == "Lbl'Unds'List'Unds'":
+        return [item for arg in args for item in arg]
+    if symbol == 'LblListItem':
+        return [args[0]]
+    if symbol == "Lbl'Stop'List":
+        return []
+    raise ValueError(f'Cannot decode KORE symbol {symbol} as JSON')
+
+
+def kore_to_json(pattern: kore.Pattern) -> Any:
+    """
+    Decode a KORE pattern built from the constructors of the JSON sort, K lists and domain values into Python values
+
+    K lists become Python lists, so a `List` of `JSON` items, like the `<state-dumps>` cell, is decoded as a list.
+    """
+    results: List[Any] = []
+    stack: List[Tuple[kore.Pattern, bool]] = [(pattern, False)]
+    while stack:
+        current, expanded = stack.pop()
+        if isinstance(current, kore.DV):
+            results.append(_decode_dv(current))
+            continue
+        if isinstance(current, (kore.LeftAssoc, kore.RightAssoc)):
+            current = current.app
+        if not isinstance(current, kore.App):
+            raise ValueError(f'Cannot decode KORE pattern {type(current).__name__} as JSON')
+        if not expanded:
+            stack.append((current, True))
+            stack.extend((arg, False) for arg in reversed(current.patterns))
+            continue
+        arity = len(current.patterns)
+        args = results[len(results) - arity :] if arity else []
+        del results[len(results) - arity :]
+        results.append(_combine(current.symbol, args))
+    (result,) = results
+    if isinstance(result, _JSONs):
+        return list(reversed(result.reversed_items))
+    return result
+
+
+def read_state_dumps(data: Union[str, Buffer]) -> List[Dict[str, Any]]:
+    """The JSON state dumps of a final KAVM configuration, one for each evaluated "submit-transactions" stage"""
+    state_dumps = read_cell(data, 'state-dumps')
+    if state_dumps is None:
+        raise ValueError('The configuration does not contain the <state-dumps> cell')
+    return kore_to_json(state_dumps)
@@ -0,0 +1,273 @@
+"""Helpers for building KAVM configurations directly in KORE"""
+
+import re
+from typing import Any, Final, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from pyk.kore import syntax as kore
+
+KORE_MAP_UNION: Final = "Lbl'Unds'Map'Unds'"
+KORE_MAP_ITEM: Final = "Lbl'UndsPipe'-'-GT-Unds'"
+KORE_MAP_UNIT: Final = "Lbl'Stop'Map"
+KORE_CELL_PREFIX: Final = "Lbl'-LT-'"
+KORE_JSONS: Final = 'LblJSONs'
+KORE_JSONS_UNIT: Final = "Lbl'Stop'List'LBraQuot'JSONs'QuotRBra'"
+
+
+_KORE_ESCAPES: Final = {'"': '\\"', '\\': '\\\\', '\n': '\\n', '\t': '\\t', '\r': '\\r', '\f': '\\f'}
+
+
+def kore_str(value: str) -> str:
+    """Escape a Python string as a KORE string literal"""
+
+    def escape(char: str) -> str:
+        if char in _KORE_ESCAPES:
+            return _KORE_ESCAPES[char]
+        code = ord(char)
+        if 32 <= code < 127:
+            return char
+        if code < 0x100:
+            return f'\\x{code:02x}'
+        if code < 0x10000:
+            return f'\\u{code:04x}'
+        return f'\\U{code:08x}'
+
+    if value.isascii() and value.isprintable() and '"' not in value and '\\' not in value:
+        return '"' + value + '"'
+    return '"' + ''.join(escape(char) for char in value) + '"'
+
+
+_KORE_UNESCAPES: Final = {'"': '"', '\\': '\\', 'n': '\n', 't': '\t', 'r': '\r', 'f': '\f'}
+_KORE_ESCAPE_RE: Final = re.compile(r'\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)')
+
+
+def kore_unescape(literal: str) -> str:
+    """Decode the body of a KORE string literal, i.e. the text between the quotes"""
+    if '\\' not in literal:
+        return literal
+
+    def unescape(match: re.Match) -> str:
+        escape = match.group(1)
+        if len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        if escape not in _KORE_UNESCAPES:
+            raise ValueError(f'Invalid escape sequence in KORE string: \\{escape}')
+        return _KORE_UNESCAPES[escape]
+
+    return _KORE_ESCAPE_RE.sub(unescape, literal)
+
+
+def kore_get_cell_str(text: str, cell_name: str) -> Optional[str]:
+    """Extract the value of a cell holding a string directly from the KORE text of a configuration"""
+    cell_re = re.escape(kore_cell_symbol(cell_name)) + r'\{\}\(\s*\\dv\{SortString\{\}\}\(\s*"((?:[^"\\]|\\.)*)"'
+    match = re.search(cell_re, text)
+    return kore_unescape(match.group(1)) if match else None
+
+
+def kore_inj(from_sort: str, to_sort: str, pattern: str) -> str:
+    return f'inj{{Sort{from_sort}{{}}, Sort{to_sort}{{}}}}({pattern})'
+
+
+def kore_dv(sort: str, value: str) -> str:
+    return f'\\dv{{Sort{sort}{{}}}}({kore_str(value)})'
+
+
+def kore_json(value: Any, sort_keys: bool = False) -> str:
+    """
+    Encode a value decoded from JSON as the KORE text of the `JSON` term the Bison parser produces for it
+
+    Objects keep the order of their keys, unless `sort_keys` is set, which mirrors `json.dumps(..., sort_keys=True)`.
+    Raise a TypeError for values that have no JSON representation and for floats, whose KORE encoding is left
+    to the parser.
+    """
+    parts: List[str] = []
+    # values still to encode, tagged True, and text to emit as it is, tagged False, in reverse order
+    stack: List[Tuple[bool, Any]] = [(True, value)]
+    while stack:
+        is_value, current = stack.pop()
+        if not is_value:
+            parts.append(current)
+        elif current is None:
+            parts.append('LblJSONnull{}()')
+        elif current is True or current is False:
+            parts.append(kore_inj('Bool', 'JSON', kore_dv('Bool', 'true' if current else 'false')))
+        elif isinstance(current, int):
+            parts.append(kore_inj('Int', 'JSON', kore_dv('Int', str(int(current)))))
+        elif isinstance(current, str):
+            parts.append(kore_inj('String', 'JSON', kore_dv('String', current)))
+        elif isinstance(current, (dict, list, tuple)):
+            items: List[Tuple[bool, Any]] = []
+            if isinstance(current, dict):
+                keys = sorted(current) if sort_keys else list(current)
+                for key in keys:
+                    if not isinstance(key, str):
+                        raise TypeError(f'Cannot encode the non-string JSON key {key!r} in KORE')
+                    json_key = kore_inj('String', 'JSONKey', kore_dv('String', key))
+                    items.append((False, f'{KORE_JSONS}{{}}(LblJSONEntry{{}}({json_key}, '))
+                    items.append((True, current[key]))
+                    items.append((False, '), '))
+            else:
+                for item in current:
+                    items.append((False, f'{KORE_JSONS}{{}}('))
+                    items.append((True, item))
+                    items.append((False, ', '))
+            constructor = 'LblJSONObject' if isinstance(current, dict) else 'LblJSONList'
+            closing = ')' * (len(items) // 3)
+            stack.append((False, f'{KORE_JSONS_UNIT}{{}}(){closing})'))
+            stack.extend(reversed(items))
+            stack.append((False, f'{constructor}{{}}('))
+        else:
+            raise TypeError(f'Cannot encode a value of type {type(current).__name__} as JSON in KORE')
+    return ''.join(parts)
+
+
+def kore_map_item(key: str, value: str) -> str:
+    return f'{KORE_MAP_ITEM}{{}}({key},{value})'
+
+
+def kore_map(items: Iterable[str]) -> str:
+    """Combine a sequence of map items into a single map, associating to the left"""
+    result = f'{KORE_MAP_UNIT}{{}}()'
+    for item in items:
+        result = f'{KORE_MAP_UNION}{{}}({result},{item})'
+    return result
+
+
+def kore_init_config(pgm: str, teal_programs: str) -> str:
+    """
+    Construct the initial KAVM configuration from the KORE text of
+    the $PGM:JSON scenario and the $TEAL_PROGRAMS:Map map of parsed programs,
+    mirroring what krun passes to the interpreter
+    """
+    config_vars = kore_map(
+        [
+            kore_map_item(
+                kore_inj('KConfigVar', 'KItem', kore_dv('KConfigVar', '$PGM')),
+                kore_inj('JSON', 'KItem', pgm),
+            ),
+            kore_map_item(
+                kore_inj('KConfigVar', 'KItem', kore_dv('KConfigVar', '$TEAL_PROGRAMS')),
+                kore_inj('Map', 'KItem', teal_programs),
+            ),
+        ]
+    )
+    return f'LblinitGeneratedTopCell{{}}({config_vars})'
+
+
+def kore_cell_symbol(cell_name: str) -> str:
+    """The KORE symbol of a configuration cell, e.g. `Lbl'-LT-'k'-GT-'` for `<k>`"""
+    return f"{KORE_CELL_PREFIX}{cell_name}'-GT-'"
+
+
+def kore_assoc_args(pattern: kore.Pattern) -> Tuple[kore.Pattern, ...]:
+    """Arguments of an application, looking through `\\left-assoc` and `\\right-assoc`"""
+    if isinstance(pattern, (kore.LeftAssoc, kore.RightAssoc)):
+        return tuple(pattern.app.patterns)
+    if isinstance(pattern, kore.App):
+        return tuple(pattern.patterns)
+    return ()
+
+
+def kore_symbol(pattern: kore.Pattern) -> Optional[str]:
+    """The head symbol of an application, looking through `\\left-assoc` and `\\right-assoc`"""
+    if isinstance(pattern, (kore.LeftAssoc, kore.RightAssoc)):
+        return pattern.app.symbol
+    if isinstance(pattern, kore.App):
+        return pattern.symbol
+    return None
+
+
+def kore_get_cell(config: kore.Pattern, cell_name: str) -> Optional[kore.App]:
+    """Find a cell in a configuration, descending only through other cells"""
+    symbol = kore_cell_symbol(cell_name)
+    worklist = [config]
+    while worklist:
+        pattern = worklist.pop()
+        if not isinstance(pattern, kore.App) or not pattern.symbol.startswith(KORE_CELL_PREFIX):
+            continue
+        if pattern.symbol == symbol:
+            return pattern
+        worklist.extend(pattern.patterns)
+    return None
+
+
+def kore_set_cells(config: kore.Pattern, contents: Mapping[str, kore.Pattern]) -> kore.Pattern:
+    """Replace the contents of cells in a configuration, descending only through other cells"""
+    replacements = {kore_cell_symbol(cell_name): content for cell_name, content in contents.items()}
+
+    def set_cells(pattern: kore.Pattern) -> kore.Pattern:
+        if not isinstance(pattern, kore.App) or not pattern.symbol.startswith(KORE_CELL_PREFIX):
+            return pattern
+        if pattern.symbol in replacements:
+            return kore.App(pattern.symbol, pattern.sorts, (replacements[pattern.symbol],))
+        args = tuple(set_cells(arg) for arg in pattern.patterns)
+        if all(new_arg is arg for new_arg, arg in zip(args, pattern.patterns)):
+            return pattern
+        return kore.App(pattern.symbol, pattern.sorts, args)
+
+    return set_cells(config)
+
+
+def kore_unwrap_str(pattern: kore.Pattern) -> Optional[str]:
+    """The value of a (possibly injected) string domain value"""
+    while isinstance(pattern, kore.App) and pattern.symbol == 'inj':
+        pattern = pattern.patterns[0]
+    if isinstance(pattern, kore.DV):
+        return pattern.value.value
+    return None
+
+
+def kore_map_items(pattern: kore.Pattern) -> Iterator[Tuple[kore.Pattern, kore.Pattern]]:
+    """Iterate over the items of a concrete KORE map"""
+    worklist = [pattern]
+    while worklist:
+        current = worklist.pop()
+        symbol = kore_symbol(current)
+        if symbol == KORE_MAP_ITEM:
+            key, value = kore_assoc_args(current)
+            yield key, value
+        elif symbol == KORE_MAP_UNION:
+            worklist.extend(reversed(kore_assoc_args(current)))
+
+
+def kore_injection(from_sort: str, to_sort: str, pattern: kore.Pattern) -> kore.App:
+    return kore.App('inj', (kore.SortApp(f'Sort{from_sort}'), kore.SortApp(f'Sort{to_sort}')), (pattern,))
+
+
+def kore_k_sequence(sort: str, pattern: kore.Pattern) -> kore.Pattern:
+    """A K sequence consisting of a single item of the given sort"""
+    return kore.App('kseq', (), (kore_injection(sort, 'KItem', pattern), kore.App('dotk', (), ())))
+
+
+def kore_map_of(items: Iterable[kore.Pattern]) -> kore.Pattern:
+    """
+    Combine map items into a single map.
+
+    The unions are nested as a balanced tree, so the depth of the result,
+    and hence the recursion needed to print or traverse it, is logarithmic in the number of items.
+    """
+    layer: List[kore.Pattern] = list(items)
+    if not layer:
+        return kore.App(KORE_MAP_UNIT, (), ())
+    while len(layer) > 1:
+        next_layer: List[kore.Pattern] = [
+            kore.App(KORE_MAP_UNION, (), (layer[i], layer[i + 1])) for i in range(0, len(layer) - 1, 2)
+        ]
+        if len(layer) % 2:
+            next_layer.append(layer[-1])
+        layer = next_layer
+    return layer[0]
+
+
+def kore_teal_programs_map(programs: Iterable[Tuple[str, kore.Pattern]]) -> kore.Pattern:
+    """Construct the `$TEAL_PROGRAMS` map from pairs of program names and parsed programs"""
+    return kore_map_of(
+        kore.App(
+            KORE_MAP_ITEM,
+            (),
+            (
+                kore_injection('String', 'KItem', kore.DV(kore.SortApp('SortString'), kore.String(name))),
+                kore_injection('TealInputPgm', 'KItem', program),
+            ),
+        )
+        for name, program in programs
+    )
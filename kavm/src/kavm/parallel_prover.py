@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any, Final, Iterable, Iterator, List, Optional
+
+from pyk.kcfg.explore import KCFGExplore
+from pyk.kcfg.kcfg import KCFG
+from pyk.ktool.kprint import KPrint
+from pyk.proof.reachability import APRProof, APRProver
+from pyk.utils import BugReport
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+
+class ProofLock:
+    """
+    Mutual exclusion for the KCFG of a proof explored by several threads.
+
+    A thread holds the lock while it inspects or modifies the KCFG and releases it, with `unlocked`,
+    for the duration of its requests to the kore-rpc server, which is where the time is spent.
+    """
+
+    _lock: threading.Lock
+    _owner: threading.local
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._owner = threading.local()
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        with self._lock:
+            self._owner.holds = True
+            try:
+                yield
+            finally:
+                self._owner.holds = False
+
+    @contextmanager
+    def unlocked(self) -> Iterator[None]:
+        if not getattr(self._owner, 'holds', False):
+            yield
+            return
+        self._owner.holds = False
+        self._lock.release()
+        try:
+            yield
+        finally:
+            self._lock.acquire()
+            self._owner.holds = True
+
+
+class SharedKCFGExplore(KCFGExplore):
+    """A KCFGExplore whose requests to the kore-rpc server do not block other explorers of the same proof"""
+
+    _proof_lock: ProofLock
+
+    def __init__(self, kprint: KPrint, proof_lock: ProofLock, **kwargs: Any) -> None:
+        super().__init__(kprint, **kwargs)
+        self._proof_lock = proof_lock
+
+    @property
+    def proof_lock(self) -> ProofLock:
+        return self._proof_lock
+
+    def cterm_execute(self, *args: Any, **kwargs: Any) -> Any:
+        with self._proof_lock.unlocked():
+            return super().cterm_execute(*args, **kwargs)
+
+    def cterm_implies(self, *args: Any, **kwargs: Any) -> Any:
+        with self._proof_lock.unlocked():
+            return super().cterm_implies(*args, **kwargs)
+
+    def cterm_simplify(self, *args: Any, **kwargs: Any) -> Any:
+        with self._proof_lock.unlocked():
+            return super().cterm_simplify(*args, **kwargs)
+
+
+class ParallelAPRProver:
+    """
+    Advance an all-path reachability proof by expanding several frontier nodes of its KCFG at the same time.
+
+    Every worker owns a kore-rpc server, see `parallel_kcfg_explores`. In each round, up to one pending node
+    per worker is advanced, the KCFG is updated under a `ProofLock` and the proof is written to disk
+    between the rounds, exactly as `APRProver.advance_proof` does after every node.
+    With a single worker, it advances the proof one node at a time like `APRProver`.
+    """
+
+    proof: APRProof
+    _proof_lock: ProofLock
+    _provers: List[APRProver]
+
+    def __init__(self, proof: APRProof, kcfg_explores: Iterable[SharedKCFGExplore]) -> None:
+        kcfg_explores = list(kcfg_explores)
+        if not kcfg_explores:
+            raise ValueError('ParallelAPRProver needs at least one KCFGExplore')
+        if any(kcfg_explore.proof_lock is not kcfg_explores[0].proof_lock for kcfg_explore in kcfg_explores):
+            raise ValueError('The explorers of a ParallelAPRProver must share a ProofLock')
+        self.proof = proof
+        self._proof_lock = kcfg_explores[0].proof_lock
+        self._provers = [APRProver(proof, kcfg_explore=kcfg_explore) for kcfg_explore in kcfg_explores]
+
+    def _advance_node(self, prover: APRProver, node: KCFG.Node, **kwargs: Any) -> None:
+        with self._proof_lock.locked():
+            prover.advance_pending_node(node=node, **kwargs)
+
+    def advance_proof(
+        self,
+        max_iterations: Optional[int] = None,
+        execute_depth: Optional[int] = None,
+        cut_point_rules: Iterable[str] = (),
+        terminal_rules: Iterable[str] = (),
+        implication_every_block: bool = True,
+        timeout: Optional[float] = None,
+    ) -> KCFG:
+        """
+        Advance the pending nodes until the proof is done, `max_iterations` nodes have been advanced
+        or `timeout` seconds have passed.
+
+        The timeout is a soft limit: it is checked before every round and a round that has started is completed,
+        so the proof can run for as long as it takes to advance a node past the deadline.
+        """
+        start = time.perf_counter()
+        iterations = 0
+        with ThreadPoolExecutor(max_workers=len(self._provers)) as pool:
+            while self.proof.pending:
+                self.proof.write_proof()
+                if max_iterations is not None and max_iterations <= iterations:
+                    _LOGGER.warning(f'Reached iteration bound {self.proof.id}: {max_iterations}')
+                    break
+                if timeout is not None and time.perf_counter() - start > timeout:
+                    _LOGGER.warning(f'Timed out advancing {self.proof.id} after {timeout} seconds')
+                    break
+                batch = self.proof.pending[: len(self._provers)]
+                if max_iterations is not None:
+                    batch = batch[: max_iterations - iterations]
+                iterations += len(batch)
+                _LOGGER.info(f'Advancing {len(batch)} pending nodes of {self.proof.id}: {[node.id for node in batch]}')
+                futures = [
+                    pool.submit(
+                        self._advance_node,
+                        prover,
+                        node,
+                        execute_depth=execute_depth,
+                        cut_point_rules=cut_point_rules,
+                        terminal_rules=terminal_rules,
+                        implication_every_block=implication_every_block,
+                    )
+                    for prover, node in zip(self._provers, batch)
+                ]
+                for future in futures:
+                    future.result()
+        self.proof.write_proof()
+        return self.proof.kcfg
+
+
+@contextmanager
+def parallel_kcfg_explores(
+    kprint: KPrint, workers: int, port: int, bug_report: Optional[BugReport] = None
+) -> Iterator[List[SharedKCFGExplore]]:
+    """Start `workers` kore-rpc servers on consecutive ports starting at `port`, sharing one `ProofLock`"""
+    proof_lock = ProofLock()
+    with ExitStack() as stack:
+        yield [
+            stack.enter_context(SharedKCFGExplore(kprint, proof_lock, port=port + i, bug_report=bug_report))
+            for i in range(workers)
+        ]
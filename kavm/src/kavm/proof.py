@@ -28,14 +28,18 @@ from pyk.kast.manip import (
     split_config_from,
 )
 from pyk.kast.outer import KClaim
-from pyk.kast.pretty import build_symbol_table, paren
+from pyk.kast.pretty import SymbolTable, build_symbol_table, paren
 from pyk.prelude.kint import intToken
 from pyk.prelude.string import stringToken
 from pyk.utils import hash_str
 
 from kavm.adaptors.algod_transaction import transaction_k_term
+from kavm.definition_registry import load_symbol_table
+from kavm.instrumentation import span, traced
 from kavm.kast.factory import KAVMTermFactory
+from kavm.kast.templates import cell_template
 from kavm.kavm import KAVM
+from kavm.proof_cache import ProofCache
 from kavm.pyk_utils import algorand_address_to_k_bytes, existentialize_leafs
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -125,6 +129,22 @@ def collect_vars(symbolic_sdk_dict: Dict[str, Any]) -> Set[KVariable]:
     return result
 
 
+def verification_kavm(use_directory: Optional[Path] = None) -> KAVM:
+    """KAVM instance of the definition in KAVM_VERIFICATION_DEFINITION_DIR, with the symbol table patched for claims"""
+    kavm_haskell = KAVM(
+        definition_dir=Path(os.environ.get('KAVM_VERIFICATION_DEFINITION_DIR')), use_directory=use_directory
+    )
+
+    def build_claims_symbol_table() -> SymbolTable:
+        symbol_table = build_symbol_table(kavm_haskell.definition)
+        symbol_table['_+Bytes_'] = paren(lambda a1, a2: a1 + ' +Bytes ' + a2)
+        symbol_table['_andBool_'] = paren(symbol_table['_andBool_'])
+        return symbol_table
+
+    kavm_haskell._symbol_table = load_symbol_table(kavm_haskell.definition_dir, 'claims', build_claims_symbol_table)
+    return kavm_haskell
+
+
 class KAVMProof:
     def __init__(
         self,
@@ -258,7 +278,7 @@ class KAVMProof:
         )
 
     def build_claim(self) -> KClaim:
-        symbolic_config, subst = split_config_from(self.kavm.definition.init_config(KSort('KavmCell')))
+        symbolic_config, subst = cell_template(self.kavm, KSort('KavmCell'))
 
         txn_ids = [str(idx) for idx, _ in enumerate(self._txns_pre)]
 
@@ -364,23 +384,45 @@ class KAVMProof:
         return claim
 
     def prove(self) -> None:
-        claim = self.build_claim()
-
-        kavm_haskell = KAVM(
-            definition_dir=Path(os.environ.get('KAVM_VERIFICATION_DEFINITION_DIR')), use_directory=self._use_directory
-        )
-        symbol_table = build_symbol_table(kavm_haskell.definition)
-        symbol_table['_+Bytes_'] = paren(lambda a1, a2: a1 + ' +Bytes ' + a2)
-        symbol_table['_andBool_'] = paren(symbol_table['_andBool_'])
-        kavm_haskell._symbol_table = symbol_table
-
-        result = kavm_haskell.prove_claim(claim=claim, claim_id=self._claim_name)
+        if not self.check():
+            exit(1)
+
+    @traced('proof.check')
+    def check(self, kavm_haskell: Optional[KAVM] = None, use_cache: bool = False) -> bool:
+        """
+        Build the claim and send it to the prover, reporting the final configuration if the proof fails.
+
+        `kavm_haskell` is the KAVM instance of the verification definition to prove with, see `verification_kavm`.
+        Several proofs can be checked concurrently with the same instance.
+        If `use_cache` is set, a claim that has already been proved against the same definition is not re-proved,
+        see `ProofCache`.
+        """
+        with span('proof.build_claim', claim=self._claim_name):
+            claim = self.build_claim()
+
+        if kavm_haskell is None:
+            kavm_haskell = verification_kavm(self._use_directory)
+
+        proof_cache: Optional[ProofCache] = None
+        cache_key = ''
+        if use_cache:
+            proof_cache = ProofCache(self._use_directory / 'proof-cache')
+            cache_key = proof_cache.key(claim, kavm_haskell.definition_dir)
+            if proof_cache.is_proved(cache_key):
+                _LOGGER.info(f"Skipping {self._claim_name}: already proved")
+                return True
+
+        with span('proof.prove_claim', claim=self._claim_name):
+            result = kavm_haskell.prove_claim(claim=claim, claim_id=self._claim_name)
 
         if type(result) is KApply and result.label.name == "#Top":
             _LOGGER.info(f"Proved {self._claim_name}")
-        else:
-            _LOGGER.error(f"Failed to prove {self._claim_name}:")
-            self.report_failure(result, self.kavm.symbol_table)
+            if proof_cache is not None:
+                proof_cache.record_proved(cache_key, self._claim_name)
+            return True
+        _LOGGER.error(f"Failed to prove {self._claim_name}:")
+        self.report_failure(result, self.kavm.symbol_table)
+        return False
 
     def report_failure(self, final_term: KInner, symbol_table: Dict):
         final_config_filename = self._use_directory / f'{self._claim_name}_final_configuration.txt'
@@ -395,4 +437,3 @@ class KAVMProof:
         _LOGGER.info('Constraints: ')
         _LOGGER.info(self.kavm.pretty_print(constraints, symbol_table=symbol_table))
         _LOGGER.info(f'Pretty printed final configuration to {final_config_filename}')
-        exit(1)
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Final, List, Mapping, Optional, Set
+
+from pyk.kast.outer import KClaim
+
+from kavm.definition_registry import definition_digest
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+# attributes that only tell where a claim comes from, with UNIQUE_ID being a hash that includes its location
+CLAIM_LOCATION_ATTS: Final = (
+    'label',
+    'UNIQUE_ID',
+    'org.kframework.attributes.Source',
+    'org.kframework.attributes.Location',
+)
+
+_REQUIRES_RE: Final = re.compile(r'^\s*requires\s+"([^"]+)"', re.MULTILINE)
+
+
+def spec_digest(spec_file: Path, spec_module: Optional[str] = None) -> str:
+    """
+    SHA-256 digest of the spec module name, of the spec file and of the files it requires, recursively
+
+    Required files are looked up next to the file requiring them, the ones that are not there, like those of
+    the definition, are covered by the digest of the definition instead.
+    """
+    digest = hashlib.sha256((spec_module if spec_module else '').encode())
+    pending: List[Path] = [spec_file.resolve()]
+    seen: Set[Path] = set()
+    while pending:
+        path = pending.pop()
+        if path in seen or not path.is_file():
+            continue
+        seen.add(path)
+        text = path.read_text()
+        digest.update(hashlib.sha256(text.encode()).digest())
+        pending += [(path.parent / required).resolve() for required in reversed(_REQUIRES_RE.findall(text))]
+    return digest.hexdigest()
+
+
+class ProofCache:
+    """
+    On-disk record of claims that have been proved.
+
+    An entry is keyed by the SHA-256 digest of the claim, with its label and source location removed,
+    the digest of the definition it was proved against, the digest of the spec it comes from, see `spec_digest`,
+    and the prover options that can affect the outcome.
+    Re-kompiling the definition, editing a lemma of the spec or changing the claim therefore yields a different key.
+    Only successful proofs are recorded, failed claims are always re-proved.
+    """
+
+    _cache_dir: Path
+
+    def __init__(self, cache_dir: Path) -> None:
+        self._cache_dir = cache_dir
+
+    @staticmethod
+    def claim_digest(claim: KClaim) -> str:
+        claim_dict = claim.to_dict()
+        atts = claim_dict.get('att', {}).get('att', {})
+        for att in CLAIM_LOCATION_ATTS:
+            atts.pop(att, None)
+        return hashlib.sha256(json.dumps(claim_dict, sort_keys=True).encode()).hexdigest()
+
+    def key(
+        self,
+        claim: KClaim,
+        definition_dir: Path,
+        options: Optional[Mapping[str, Any]] = None,
+        spec: Optional[str] = None,
+    ) -> str:
+        """
+        Key of a claim, `spec` being the `spec_digest` of the spec it comes from
+        """
+        key_dict = {
+            'claim': self.claim_digest(claim),
+            'definition': definition_digest(definition_dir),
+            'spec': spec,
+            'options': options if options else {},
+        }
+        return hashlib.sha256(json.dumps(key_dict, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self._cache_dir / f'{key}.json'
+
+    def is_proved(self, key: str) -> bool:
+        return self._entry_path(key).is_file()
+
+    def record_proved(self, key: str, claim_id: str) -> None:
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first to never expose a partially written entry to concurrent readers
+        with tempfile.NamedTemporaryFile('w', dir=path.parent, suffix='.tmp', delete=False) as tmp_file:
+            json.dump({'claim': claim_id}, tmp_file)
+        os.replace(tmp_file.name, path)
+        _LOGGER.info(f'Recorded proof of {claim_id} in {path}')
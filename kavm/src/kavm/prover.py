@@ -3,6 +3,7 @@
 import importlib
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Final, List, Optional, Tuple
 
@@ -14,14 +15,13 @@ from pyk.kast.inner import KApply, KInner, KSort, KToken, KVariable, Subst
 from pyk.kast.manip import set_cell
 from pyk.prelude.bytes import bytesToken
 from pyk.prelude.kint import intToken
-from pyk.prelude.string import stringToken
 from pyk.utils import dequote_str
 from pyteal.ir import Op
 
 from kavm.adaptors.algod_transaction import transaction_k_term
 from kavm.kast.factory import KAVMTermFactory
 from kavm.kavm import KAVM
-from kavm.proof import KAVMProof, SymbolicAccount
+from kavm.proof import KAVMProof, SymbolicAccount, verification_kavm
 from kavm.pyk_utils import algorand_address_to_k_bytes, generate_tvalue_list, int_2_bytes, method_selector_to_k_bytes
 
 _LOGGER: Final = logging.getLogger(__name__)
@@ -262,46 +262,10 @@ def router_postcondition(
     return wrap(func)
 
 
-def remove_duplicates(labels: List) -> List:
-    return [*set(labels)]
-
-
 class SymbolicApplTxn:
     pass
 
 
-def preprocess_teal_program(term: KInner) -> Tuple[List[KInner], KInner]:
-    labels = []
-
-    def preprocess_teal_program_impl(term: KInner) -> KInner:
-        def hex_token_to_k_string(ht: str) -> str:
-            string = ""
-            for i in range(0, len(ht), 2):
-                string += "\\x"
-                string += ht[i] + ht[i + 1]
-            return string
-
-        if type(term) is KApply:
-            if len(term.args) == 0:
-                return term
-            else:
-                result = KApply(label=term.label, args=[preprocess_teal_program_impl(arg) for arg in term.args])
-                return result
-        else:
-            if type(term) is KToken:
-                if term.sort == KSort(name="HexToken"):
-                    return stringToken(dequote_str(hex_token_to_k_string(term.token[2:])))
-
-                else:
-                    return term
-            else:
-                return term
-
-    pgm = preprocess_teal_program_impl(term)
-
-    return labels, pgm
-
-
 def write_to_file(program: str, path: Path):
     with open(path, "w") as f:
         f.write(program)
@@ -331,6 +295,36 @@ class AutoProver:
     def prove(self, method_name: str) -> None:
         self._proofs[method_name].prove()
 
+    def prove_all(self, workers: Optional[int] = None, use_cache: bool = False) -> Dict[str, bool]:
+        """
+        Prove the claims of all Hoare methods concurrently and return whether each of them has been proved.
+
+        The claims are independent, so up to `workers` of them are sent to the prover at the same time.
+        The verification definition is loaded once and shared by all the proofs.
+        If `use_cache` is set, only the claims that have not been proved before are sent to the prover.
+        """
+        kavm_haskell = verification_kavm(self._use_directory)
+        results: Dict[str, bool] = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(proof.check, kavm_haskell, use_cache): method_name
+                for method_name, proof in self._proofs.items()
+            }
+            for future in as_completed(futures):
+                method_name = futures[future]
+                try:
+                    results[method_name] = future.result()
+                except Exception as err:
+                    _LOGGER.error(f'Failed to prove method {method_name}: {err}')
+                    results[method_name] = False
+
+        proved = [method_name for method_name, result in results.items() if result]
+        failed = [method_name for method_name, result in results.items() if not result]
+        _LOGGER.info(f'Proved {len(proved)} of {len(results)} methods')
+        if failed:
+            _LOGGER.error(f'Failed to prove methods: {sorted(failed)}')
+        return results
+
     def simulate(self, method_name: str) -> None:
         self._proofs[method_name].simulate()
 
@@ -410,12 +404,8 @@ class AutoProver:
 
         _LOGGER.info(f'Initializing proofs for contract {contract.name}')
 
-        approval_labels, parsed_approval_pgm = preprocess_teal_program(
-            self.kavm.kore_to_kast(self.kavm.parse_teal(approval_pgm_path))
-        )
-        clear_labels, parsed_clear_pgm = preprocess_teal_program(
-            self.kavm.kore_to_kast(self.kavm.parse_teal(clear_pgm_path))
-        )
+        parsed_approval_pgm = term_factory.teal_program_term(approval_pgm_path)
+        parsed_clear_pgm = term_factory.teal_program_term(clear_pgm_path)
 
         app_account = SymbolicAccount.from_sdk_account(term_factory, sdk_app_account_dict)
         creator_account = SymbolicAccount.from_sdk_account(term_factory, sdk_app_creator_account_dict)
@@ -426,16 +416,6 @@ class AutoProver:
 
         asset_id = list(app_account._assets.keys())[0]
 
-        labels = remove_duplicates(approval_labels + clear_labels)
-        labels_are_deduped = []
-        for i in range(len(labels)):
-            labels_are_deduped.append(
-                KApply(
-                    "_==Int_",
-                    [labels[i], intToken(i)],
-                )
-            )
-
         for method in contract.methods:
             if not isinstance(method, HoareMethod):
                 _LOGGER.info(f'Skipping method {method.name} as it is not marked with @router.hoare_method')
@@ -582,7 +562,6 @@ class AutoProver:
                 ),
             )
             proof.add_txn(sdk_txn, txn_pre, txn_post)
-            # proof._preconditions = proof._preconditions + labels_are_deduped
             self._proofs[method.name] = proof
 
         _LOGGER.info(
@@ -1,7 +1,8 @@
 import typing
 from base64 import b64encode
-from typing import Any, Callable, Collection, Dict, List, Optional, Set, Tuple, TypeVar, Union
+from typing import Any, Callable, Collection, Dict, Final, List, Optional, Set, Tuple, TypeVar, Union
 
+from algosdk.box_reference import BoxReference
 from algosdk.encoding import decode_address
 from algosdk.future.transaction import OnComplete
 from pyk.dequote import bytes_encode, dequote_string
@@ -14,6 +15,10 @@ from pyk.utils import hash_str
 
 T = TypeVar("T")
 
+TVALUE_NE_LIST: Final = '___TEAL-TYPES-SYNTAX_TValueNeList_TValue_TValueNeList'
+TVALUE_PAIR: Final = '(_,_)_TEAL-TYPES-SYNTAX_TValuePair_TValue_TValue'
+TVALUE_PAIR_NE_LIST: Final = '___TEAL-TYPES-SYNTAX_TValuePairNeList_TValuePair_TValuePairNeList'
+
 
 def token_or_expr(
     token_constructor: Callable[[T], KInner],
@@ -67,10 +72,26 @@ def tvalue_list(values: List[Union[str, int, bytes]]) -> KInner:
 
 
 def tvalue_bytes_list(values: List[bytes]) -> KInner:
+    """Convert byte strings, like application arguments, into a TValueList of K Bytes"""
     if len(values) == 0:
         return KApply('.TValueList')
     else:
-        return generate_tvalue_list([bytesToken(bytes_encode(dequote_string(str(v))[2:-1])) for v in values])
+        return generate_tvalue_list([bytesToken(bytes(v)) for v in values])
+
+
+def tvalue_pair_list(pairs: List[Tuple[KInner, KInner]]) -> KInner:
+    """Build a TValuePairList from pairs of TValues, iteratively from the last pair"""
+    if len(pairs) == 0:
+        return KApply('.TValuePairList')
+    result: KInner = KApply(TVALUE_PAIR, [pairs[-1][0], pairs[-1][1]])
+    for i in range(len(pairs) - 2, -1, -1):
+        result = KApply(TVALUE_PAIR_NE_LIST, [KApply(TVALUE_PAIR, [pairs[i][0], pairs[i][1]]), result])
+    return result
+
+
+def box_references_list(boxes: List[BoxReference]) -> KInner:
+    """Convert box references into a TValuePairList of the box names and the indices of their applications"""
+    return tvalue_pair_list([(bytesToken(bytes(box.name)), intToken(box.app_index)) for box in boxes])
 
 
 def map_bytes_bytes(d: Dict[str, str]) -> KInner:
@@ -160,16 +181,13 @@ def int_2_bytes(term: KInner) -> KInner:
 
 
 def generate_tvalue_list(tvlist: List[KInner]) -> KInner:
-    if len(tvlist) == 1:
-        return tvlist[0]
-    else:
-        return KApply(
-            "___TEAL-TYPES-SYNTAX_TValueNeList_TValue_TValueNeList",
-            [
-                tvlist[0],
-                generate_tvalue_list(tvlist[1:]),
-            ],
-        )
+    """Build a TValueNeList from a non-empty list of TValues, iteratively from the last one"""
+    if len(tvlist) == 0:
+        raise ValueError('Cannot build an empty TValueNeList')
+    result = tvlist[-1]
+    for i in range(len(tvlist) - 2, -1, -1):
+        result = KApply(TVALUE_NE_LIST, [tvlist[i], result])
+    return result
 
 
 def algorand_address_to_k_bytes(addr: str) -> KToken:
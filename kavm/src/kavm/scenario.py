@@ -2,7 +2,7 @@ import json
 from base64 import b64decode
 from hashlib import sha512
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from kavm.adaptors.algod_account import KAVMAccount
 from kavm.adaptors.algod_application import KAVMApplication, KAVMApplicationParams
@@ -18,6 +18,10 @@ def _sort_dict(input_dict: Dict[str, Any]) -> Dict[str, Any]:
     return od
 
 
+def _empty_setup_stage() -> Dict[str, Any]:
+    return {'stage-type': 'setup-network', 'data': {'accounts': []}}
+
+
 class KAVMScenario:
     """
     Rerpesentation of a JSON testing scenario for KAVM
@@ -155,6 +159,33 @@ class KAVMScenario:
 
         return result
 
+    @property
+    def execution_stages(self) -> List[Any]:
+        """The "submit-transactions" stages of the scenario, in the order of evaluation"""
+        return self._stages[1:]
+
+    def split(self, checkpoints: Iterable[int]) -> List['KAVMScenario']:
+        """
+        Split the scenario into consecutive segments ending after the given stages.
+
+        Stages are numbered from 1, the number of the first "submit-transactions" stage.
+        The first segment keeps the "setup-network" stage; every later segment is meant to be evaluated on top of
+        the final configuration of the previous one and starts with a "setup-network" stage with no accounts.
+        All segments share the TEAL programs of the whole scenario.
+        """
+        boundaries = sorted({stage for stage in checkpoints if 0 < stage < len(self._stages) - 1})
+        segments = []
+        start = 1
+        for end in boundaries + [len(self._stages) - 1]:
+            setup_stage = self._stages[0] if start == 1 else _empty_setup_stage()
+            segments.append(KAVMScenario([setup_stage] + self._stages[start : end + 1], self._teal_programs))
+            start = end + 1
+        return segments
+
+    def after_stage(self, stage: int) -> 'KAVMScenario':
+        """The stages following the given one, to be evaluated on top of the configuration it produced, see `split`"""
+        return KAVMScenario([_empty_setup_stage()] + self._stages[stage + 1 :], self._teal_programs)
+
     def dictify(self) -> Dict[str, Any]:
         return {"stages": self._stages}
 
@@ -232,25 +263,24 @@ class KAVMScenario:
                         (pgm_name, pgm_src) = _extract_teal_program(app['params']['clear-state-program'])
                         teal_programs[pgm_name] = pgm_src
                         app['params']['clear-state-program'] = pgm_name
-        try:
-            assert stages[1]['stage-type'] == 'submit-transactions'  # and stages[1]['data']['transactions']
-        except (KeyError, AssertionError) as e:
-            raise ValueError(
-                f'Test scenario {scenario_json_str} does not contain an "submit-transactions" stage as the second stage'
-            ) from e
-        stages[1]['data']['transactions'] = KAVMScenario.sanitize_transactions(stages[1]['data']['transactions'])
-        execute_transactions_stage = stages[1]
-        for txn in execute_transactions_stage['data']['transactions']:
-            if 'apap' in txn and txn['apap']:
-                (pgm_name, pgm_src) = _extract_teal_program(txn['apap'])
-                teal_programs[pgm_name] = pgm_src
-                txn['apap'] = pgm_name
-            if 'apsu' in txn and txn['apsu']:
-                (pgm_name, pgm_src) = _extract_teal_program(txn['apsu'])
-                teal_programs[pgm_name] = pgm_src
-                txn['apsu'] = pgm_name
-
-        if len(stages) > 2:
-            raise ValueError(f'Test scenario {scenario_json_str} contains more than two stages')
+        for stage_idx, execute_transactions_stage in enumerate(stages[1:], start=1):
+            try:
+                assert execute_transactions_stage['stage-type'] == 'submit-transactions'
+            except (KeyError, AssertionError) as e:
+                raise ValueError(
+                    f'Stage {stage_idx} of test scenario {scenario_json_str} is not a "submit-transactions" stage'
+                ) from e
+            execute_transactions_stage['data']['transactions'] = KAVMScenario.sanitize_transactions(
+                execute_transactions_stage['data']['transactions']
+            )
+            for txn in execute_transactions_stage['data']['transactions']:
+                if 'apap' in txn and txn['apap']:
+                    (pgm_name, pgm_src) = _extract_teal_program(txn['apap'])
+                    teal_programs[pgm_name] = pgm_src
+                    txn['apap'] = pgm_name
+                if 'apsu' in txn and txn['apsu']:
+                    (pgm_name, pgm_src) = _extract_teal_program(txn['apsu'])
+                    teal_programs[pgm_name] = pgm_src
+                    txn['apsu'] = pgm_name
 
         return KAVMScenario(stages=stages, teal_programs=teal_programs)
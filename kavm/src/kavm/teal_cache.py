@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import ClassVar, Dict, Final, Optional, Tuple
+
+from pyk.kore import syntax as kore
+
+from kavm.kore_parser import parse_kore, parse_kore_file
+
+_LOGGER: Final = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY: Final = 256
+
+
+class TealProgramCache:
+    """
+    Content-addressed cache of TEAL programs parsed into KORE.
+
+    Entries are keyed by the SHA-256 digest of the program source and the identity of the Bison parser
+    that produced them, so rebuilding the definition invalidates the cache. Recently used patterns are
+    kept in memory, and, if a cache directory is given, the KORE text of every parsed program is stored
+    on disk and shared by all processes using the same directory.
+    """
+
+    _instances: ClassVar[Dict[Tuple[Path, Optional[Path]], 'TealProgramCache']] = {}
+    _instances_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    _parser: Path
+    _parser_id: bytes
+    _cache_dir: Optional[Path]
+    _capacity: int
+    _memory: 'OrderedDict[str, kore.Pattern]'
+    _lock: threading.Lock
+
+    def __init__(self, parser: Path, cache_dir: Optional[Path] = None, capacity: int = DEFAULT_CAPACITY) -> None:
+        self._parser = parser
+        parser_stat = parser.stat()
+        self._parser_id = f'{parser.resolve()}:{parser_stat.st_size}:{parser_stat.st_mtime_ns}'.encode()
+        self._cache_dir = cache_dir
+        self._capacity = capacity
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_parser(cls, parser: Path, cache_dir: Optional[Path] = None) -> 'TealProgramCache':
+        """Get the process-wide cache of a parser, creating it on first use"""
+        key = (parser.resolve(), cache_dir.resolve() if cache_dir else None)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = TealProgramCache(parser, cache_dir)
+            return cls._instances[key]
+
+    def key(self, source: str) -> str:
+        return hashlib.sha256(self._parser_id + b'\0' + source.encode()).hexdigest()
+
+    def _remember(self, key: str, pattern: kore.Pattern) -> None:
+        with self._lock:
+            self._memory[key] = pattern
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._capacity:
+                self._memory.popitem(last=False)
+
+    def _recall(self, key: str) -> Optional[kore.Pattern]:
+        with self._lock:
+            pattern = self._memory.get(key)
+            if pattern is not None:
+                self._memory.move_to_end(key)
+            return pattern
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self._cache_dir / key[:2] / f'{key}.kore' if self._cache_dir else None
+
+    def _load(self, key: str) -> Optional[kore.Pattern]:
+        path = self._disk_path(key)
+        if path is None or not path.is_file():
+            return None
+        try:
+            return parse_kore_file(path)
+        except ValueError as err:
+            _LOGGER.warning(f'Ignoring corrupted TEAL cache entry {path}: {err}')
+            return None
+
+    def _store(self, key: str, kore_text: bytes) -> None:
+        path = self._disk_path(key)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first to never expose a partially written entry to concurrent readers
+        with tempfile.NamedTemporaryFile('wb', dir=path.parent, suffix='.tmp', delete=False) as tmp_file:
+            tmp_file.write(kore_text)
+        os.replace(tmp_file.name, path)
+
+    def parse(self, file: Path) -> kore.Pattern:
+        """Parse a TEAL program, consulting the cache before calling the Bison parser"""
+        key = self.key(file.read_text())
+
+        pattern = self._recall(key)
+        if pattern is not None:
+            return pattern
+
+        pattern = self._load(key)
+        if pattern is None:
+            _LOGGER.debug(f'TEAL cache miss for {file}, running {self._parser}')
+            result = subprocess.run([str(self._parser), str(file)], stdout=subprocess.PIPE, check=True)
+            pattern = parse_kore(result.stdout)
+            self._store(key, result.stdout)
+
+        self._remember(key, pattern)
+        return pattern
@@ -23,26 +23,26 @@ def kavm_run_dir(tmp_path_factory: Any) -> Path:
     return tmp_path_factory.mktemp(".kavm")
 
 
-@pytest.mark.parametrize("filename", scenario_files())
-def test_run_simulation(filename: str, kavm_run_dir: Path) -> None:
+@pytest.fixture(scope="session")
+def kavm(kavm_run_dir: Path) -> KAVM:
     if not os.environ.get('KAVM_DEFINITION_DIR'):
         raise RuntimeError('Cannot access KAVM_DEFINITION_DIR environment variable. Is it set?')
 
+    kavm_definition_dir = Path(str(os.environ.get('KAVM_DEFINITION_DIR')))
+
+    return KAVM(definition_dir=Path(os.path.join(project_path, str(kavm_definition_dir))), use_directory=kavm_run_dir)
+
+
+@pytest.mark.parametrize("filename", scenario_files())
+def test_run_simulation(filename: str, kavm: KAVM) -> None:
     failing_file = open(os.path.join(project_path, 'tests/failing-avm-simulation.list'))
     failing_tests = [os.path.basename(f) for f in failing_file.read().split('\n')]
     if os.path.basename(filename) in failing_tests:
         pytest.skip()
 
-    kavm_definition_dir = Path(str(os.environ.get('KAVM_DEFINITION_DIR')))
-
-    kavm = KAVM(definition_dir=Path(os.path.join(project_path, str(kavm_definition_dir))), use_directory=kavm_run_dir)
-
     scenario = KAVMScenario.from_json(
         scenario_json_str=Path(filename).read_text(),
         teal_sources_dir=Path(os.path.join(project_path, 'tests/teal-sources/')),
     )
 
-    kavm.run_avm_json(
-        scenario=scenario,
-        profile=True,
-    )
+    kavm.run_avm_json(scenario=scenario)
@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Final, Iterator, List, Optional, Tuple
+
+import pytest
+from pyk.kore import syntax as kore
+
+from kavm.algod import AsyncKAVMClient, KAVMClient
+from kavm.executor import KAVMExecutionResult
+from kavm.kavm import KAVM
+from kavm.kore_parser import parse_kore
+from kavm.kore_utils import kore_dv
+from kavm.scenario import KAVMScenario
+
+FAILURE: Final = 'Failure - transaction group rejected'
+
+
+class FakeKAVM(KAVM):
+    """
+    KAVM without a definition, evaluating scenarios in Python instead of on the interpreter
+
+    A "submit-transactions" stage fails if one of its transactions has no amount and otherwise confirms all of them,
+    its state dump lists the accounts of the setup stage. Like in the semantics, the return code of a scenario
+    without such stages stays 4. The rest of `run_avm_json`, like the handling of the return code, is KAVM's.
+    Unsetting `dump_state` leaves out the state dumps, like an interpreter that stops before writing them.
+    """
+
+    def __init__(self, definition_dir: Path) -> None:
+        self.definition_dir = definition_dir
+        self.dump_state = True
+        # the scenarios run so far and the configurations they were evaluated on top of
+        self.runs: List[Tuple[Dict[str, Any], Optional[kore.Pattern]]] = []
+
+    @property
+    def definition(self) -> Any:
+        return None
+
+    def run_scenario(
+        self,
+        scenario: KAVMScenario,
+        depth: Optional[int] = None,
+        existing_decompiled_teal_dir: Optional[Path] = None,
+        initial_state: Optional[kore.Pattern] = None,
+        state_dump: Optional[Path] = None,
+        parse_output: bool = False,
+    ) -> KAVMExecutionResult:
+        scenario_dict = scenario.dictify()
+        self.runs.append((scenario_dict, initial_state))
+        setup, *stages = scenario_dict['stages']
+        returncode = 4
+        dumps = []
+        for stage in stages:
+            txns = stage['data']['transactions']
+            if not all(txn.get('amt') for txn in txns):
+                returncode = 1
+                break
+            returncode = 0
+            dumped_txns = [{'id': str(i), 'params': txn} for i, txn in enumerate(txns)]
+            dumps.append({'accounts': setup['data']['accounts'], 'transactions': dumped_txns})
+        if state_dump is not None:
+            state_dump.write_text(''.join(json.dumps(dump) for dump in dumps) if self.dump_state else '')
+        returnstatus = {0: 'Success - transaction group accepted', 1: FAILURE, 4: ''}[returncode]
+        output = f"Lbl'-LT-'returnstatus'-GT-'{{}}({kore_dv('String', returnstatus)})"
+        pattern = parse_kore(output) if parse_output and returncode == 0 else None
+        return KAVMExecutionResult(returncode=returncode, output=output, stderr='', pattern=pattern)
+
+
+@pytest.fixture
+def make_kalgod(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, kalgod_faucet: Dict[str, Any]
+) -> Iterator[Callable[..., Any]]:
+    """
+    Build a client of a subclass of KAVMClient, with the given keyword arguments, on top of a FakeKAVM
+
+    The faucet is the only account of the client, see `kalgod_faucet`.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('KAVM_DEFINITION_DIR', str(tmp_path))
+    monkeypatch.setattr('kavm.algod.KAVM', FakeKAVM)
+    clients: List[KAVMClient] = []
+
+    def make(client_class: Callable[..., KAVMClient] = KAVMClient, **kwargs: Any) -> Any:
+        client = client_class(faucet_address=kalgod_faucet['address'], **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        if isinstance(client, AsyncKAVMClient):
+            client.close()
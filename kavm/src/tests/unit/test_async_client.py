@@ -0,0 +1,205 @@
+import asyncio
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from algosdk.account import generate_account
+from algosdk.future.transaction import ApplicationNoOpTxn, PaymentTxn, SuggestedParams, Transaction
+from algosdk.logic import get_application_address
+
+from kavm.algod import AsyncKAVMClient, _created_ids, _footprints_conflict, _GroupSnapshot
+
+
+class ConflictingClient(AsyncKAVMClient):
+    """A client whose first group conflicts with a concurrent one"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.footprints: List[Optional[FrozenSet[str]]] = []
+
+    def _commit(
+        self,
+        txns: List[Transaction],
+        snapshot: _GroupSnapshot,
+        footprint: Optional[FrozenSet[str]],
+        dump_items: List[Tuple[str, Any]],
+    ) -> Optional[Dict[str, str]]:
+        self.footprints.append(footprint)
+        if len(self.footprints) == 1:
+            return None
+        return super()._commit(txns, snapshot, footprint, dump_items)
+
+
+def address() -> str:
+    _, addr = generate_account()
+    return str(addr)
+
+
+def dump_items(txns: List[Transaction], *accounts: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """The items of the state dump of a group that has confirmed its transactions and left the given accounts"""
+    dumped_txns = [('transactions', {'id': str(i), 'params': {'amount': txn.amt}}) for i, txn in enumerate(txns)]
+    return [('accounts', account) for account in accounts] + dumped_txns
+
+
+def app(app_id: int, creator: str) -> Dict[str, Any]:
+    return {'id': app_id, 'params': {'creator': creator}}
+
+
+def start(client: AsyncKAVMClient, txns: List[Transaction]) -> Tuple[FrozenSet[str], _GroupSnapshot]:
+    """Start evaluating a group, like `_eval_transactions_async` does before running KAVM"""
+    footprint = client.group_footprint(txns)
+    client._discover_accounts(txns)
+    return footprint, client._snapshot(footprint)
+
+
+def test_footprints_conflict() -> None:
+    assert not _footprints_conflict(frozenset(['A']), frozenset(['B']))
+    assert _footprints_conflict(frozenset(['A', 'B']), frozenset(['B']))
+    assert _footprints_conflict(None, frozenset(['B']))
+    assert _footprints_conflict(frozenset(), None)
+
+
+def test_created_ids() -> None:
+    dumps = [{'address': 'A', 'created-apps': [{'id': 1}], 'created-assets': [{'index': 2}]}, {'address': 'B'}]
+
+    assert _created_ids(dumps) == frozenset([('app', 1), ('asset', 2)])
+
+
+def test_group_footprint(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod(AsyncKAVMClient)
+    sender, receiver, creator, other = address(), address(), address(), address()
+    client._app_creators[7] = creator
+
+    payment = PaymentTxn(sender, suggested_params, receiver, 1)
+    app_call = ApplicationNoOpTxn(sender, suggested_params, 7, accounts=[other])
+
+    assert client.group_footprint([payment]) == frozenset([sender, receiver])
+    assert client.group_footprint([app_call]) == frozenset([sender, other, creator, get_application_address(7)])
+
+
+def test_conflicting_groups_run_in_order(make_kalgod: Callable[..., Any]) -> None:
+    client = make_kalgod(AsyncKAVMClient)
+    events: List[str] = []
+
+    async def group(name: str, footprint: frozenset, delay: float) -> None:
+        ticket = await client._admit(footprint)
+        events.append(f'start {name}')
+        await asyncio.sleep(delay)
+        events.append(f'end {name}')
+        client._release(ticket)
+
+    async def run() -> None:
+        await asyncio.gather(
+            group('a', frozenset(['A']), 0.05),
+            group('b', frozenset(['B']), 0.01),
+            group('ab', frozenset(['A', 'B']), 0),
+        )
+
+    asyncio.run(run())
+
+    assert events.index('start b') < events.index('end a')
+    assert events.index('start ab') > events.index('end a')
+    assert events.index('start ab') > events.index('end b')
+
+
+def test_commit(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod(AsyncKAVMClient)
+    sender, receiver = address(), address()
+    txns = [PaymentTxn(sender, suggested_params, receiver, 1)]
+    footprint, snapshot = start(client, txns)
+
+    result = client._commit(
+        txns,
+        snapshot,
+        footprint,
+        dump_items(txns, {'address': sender, 'amount': 9}, {'address': receiver, 'amount': 1}),
+    )
+
+    assert result == {'txId': '0'}
+    assert (client._accounts[sender].amount, client._accounts[receiver].amount) == (9, 1)
+    assert client._account_versions == {sender: 1, receiver: 1}
+    assert client._handle_get_requests(f'/transactions/pending/{txns[0].get_txid()}') == {'amount': 1}
+
+
+def test_commit_after_footprint_has_changed(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod(AsyncKAVMClient)
+    sender, receiver, other = address(), address(), address()
+    first = [PaymentTxn(sender, suggested_params, receiver, 1)]
+    second = [PaymentTxn(sender, suggested_params, other, 2)]
+    first_footprint, first_snapshot = start(client, first)
+    second_footprint, second_snapshot = start(client, second)
+
+    client._commit(first, first_snapshot, first_footprint, dump_items(first, {'address': sender, 'amount': 9}))
+
+    assert client._commit(second, second_snapshot, second_footprint, dump_items(second)) is None
+    assert client._accounts[sender].amount == 9
+    assert other in client._accounts and other not in client._account_versions
+
+
+def test_commit_writing_outside_footprint(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod(AsyncKAVMClient)
+    sender, outsider = address(), address()
+    seed = [PaymentTxn(outsider, suggested_params, outsider, 1)]
+    client._commit(seed, client._snapshot(None), None, dump_items(seed, {'address': outsider, 'amount': 5}))
+    txns = [PaymentTxn(sender, suggested_params, sender, 1)]
+    footprint, snapshot = start(client, txns)
+
+    changed = dump_items(txns, {'address': sender, 'amount': 1}, {'address': outsider, 'amount': 4})
+    unchanged = dump_items(txns, {'address': sender, 'amount': 1}, {'address': outsider, 'amount': 5})
+
+    assert client._commit(txns, snapshot, footprint, changed) is None
+    assert client._accounts[outsider].amount == 5
+    assert client._commit(txns, snapshot, footprint, unchanged) == {'txId': '0'}
+
+
+def test_concurrent_creations(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod(AsyncKAVMClient)
+    creator, other_creator, payer = address(), address(), address()
+    groups = [[PaymentTxn(sender, suggested_params, sender, 1)] for sender in (creator, other_creator, payer)]
+    (footprint, snapshot), (other_footprint, other_snapshot), (payer_footprint, payer_snapshot) = [
+        start(client, txns) for txns in groups
+    ]
+
+    created = dump_items(groups[0], {'address': creator, 'amount': 1, 'created-apps': [app(1, creator)]})
+    assert client._commit(groups[0], snapshot, footprint, created) == {'txId': '0'}
+    assert client._app_creators == {1: creator}
+
+    # the other group may have picked the same id, it is evaluated again
+    other_created = dump_items(
+        groups[1], {'address': other_creator, 'amount': 1, 'created-apps': [app(1, other_creator)]}
+    )
+    assert client._commit(groups[1], other_snapshot, other_footprint, other_created) is None
+    # groups that do not create anything are not affected
+    paid = dump_items(groups[2], {'address': payer, 'amount': 1})
+    assert client._commit(groups[2], payer_snapshot, payer_footprint, paid) == {'txId': '0'}
+
+
+def test_conflicting_group_is_evaluated_again_alone(
+    make_kalgod: Callable[..., Any], suggested_params: SuggestedParams
+) -> None:
+    client = make_kalgod(ConflictingClient)
+    sender = address()
+    txns = [PaymentTxn(sender, suggested_params, sender, 1)]
+
+    result = asyncio.run(client._eval_transactions_async(txns))
+
+    assert result == {'txId': '0'}
+    assert client.footprints == [frozenset([sender]), None]
+    assert len(client.kavm.runs) == 2
+
+
+def test_sync_and_async_lookups(
+    make_kalgod: Callable[..., Any], kalgod_faucet: Dict[str, Any], suggested_params: SuggestedParams
+) -> None:
+    client = make_kalgod(AsyncKAVMClient)
+    faucet = kalgod_faucet['address']
+    txn = PaymentTxn(faucet, suggested_params, faucet, 1)
+
+    async def run() -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        await client.send_transaction_async(txn.sign(kalgod_faucet['private_key']))
+        return await client.pending_transaction_info_async(txn.get_txid()), await client.account_info_async(faucet)
+
+    txn_info, account = asyncio.run(run())
+
+    # the synchronous methods algosdk helpers rely on still return the results, not coroutines
+    assert txn_info['amt'] == 1
+    assert client.pending_transaction_info(txn.get_txid()) == txn_info
+    assert client.account_info(faucet) == account
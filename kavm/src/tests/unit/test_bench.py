@@ -0,0 +1,51 @@
+from typing import Any, Dict
+
+from kavm.bench import BENCH_PHASES, compare_to_baseline, format_report
+
+
+def report(interpreter: float, **phases: float) -> Dict[str, Any]:
+    timings = {phase: phases.get(phase.replace('-', '_'), 0.1) for phase in BENCH_PHASES}
+    timings['interpreter'] = interpreter
+    return {
+        'repeat': 1,
+        'corpora': {
+            'json-scenarios': {'phases': timings, 'total': sum(timings.values()), 'scenarios': {'a.json': timings}}
+        },
+    }
+
+
+def test_no_regression_within_threshold() -> None:
+    assert compare_to_baseline(report(interpreter=1.1), report(interpreter=1.0), threshold=0.2) == []
+
+
+def test_regression_of_phase_and_total() -> None:
+    regressions = compare_to_baseline(report(interpreter=2.0), report(interpreter=1.0), threshold=0.2)
+
+    assert [regression.split(':')[0] for regression in regressions] == ['json-scenarios/interpreter', 'json-scenarios/total']
+
+
+def test_small_slowdowns_are_ignored() -> None:
+    assert compare_to_baseline(report(interpreter=1.0, parse_kore=0.02), report(interpreter=1.0, parse_kore=0.01)) == []
+
+
+def test_missing_corpus_is_not_compared() -> None:
+    assert compare_to_baseline(report(interpreter=2.0), {'corpora': {}}) == []
+
+
+def test_format_report() -> None:
+    table = format_report(report(interpreter=1.0))
+
+    assert all(phase in table for phase in BENCH_PHASES)
+    assert 'json-scenarios' in table
+    assert '1.000' in table
+
+
+
+def test_phase_missing_from_baseline_is_not_compared() -> None:
+    baseline = report(interpreter=1.0)
+    phases = baseline['corpora']['json-scenarios']['phases']
+    phases['krun'] = phases.pop('interpreter')
+
+    regressions = compare_to_baseline(report(interpreter=2.0), baseline, threshold=0.2)
+
+    assert [regression.split(':')[0] for regression in regressions] == ['json-scenarios/total']
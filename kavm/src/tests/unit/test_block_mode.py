@@ -0,0 +1,104 @@
+from typing import Any, Callable, Dict, List
+
+import pytest
+from algosdk.account import generate_account
+from algosdk.error import AlgodHTTPError
+from algosdk.future.transaction import PaymentTxn, SuggestedParams, Transaction
+
+from kavm.algod import KAVMClient
+
+
+class BlockClient(KAVMClient):
+    """A client in the block mode that confirms every group with a non-zero amount instead of running KAVM"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.runs: List[List[List[Transaction]]] = []
+
+    def _eval_groups(self, groups: List[List[Transaction]]) -> List[List[Dict[str, Any]]]:
+        self.runs.append(groups)
+        if any(txn.amt == 0 for txns in groups for txn in txns):
+            raise AlgodHTTPError(msg='KAVM has failed')
+        dumped_txns = [[{'id': str(i), 'params': {'amount': txn.amt}} for i, txn in enumerate(txns)] for txns in groups]
+        for txns, group_dumped_txns in zip(groups, dumped_txns):
+            self._commit_txns(txns, group_dumped_txns)
+        return dumped_txns
+
+
+def group(params: SuggestedParams, *amounts: int) -> List[Transaction]:
+    _, sender = generate_account()
+    return [PaymentTxn(sender, params, sender, amount) for amount in amounts]
+
+
+def pending(client: KAVMClient, txid: str) -> Dict[str, Any]:
+    return client.algod_request('GET', f'/transactions/pending/{txid}')
+
+
+def test_full_block_is_evaluated_in_one_run(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod(BlockClient, block_size=2)
+    first, second = group(suggested_params, 1, 2), group(suggested_params, 3)
+
+    assert client._queue_transactions(first) == {'txId': first[0].get_txid()}
+    assert client.runs == []
+    client._queue_transactions(second)
+
+    assert client.runs == [[first, second]]
+    assert pending(client, first[1].get_txid()) == {'amount': 2}
+    assert pending(client, second[0].get_txid()) == {'amount': 3}
+
+
+def test_pending_lookup_evaluates_the_block(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod(BlockClient, block_size=10)
+    txns = group(suggested_params, 1)
+    client._queue_transactions(txns)
+
+    assert pending(client, txns[0].get_txid()) == {'amount': 1}
+    assert client.runs == [[txns]]
+
+
+def test_block_timeout(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod(BlockClient, block_size=10, block_timeout=0.01)
+    txns = group(suggested_params, 1)
+    client._queue_transactions(txns)
+
+    assert client._block_done.wait(5)
+    assert client.runs == [[txns]]
+
+
+def test_failed_block_is_evaluated_group_by_group(
+    make_kalgod: Callable[..., Any], suggested_params: SuggestedParams
+) -> None:
+    client = make_kalgod(BlockClient, block_size=3)
+    good, bad, other = group(suggested_params, 1), group(suggested_params, 0), group(suggested_params, 2)
+    for txns in (good, bad, other):
+        client._queue_transactions(txns)
+
+    assert client.runs == [[good, bad, other], [good], [bad], [other]]
+    assert pending(client, other[0].get_txid()) == {'amount': 2}
+    with pytest.raises(AlgodHTTPError):
+        pending(client, bad[0].get_txid())
+
+
+def test_block_timeout_error_is_reported(
+    make_kalgod: Callable[..., Any], suggested_params: SuggestedParams, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client = make_kalgod(BlockClient, block_size=1, block_timeout=0.01)
+    committed = group(suggested_params, 1)
+    client._queue_transactions(committed)
+    client._block_size = 10
+
+    def eval_groups(groups: List[List[Transaction]]) -> List[List[Dict[str, Any]]]:
+        raise RuntimeError('KAVM has crashed')
+
+    monkeypatch.setattr(client, '_eval_groups', eval_groups)
+    done = client._block_done
+    first, second = group(suggested_params, 2), group(suggested_params, 3)
+    client._queue_transactions(first)
+    client._queue_transactions(second)
+
+    assert done.wait(5)
+    # the lookups must not fall back to the last committed transaction
+    for txns in (first, second):
+        with pytest.raises(RuntimeError):
+            pending(client, txns[0].get_txid())
+    assert pending(client, committed[0].get_txid()) == {'amount': 1}
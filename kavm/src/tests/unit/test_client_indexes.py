@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytest
+from algosdk.account import generate_account
+from algosdk.future.transaction import PaymentTxn, SuggestedParams
+
+from kavm.algod import KAVMClient
+
+
+def set_account(client: KAVMClient, address: str, apps: List[Dict[str, Any]], assets: List[Dict[str, Any]]) -> None:
+    client._unindex_account(address)
+    client._accounts[address] = SimpleNamespace(created_apps=apps, created_assets=assets)  # type: ignore
+    client._index_account(address)
+
+
+def test_app_and_asset_indexes(make_kalgod: Callable[..., Any]) -> None:
+    client = make_kalgod()
+    app = {'id': 1, 'params': {'creator': 'A'}}
+    asset = {'index': 2, 'params': {'creator': 'A'}}
+
+    set_account(client, 'A', [app], [asset])
+
+    assert client._handle_get_requests('/applications/1') == app
+    assert client._handle_get_requests('/assets/2') == asset
+    assert client._app_creators == {1: 'A'}
+    assert client._asset_creators == {2: 'A'}
+
+    set_account(client, 'A', [], [asset])
+
+    with pytest.raises(ValueError):
+        client._handle_get_requests('/applications/1')
+    assert client._app_creators == {}
+
+    client._remove_account('A')
+    with pytest.raises(ValueError):
+        client._handle_get_requests('/assets/2')
+
+
+def test_pending_transactions(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod()
+    _, sender = generate_account()
+    txns = [PaymentTxn(sender, suggested_params, sender, amount) for amount in (1, 2)]
+
+    with pytest.raises(ValueError):
+        client._handle_get_requests('/transactions/pending/0')
+
+    client._commit_txns(txns, [{'id': '0', 'params': {'amount': 1}}, {'id': '1', 'params': {'amount': 2}}])
+
+    assert client._handle_get_requests('/transactions/pending/0') == {'amount': 1}
+    assert client._handle_get_requests(f'/transactions/pending/{txns[1].get_txid()}') == {'amount': 2}
+    # unknown ids get the last committed transaction
+    assert client._handle_get_requests('/transactions/pending/unknown') == {'amount': 2}
@@ -0,0 +1,58 @@
+import os
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from kavm import definition_registry
+from kavm.definition_registry import load_definition, load_symbol_table
+
+
+@pytest.fixture
+def definition_dir(tmp_path: Path) -> Path:
+    (tmp_path / 'compiled.json').write_text('{}')
+    return tmp_path
+
+
+@pytest.fixture
+def reads(monkeypatch: pytest.MonkeyPatch) -> List[Path]:
+    reads: List[Path] = []
+
+    def read_kast_definition(path: Path) -> Any:
+        reads.append(path)
+        return object()
+
+    monkeypatch.setattr(definition_registry, 'read_kast_definition', read_kast_definition)
+    return reads
+
+
+def test_definition_is_loaded_once(definition_dir: Path, reads: List[Path]) -> None:
+    definition = load_definition(definition_dir)
+
+    assert load_definition(definition_dir) is definition
+    assert load_definition(definition_dir / '.') is definition
+    assert reads == [definition_dir / 'compiled.json']
+
+
+def test_definition_is_reloaded_after_kompile(definition_dir: Path, reads: List[Path]) -> None:
+    definition = load_definition(definition_dir)
+    compiled_json = definition_dir / 'compiled.json'
+    stat = compiled_json.stat()
+    os.utime(compiled_json, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert load_definition(definition_dir) is not definition
+    assert len(reads) == 2
+
+
+def test_symbol_tables_are_built_once_per_name(definition_dir: Path) -> None:
+    builds: List[str] = []
+
+    def build(name: str) -> Any:
+        builds.append(name)
+        return {'name': name}
+
+    for _ in range(3):
+        assert load_symbol_table(definition_dir, 'kavm', lambda: build('kavm')) == {'name': 'kavm'}
+        assert load_symbol_table(definition_dir, 'claims', lambda: build('claims')) == {'name': 'claims'}
+
+    assert builds == ['kavm', 'claims']
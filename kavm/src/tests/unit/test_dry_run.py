@@ -0,0 +1,90 @@
+import base64
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import msgpack
+from algosdk import encoding
+from algosdk.account import generate_account
+from algosdk.future.transaction import PaymentTxn, SuggestedParams
+from pyk.kore.syntax import Pattern
+
+FAILURE = 'Failure - transaction group rejected'
+
+
+def signed_payment(params: SuggestedParams, faucet: Dict[str, Any], receiver: str, amount: int) -> Any:
+    return PaymentTxn(faucet['address'], params, receiver, amount).sign(faucet['private_key'])
+
+
+def runs(client: Any) -> List[Tuple[List[str], int, Optional[Pattern]]]:
+    """The addresses set up by every run of the client's FakeKAVM, its number of groups and its initial state"""
+    return [
+        ([acc['address'] for acc in scenario['stages'][0]['data']['accounts']], len(scenario['stages']) - 1, state)
+        for scenario, state in client.kavm.runs
+    ]
+
+
+def test_simulate_reuses_the_setup(
+    make_kalgod: Callable[..., Any], kalgod_faucet: Dict[str, Any], suggested_params: SuggestedParams
+) -> None:
+    client = make_kalgod()
+    faucet = kalgod_faucet['address']
+    _, receiver = generate_account()
+    txn = signed_payment(suggested_params, kalgod_faucet, receiver, 5)
+    data = base64.b64decode(encoding.msgpack_encode(txn))
+
+    for _ in range(2):
+        response = client.algod_request('POST', '/transactions/simulate', data=data)
+        assert response['would-succeed'] is True
+        ((result,),) = [group['txn-results'] for group in response['txn-groups']]
+        assert result['txn-result']['amt'] == 5
+
+    # the setup runs once, with the return code 4 of a scenario without transactions,
+    # and the unknown receiver only exists in the dry runs
+    setup_state = client._setup_state[1]
+    assert setup_state is not None
+    assert runs(client) == [([faucet], 0, None), ([receiver], 1, setup_state), ([receiver], 1, setup_state)]
+    assert list(client._accounts) == [faucet]
+    assert client._committed_txns == {}
+
+    client._remove_account(faucet)
+    client.algod_request('POST', '/transactions/simulate', data=data)
+    assert runs(client)[-2:] == [([], 0, None), ([faucet, receiver], 1, setup_state)]
+
+
+def test_simulate_groups(
+    make_kalgod: Callable[..., Any], kalgod_faucet: Dict[str, Any], suggested_params: SuggestedParams
+) -> None:
+    client = make_kalgod()
+    faucet = kalgod_faucet['address']
+    request = {
+        'txn-groups': [
+            {'txns': [signed_payment(suggested_params, kalgod_faucet, faucet, 1).dictify()]},
+            {'txns': [signed_payment(suggested_params, kalgod_faucet, faucet, 0).dictify()]},
+        ]
+    }
+
+    response = client.algod_request('POST', '/transactions/simulate', data=msgpack.packb(request))
+
+    assert response['would-succeed'] is False
+    assert response['txn-groups'] == [
+        {'txn-results': [], 'failure-message': FAILURE},
+        {'txn-results': [], 'failure-message': FAILURE},
+    ]
+
+
+def test_dryrun(
+    make_kalgod: Callable[..., Any], kalgod_faucet: Dict[str, Any], suggested_params: SuggestedParams
+) -> None:
+    client = make_kalgod()
+    faucet = kalgod_faucet['address']
+    request = {'txns': [signed_payment(suggested_params, kalgod_faucet, faucet, amount).dictify() for amount in (1, 2)]}
+
+    response = client.algod_request('POST', '/teal/dryrun', data=msgpack.packb(request))
+
+    assert response['error'] == ''
+    assert [txn['app-call-messages'] for txn in response['txns']] == [['PASS'], ['PASS']]
+
+    request = {'txns': [signed_payment(suggested_params, kalgod_faucet, faucet, 0).dictify()]}
+    response = client.algod_request('POST', '/teal/dryrun', data=msgpack.packb(request))
+
+    assert response['error'] == FAILURE
+    assert [txn['app-call-messages'] for txn in response['txns']] == [['REJECT', FAILURE]]
@@ -0,0 +1,33 @@
+from pyk.kast.inner import KApply, KSort, KToken
+from pyk.prelude.kint import intToken
+from pyk.prelude.string import stringToken
+
+from kavm.kast.factory import preprocess_teal_program
+
+
+def hex_token(token: str) -> KToken:
+    return KToken(token, KSort('HexToken'))
+
+
+def test_preprocess_teal_program() -> None:
+    untouched = KApply('int', [intToken(1)])
+    program = KApply('seq', [untouched, KApply('byte', [hex_token('0x00ab41')])])
+
+    result = preprocess_teal_program(program)
+
+    assert result == KApply('seq', [untouched, KApply('byte', [stringToken('\x00\xabA')])])
+    assert result.args[0] is untouched  # type: ignore
+    assert preprocess_teal_program(untouched) is untouched
+
+
+def test_preprocess_deep_teal_program() -> None:
+    depth = 10_000
+    program = KApply('byte', [hex_token('0x')])
+    for _ in range(depth):
+        program = KApply('seq', [intToken(0), program])
+
+    result = preprocess_teal_program(program)
+
+    for _ in range(depth):
+        result = result.args[1]  # type: ignore
+    assert result == KApply('byte', [stringToken('')])
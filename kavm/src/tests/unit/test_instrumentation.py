@@ -0,0 +1,76 @@
+import json
+import threading
+from pathlib import Path
+
+from kavm.instrumentation import Tracer
+
+
+def test_disabled_tracer_records_nothing() -> None:
+    tracer = Tracer()
+
+    with tracer.span('phase'):
+        tracer.count('bytes', 10)
+
+    assert tracer.spans == []
+    assert tracer.counters == {}
+
+
+def test_spans_and_counters() -> None:
+    tracer = Tracer(enabled=True)
+
+    with tracer.span('outer', file='a.teal'):
+        for _ in range(2):
+            with tracer.span('inner'):
+                tracer.count('bytes', 10)
+
+    outer = next(span for span in tracer.spans if span.name == 'outer')
+    assert outer.args == {'file': 'a.teal'}
+    assert all(outer.start_ns <= span.start_ns for span in tracer.spans)
+    assert sum(span.duration_ns for span in tracer.spans if span.name == 'inner') <= outer.duration_ns
+    summary = tracer.summary()
+    assert summary['phases']['inner']['calls'] == 2
+    assert summary['counters'] == {'bytes': 20}
+
+
+def test_span_is_recorded_on_exception() -> None:
+    tracer = Tracer(enabled=True)
+
+    try:
+        with tracer.span('failing'):
+            raise ValueError()
+    except ValueError:
+        pass
+
+    assert [span.name for span in tracer.spans] == ['failing']
+
+
+def test_threads() -> None:
+    tracer = Tracer(enabled=True)
+
+    def work() -> None:
+        for _ in range(100):
+            with tracer.span('work'):
+                tracer.count('calls')
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(tracer.spans) == 400
+    assert tracer.counters == {'calls': 400}
+
+
+def test_chrome_trace(tmp_path: Path) -> None:
+    tracer = Tracer(enabled=True)
+    with tracer.span('phase', depth=None):
+        tracer.count('bytes', 3)
+    trace_file = tmp_path / 'trace.json'
+
+    tracer.write_chrome_trace(trace_file)
+
+    events = json.loads(trace_file.read_text())['traceEvents']
+    assert [(event['name'], event['ph']) for event in events] == [('phase', 'X'), ('bytes', 'C')]
+    assert events[0]['args'] == {'depth': 'None'}
+    assert events[1]['args'] == {'bytes': 3}
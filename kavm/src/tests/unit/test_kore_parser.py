@@ -0,0 +1,166 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+from pyk.kore import syntax as kore
+from pyk.kore.parser import KoreParser
+
+from kavm.kore_parser import kore_to_json, parse_kore, parse_kore_file, read_cell, read_state_dumps
+
+CONFIG = (
+    "Lbl'-LT-'generatedTop'-GT-'{}(Lbl'-LT-'k'-GT-'{}(kseq{}(inj{SortInt{}, SortKItem{}}(\\dv{SortInt{}}(\"1\")), "
+    "dotk{}())), Lbl'-LT-'returnstatus'-GT-'{}(\\dv{SortString{}}(\"Success - transaction group accepted\")))"
+)
+
+NIL = "Lbl'Stop'List'LBraQuot'JSONs'QuotRBra'{}()"
+
+
+@pytest.mark.parametrize(
+    'text',
+    [
+        CONFIG,
+        '\\dv{SortString{}}("")',
+        '\\dv{SortString{}}("escaped \\" \\\\ \\n")',
+        'LblMap{}(\\dv{SortInt{}}("1"), Lblf{SortList{SortInt{}}, SortK{}}())',
+        # variables and connectives are left to KoreParser
+        'Lblf{}(X:SortInt{})',
+        '\\top{SortInt{}}()',
+    ],
+)
+def test_same_as_kore_parser(text: str) -> None:
+    assert parse_kore(text) == KoreParser(text).pattern()
+    assert parse_kore(text.encode()) == KoreParser(text).pattern()
+
+
+def test_assoc() -> None:
+    pattern = parse_kore("\\left-assoc{}(Lbl'Unds'Map'Unds'{}(Lbl'Stop'Map{}(), Lbl'Stop'Map{}()))")
+
+    assert isinstance(pattern, kore.LeftAssoc)
+    assert pattern.app.symbol == "Lbl'Unds'Map'Unds'"
+    assert len(pattern.app.patterns) == 2
+
+
+def test_deep_pattern() -> None:
+    depth = 100_000
+    pattern = parse_kore('Lblf{}(' * depth + 'Lbla{}()' + ')' * depth)
+
+    for _ in range(depth):
+        assert isinstance(pattern, kore.App) and pattern.symbol == 'Lblf'
+        (pattern,) = pattern.patterns
+    assert pattern == kore.App('Lbla')
+
+
+@pytest.mark.parametrize('text', ['', 'Lblf{}(', 'Lblf{}() Lblg{}()', 'Lblf{}(,)', 'Lblf{}(Lbla{}(),)', '"string"'])
+def test_malformed(text: str) -> None:
+    with pytest.raises(ValueError):
+        parse_kore(text)
+
+
+def test_parse_file(tmp_path: Path) -> None:
+    kore_file = tmp_path / 'config.kore'
+    kore_file.write_text(CONFIG + '\n')
+
+    assert parse_kore_file(kore_file) == KoreParser(CONFIG).pattern()
+
+    kore_file.write_text('')
+    with pytest.raises(ValueError):
+        parse_kore_file(kore_file)
+
+
+def string(value: str) -> str:
+    return f'\\dv{{SortString{{}}}}("{value}")'
+
+
+def json_value(sort: str, pattern: str) -> str:
+    return f'inj{{{sort}{{}}, SortJSON{{}}}}({pattern})'
+
+
+def jsons(items: List[str]) -> str:
+    result = NIL
+    for item in reversed(items):
+        result = f'LblJSONs{{}}({item}, {result})'
+    return result
+
+
+def entry(key: str, value: str) -> str:
+    return f'LblJSONEntry{{}}(inj{{SortString{{}}, SortJSONKey{{}}}}({string(key)}), {value})'
+
+
+def state_dump(address: str, balance: int) -> str:
+    account = json_value(
+        'SortJSON',
+        'LblJSONObject{}('
+        + jsons(
+            [
+                entry('address', json_value('SortString', string(address))),
+                entry('amount', json_value('SortInt', f'\\dv{{SortInt{{}}}}("{balance}")')),
+                entry('deleted', json_value('SortBool', '\\dv{SortBool{}}("false")')),
+                entry('note', 'LblJSONnull{}()'),
+            ]
+        )
+        + ')',
+    )
+    return (
+        'LblJSONObject{}('
+        + jsons(
+            [
+                entry('accounts', f'LblJSONList{{}}({jsons([account])})'),
+                entry('transactions', f'LblJSONList{{}}({NIL})'),
+            ]
+        )
+        + ')'
+    )
+
+
+def list_item(dump: str) -> str:
+    return f'LblListItem{{}}(inj{{SortJSON{{}}, SortKItem{{}}}}({dump}))'
+
+
+def config(state_dumps: str) -> str:
+    return (
+        "Lbl'-LT-'generatedTop'-GT-'{}("
+        "Lbl'-LT-'returncode'-GT-'{}(\\dv{SortInt{}}(\"0\")), "
+        f"Lbl'-LT-'state-dumps'-GT-'{{}}({state_dumps}), "
+        "Lbl'-LT-'log'-GT-'{}(\\dv{SortString{}}(\"Lbl'-LT-'state-dumps'-GT-'{}(\")))"
+    )
+
+
+def expected_dump(address: str, balance: int) -> dict:
+    return {
+        'accounts': [{'address': address, 'amount': balance, 'deleted': False, 'note': None}],
+        'transactions': [],
+    }
+
+
+def test_read_single_state_dump() -> None:
+    text = config(list_item(state_dump('A', 1)))
+
+    assert read_state_dumps(text) == [expected_dump('A', 1)]
+
+
+@pytest.mark.parametrize('assoc', ['\\left-assoc', '\\right-assoc'])
+def test_read_state_dumps_of_stages(assoc: str) -> None:
+    items = ', '.join(list_item(state_dump(address, balance)) for address, balance in [('A', 1), ('B', 2), ('C', 3)])
+    text = config(f"{assoc}{{}}(Lbl'Unds'List'Unds'{{}}({items}))")
+
+    assert read_state_dumps(text) == [expected_dump('A', 1), expected_dump('B', 2), expected_dump('C', 3)]
+
+
+def test_read_empty_state_dumps() -> None:
+    assert read_state_dumps(config("Lbl'Stop'List{}()")) == []
+
+
+def test_missing_cell() -> None:
+    assert read_cell(config("Lbl'Stop'List{}()"), 'accountsMap') is None
+    with pytest.raises(ValueError):
+        read_state_dumps("Lbl'-LT-'generatedTop'-GT-'{}()")
+
+
+def test_escaped_strings() -> None:
+    assert kore_to_json(parse_kore(json_value('SortString', string('a\\"b\\\\c\\n')))) == 'a"b\\c\n'
+
+
+def test_deep_list_does_not_recurse() -> None:
+    items = [json_value('SortInt', f'\\dv{{SortInt{{}}}}("{i}")') for i in range(20000)]
+
+    assert kore_to_json(parse_kore(f'LblJSONList{{}}({jsons(items)})')) == list(range(20000))
@@ -0,0 +1,115 @@
+from typing import Any
+
+import pytest
+from pyk.kore import syntax as kore
+from pyk.kore.parser import KoreParser
+
+from kavm.kavm import KAVM
+from kavm.kore_parser import kore_to_json, parse_kore
+from kavm.kore_utils import (
+    kore_get_cell,
+    kore_json,
+    kore_map_items,
+    kore_set_cells,
+    kore_str,
+    kore_teal_programs_map,
+    kore_unwrap_str,
+)
+
+STRING = kore.SortApp('SortString')
+INT = kore.SortApp('SortInt')
+
+
+def cell(name: str, *args: kore.Pattern) -> kore.App:
+    return kore.App(f"Lbl'-LT-'{name}'-GT-'", (), args)
+
+
+def teal_program(name: str) -> kore.App:
+    key = kore.App('inj', (STRING, kore.SortApp('SortKItem')), (kore.DV(STRING, kore.String(name)),))
+    return kore.App("Lbl'UndsPipe'-'-GT-Unds'", (), (key, kore.App('dummy', (), ())))
+
+
+CONFIG = cell(
+    'generatedTop',
+    cell(
+        'kavm',
+        cell('k', kore.App('dotk', (), ())),
+        cell('returncode', kore.DV(INT, kore.String('0'))),
+        cell(
+            'tealPrograms',
+            kore.App("Lbl'Unds'Map'Unds'", (), (teal_program('a.teal'), teal_program('b.teal'))),
+        ),
+    ),
+)
+
+
+def test_kore_get_cell() -> None:
+    returncode = kore_get_cell(CONFIG, 'returncode')
+    assert returncode is not None
+    assert returncode.patterns == (kore.DV(INT, kore.String('0')),)
+    assert kore_get_cell(CONFIG, 'state-dumps') is None
+
+
+def test_kore_set_cells() -> None:
+    new_config = kore_set_cells(CONFIG, {'returncode': kore.DV(INT, kore.String('4'))})
+    returncode = kore_get_cell(new_config, 'returncode')
+    assert returncode is not None
+    assert returncode.patterns == (kore.DV(INT, kore.String('4')),)
+    assert kore_get_cell(new_config, 'k') is kore_get_cell(CONFIG, 'k')
+
+
+def test_teal_program_names() -> None:
+    assert KAVM.teal_program_names(CONFIG) == {'a.teal', 'b.teal'}
+
+
+def test_kore_str() -> None:
+    assert kore_str('plain') == '"plain"'
+    assert kore_str('a"b\\c\n') == '"a\\"b\\\\c\\n"'
+    assert kore_str('\x01é€') == '"\\x01\\xe9\\u20ac"'
+
+
+def map_depth(pattern: kore.Pattern) -> int:
+    if isinstance(pattern, kore.App) and pattern.symbol == "Lbl'Unds'Map'Unds'":
+        return 1 + max(map_depth(arg) for arg in pattern.patterns)
+    return 0
+
+
+@pytest.mark.parametrize('size', [0, 1, 2, 3, 128, 1000])
+def test_kore_teal_programs_map(size: int) -> None:
+    programs = [(f'{i}.teal', kore.App(f'Lblpgm{i}', (), ())) for i in range(size)]
+
+    teal_programs = kore_teal_programs_map(programs)
+
+    assert [kore_unwrap_str(key) for key, _ in kore_map_items(teal_programs)] == [name for name, _ in programs]
+    assert 2 ** map_depth(teal_programs) < 2 * max(size, 1)
+    assert KoreParser(teal_programs.text).pattern() == teal_programs
+
+
+def test_kore_json() -> None:
+    assert kore_json([]) == "LblJSONList{}(Lbl'Stop'List'LBraQuot'JSONs'QuotRBra'{}())"
+    assert kore_json({'a': None}) == (
+        'LblJSONObject{}(LblJSONs{}(LblJSONEntry{}(inj{SortString{}, SortJSONKey{}}(\\dv{SortString{}}("a")), '
+        "LblJSONnull{}()), Lbl'Stop'List'LBraQuot'JSONs'QuotRBra'{}()))"
+    )
+
+
+@pytest.mark.parametrize('sort_keys', [False, True])
+def test_kore_json_round_trip(sort_keys: bool) -> None:
+    value = {
+        'stages': [
+            {'stage-type': 'setup-network', 'data': {'accounts': [{'address': 'A"\n', 'amount': 10**20}]}},
+            {'stage-type': 'submit-transactions', 'data': {'transactions': []}, 'expected-returncode': 0},
+        ],
+        'flags': [True, False, None, ''],
+    }
+
+    decoded = kore_to_json(parse_kore(kore_json(value, sort_keys=sort_keys)))
+
+    assert decoded == value
+    assert list(decoded) == (sorted(value) if sort_keys else list(value))
+
+
+@pytest.mark.parametrize('value', [1.5, {1: 'a'}, b'bytes'])
+def test_kore_json_unsupported(value: Any) -> None:
+    with pytest.raises(TypeError):
+        kore_json([value])
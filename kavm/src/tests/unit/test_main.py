@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import pytest
+
+from kavm.__main__ import exec_kcfg_prove, spec_modules
+
+
+def test_spec_modules() -> None:
+    spec_files = [Path('sum-spec.k'), Path('specs/call-spec.md')]
+
+    assert spec_modules(spec_files) == [(spec_files[0], 'SUM-SPEC'), (spec_files[1], 'CALL-SPEC')]
+    assert spec_modules(spec_files[:1], 'VERIFICATION') == [(spec_files[0], 'VERIFICATION')]
+
+
+def test_spec_module_of_several_spec_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+    specs_dir = tmp_path / 'specs'
+    specs_dir.mkdir()
+    for name in ('sum-spec.k', 'call-spec.k'):
+        (specs_dir / name).write_text('')
+
+    with pytest.raises(ValueError, match='single spec file'):
+        exec_kcfg_prove(
+            definition_dir=tmp_path / 'kompiled',
+            spec_files=[specs_dir],
+            claim_ids=['x'],
+            kore_rpc_port=3000,
+            spec_module='VERIFICATION',
+        )
+    assert not (tmp_path / '.kavm').exists()
@@ -0,0 +1,39 @@
+import threading
+import time
+from typing import List
+
+from kavm.parallel_prover import ProofLock
+
+
+def test_proof_lock_is_released_during_requests() -> None:
+    proof_lock = ProofLock()
+    inside: List[int] = []
+    max_inside: List[int] = []
+    inside_lock = threading.Lock()
+
+    def advance_node() -> None:
+        with proof_lock.locked():
+            with proof_lock.unlocked():
+                with inside_lock:
+                    inside.append(1)
+                    max_inside.append(len(inside))
+                time.sleep(0.1)
+                with inside_lock:
+                    inside.pop()
+
+    threads = [threading.Thread(target=advance_node) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(max_inside) > 1
+
+
+def test_proof_lock_unlocked_without_holding() -> None:
+    proof_lock = ProofLock()
+
+    with proof_lock.unlocked():
+        pass
+    with proof_lock.locked():
+        pass
@@ -0,0 +1,79 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pytest
+from pyk.kast.inner import KApply, KVariable
+from pyk.kast.outer import KClaim
+
+from kavm.proof_cache import ProofCache, spec_digest
+
+
+@pytest.fixture
+def definition_dir(tmp_path: Path) -> Path:
+    definition_dir = tmp_path / 'kompiled'
+    definition_dir.mkdir()
+    (definition_dir / 'compiled.json').write_text('{"definition": 1}')
+    return definition_dir
+
+
+def claim(body: str, atts: Optional[Dict[str, Any]] = None) -> KClaim:
+    claim_dict = KClaim(body=KApply('<k>', [KVariable(body)])).to_dict()
+    claim_dict['att'] = {'node': 'KAtt', 'att': atts if atts else {}}
+    return KClaim.from_dict(claim_dict)
+
+
+def test_record_proved(tmp_path: Path, definition_dir: Path) -> None:
+    cache = ProofCache(tmp_path / 'proof-cache')
+    key = cache.key(claim('X'), definition_dir, {'depth': None})
+
+    assert not cache.is_proved(key)
+    cache.record_proved(key, 'SPEC.x')
+    assert cache.is_proved(key)
+    assert not cache.is_proved(cache.key(claim('Y'), definition_dir, {'depth': None}))
+    assert not cache.is_proved(cache.key(claim('X'), definition_dir, {'depth': 10}))
+
+
+def test_key_ignores_claim_location(tmp_path: Path, definition_dir: Path) -> None:
+    cache = ProofCache(tmp_path / 'proof-cache')
+    atts = {
+        'label': 'SPEC.x',
+        'UNIQUE_ID': '1234',
+        'org.kframework.attributes.Source': '/specs/spec.k',
+        'org.kframework.attributes.Location': [1, 1, 2, 1],
+    }
+
+    assert cache.key(claim('X', atts), definition_dir) == cache.key(claim('X'), definition_dir)
+
+
+@pytest.mark.parametrize('atts', [{'trusted': ''}, {'one-path': ''}, {'all-path': ''}, {'depends': 'SPEC.y'}])
+def test_key_changes_with_claim_attributes(tmp_path: Path, definition_dir: Path, atts: Dict[str, Any]) -> None:
+    cache = ProofCache(tmp_path / 'proof-cache')
+
+    assert cache.key(claim('X', atts), definition_dir) != cache.key(claim('X'), definition_dir)
+
+
+def test_key_changes_with_spec(tmp_path: Path, definition_dir: Path) -> None:
+    cache = ProofCache(tmp_path / 'proof-cache')
+    spec_file = tmp_path / 'spec.k'
+    lemmas_file = tmp_path / 'lemmas.k'
+    spec_file.write_text('requires "lemmas.k"\nmodule SPEC\nendmodule\n')
+    lemmas_file.write_text('module LEMMAS\nendmodule\n')
+    key = cache.key(claim('X'), definition_dir, spec=spec_digest(spec_file))
+
+    assert cache.key(claim('X'), definition_dir, spec=spec_digest(spec_file)) == key
+    assert cache.key(claim('X'), definition_dir, spec=spec_digest(spec_file, 'SPEC')) != key
+    lemmas_file.write_text('module LEMMAS\n  rule X +Int 0 => X [simplification]\nendmodule\n')
+    assert cache.key(claim('X'), definition_dir, spec=spec_digest(spec_file)) != key
+
+
+def test_key_changes_with_definition(tmp_path: Path, definition_dir: Path) -> None:
+    cache = ProofCache(tmp_path / 'proof-cache')
+    key = cache.key(claim('X'), definition_dir)
+
+    compiled_json = definition_dir / 'compiled.json'
+    compiled_json.write_text('{"definition": 2}')
+    stat = compiled_json.stat()
+    os.utime(compiled_json, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cache.key(claim('X'), definition_dir) != key
@@ -1,11 +1,23 @@
 from typing import Any
 
 import pytest
+from algosdk.box_reference import BoxReference
 from pyk.kast.inner import KApply, KInner, KSort, KToken
+from pyk.prelude.bytes import bytesToken
 from pyk.prelude.kint import intToken
 from pyk.prelude.string import stringToken
 
-from kavm.pyk_utils import maybe_tvalue, split_direct_subcells_from
+from kavm.pyk_utils import (
+    TVALUE_NE_LIST,
+    TVALUE_PAIR,
+    TVALUE_PAIR_NE_LIST,
+    box_references_list,
+    generate_tvalue_list,
+    maybe_tvalue,
+    split_direct_subcells_from,
+    tvalue_bytes_list,
+    tvalue_pair_list,
+)
 
 
 @pytest.mark.parametrize(
@@ -64,3 +76,32 @@ def test_maybe_tvalue(input: Any, expected: Any) -> None:
 def test_split_direct_subcells_from(input: KInner, expected: KInner) -> None:
     (_, subst) = split_direct_subcells_from(input)
     assert set(subst.keys()) == expected
+
+
+def test_generate_tvalue_list() -> None:
+    assert generate_tvalue_list([intToken(1)]) == intToken(1)
+    assert generate_tvalue_list([intToken(1), intToken(2), intToken(3)]) == KApply(
+        TVALUE_NE_LIST, [intToken(1), KApply(TVALUE_NE_LIST, [intToken(2), intToken(3)])]
+    )
+    # long lists are built without recursion
+    tvlist = generate_tvalue_list([intToken(i) for i in range(10_000)])
+    for i in range(9_999):
+        assert tvlist.args[0] == intToken(i)  # type: ignore
+        tvlist = tvlist.args[1]  # type: ignore
+    assert tvlist == intToken(9_999)
+
+
+def test_tvalue_bytes_list() -> None:
+    assert tvalue_bytes_list([]) == KApply('.TValueList')
+    assert tvalue_bytes_list([b'\x00a', b'"\'\\']) == KApply(
+        TVALUE_NE_LIST, [bytesToken(b'\x00a'), bytesToken(b'"\'\\')]
+    )
+
+
+def test_tvalue_pair_list() -> None:
+    assert tvalue_pair_list([]) == KApply('.TValuePairList')
+    assert tvalue_pair_list([(intToken(1), intToken(2)), (intToken(3), intToken(4))]) == KApply(
+        TVALUE_PAIR_NE_LIST,
+        [KApply(TVALUE_PAIR, [intToken(1), intToken(2)]), KApply(TVALUE_PAIR, [intToken(3), intToken(4)])],
+    )
+    assert box_references_list([BoxReference(0, b'box')]) == KApply(TVALUE_PAIR, [bytesToken(b'box'), intToken(0)])
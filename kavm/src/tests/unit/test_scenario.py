@@ -0,0 +1,70 @@
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+from kavm.scenario import KAVMScenario
+
+ALICE = 'LVMR75YJKH4ATBQ6UFI6IUM2FMU7NNLDQRBKIMG6Q2QAAAXWLIIKWMZRPE'
+BOB = 'VCMJKWOY5P5P7SKMZFFOCEROPJCZOTIJMNIYNUCKH7LRO45JMJP6UYBIJA'
+
+
+def submit_stage(amount: int) -> Dict[str, Any]:
+    return {
+        'stage-type': 'submit-transactions',
+        'data': {'transactions': [{'type': 'pay', 'snd': ALICE, 'rcv': BOB, 'amt': amount}]},
+        'expected-returncode': 0,
+    }
+
+
+def scenario_json(stages: List[Dict[str, Any]]) -> str:
+    setup_stage = {
+        'stage-type': 'setup-network',
+        'data': {'accounts': [{'address': ALICE, 'amount': 1500000, 'created-apps': [], 'created-assets': []}]},
+    }
+    return json.dumps({'stages': [setup_stage] + stages})
+
+
+def amounts(scenario: KAVMScenario) -> List[int]:
+    return [stage['data']['transactions'][0]['amt'] for stage in scenario.execution_stages]
+
+
+def test_from_json_multiple_stages() -> None:
+    scenario = KAVMScenario.from_json(scenario_json([submit_stage(amount) for amount in range(5)]))
+
+    assert amounts(scenario) == [0, 1, 2, 3, 4]
+    assert all(stage['data']['transactions'][0]['fee'] == 1000 for stage in scenario.execution_stages)
+
+
+def test_from_json_rejects_repeated_setup_stage() -> None:
+    setup_stage = json.loads(scenario_json([]))['stages'][0]
+    with pytest.raises(ValueError):
+        KAVMScenario.from_json(scenario_json([submit_stage(1), setup_stage]))
+
+
+@pytest.mark.parametrize(
+    'checkpoints,expected',
+    [
+        ([], [[0, 1, 2, 3, 4]]),
+        ([2], [[0, 1], [2, 3, 4]]),
+        ([1, 2, 3, 4, 5], [[0], [1], [2], [3], [4]]),
+        ([4, 0, 7, 2, 2], [[0, 1], [2, 3], [4]]),
+    ],
+)
+def test_split(checkpoints: List[int], expected: List[List[int]]) -> None:
+    scenario = KAVMScenario.from_json(scenario_json([submit_stage(amount) for amount in range(5)]))
+
+    segments = scenario.split(checkpoints)
+
+    assert [amounts(segment) for segment in segments] == expected
+    assert segments[0]._stages[0] == scenario._stages[0]
+    assert all(segment._stages[0]['data']['accounts'] == [] for segment in segments[1:])
+
+
+def test_after_stage() -> None:
+    scenario = KAVMScenario.from_json(scenario_json([submit_stage(amount) for amount in range(5)]))
+
+    resumed = scenario.after_stage(3)
+
+    assert amounts(resumed) == [3, 4]
+    assert resumed._stages[0]['data']['accounts'] == []
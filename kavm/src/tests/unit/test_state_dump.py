@@ -0,0 +1,67 @@
+import io
+import json
+from typing import Any, Callable, List, Tuple
+
+import pytest
+from algosdk.error import AlgodHTTPError
+from algosdk.future.transaction import PaymentTxn, SuggestedParams
+
+from kavm.algod import iter_state_dump_items, iter_state_dumps
+
+ACCOUNT_1 = {'address': 'A', 'amount': 1, 'created-apps': [{'id': 1, 'params': {'global-state': [{'key': 'eA=='}]}}]}
+ACCOUNT_2 = {'address': 'B', 'amount': 2}
+TXN = {'id': '0', 'params': {'logs': ['a,b]}', '"']}}
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 4, 7, 1 << 16])
+@pytest.mark.parametrize(
+    'dump,expected',
+    [
+        ('', []),
+        ('{}', []),
+        (
+            json.dumps({'accounts': [ACCOUNT_1, ACCOUNT_2], 'transactions': [TXN]}),
+            [(0, 'accounts', ACCOUNT_1), (0, 'accounts', ACCOUNT_2), (0, 'transactions', TXN)],
+        ),
+        (
+            json.dumps({'accounts': [], 'transactions': [TXN]}, indent=2)
+            + '\n'
+            + json.dumps({'accounts': [ACCOUNT_2], 'transactions': []}),
+            [(0, 'transactions', TXN), (1, 'accounts', ACCOUNT_2)],
+        ),
+        ('{"round": 5}', [(0, 'round', 5)]),
+        # numbers and literals split between chunks
+        (
+            '{"round": 12345, "x": [1234, 56, true]}',
+            [(0, 'round', 12345), (0, 'x', 1234), (0, 'x', 56), (0, 'x', True)],
+        ),
+    ],
+)
+def test_iter_state_dump_items(dump: str, expected: List[Tuple[int, str, Any]], chunk_size: int) -> None:
+    assert list(iter_state_dump_items(io.StringIO(dump), chunk_size=chunk_size)) == expected
+
+
+@pytest.mark.parametrize('dump', ['{"accounts": [1 2]}', '{"accounts": [{"address": "A"}', '[]'])
+def test_iter_state_dump_items_invalid(dump: str) -> None:
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_state_dump_items(io.StringIO(dump), chunk_size=4))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1 << 16])
+def test_iter_state_dumps(chunk_size: int) -> None:
+    dumps = [{'accounts': [ACCOUNT_1], 'transactions': [TXN]}, {'accounts': [ACCOUNT_2], 'transactions': []}]
+    text = json.dumps(dumps[0]) + '\n' + json.dumps(dumps[1])
+
+    assert list(iter_state_dumps(io.StringIO(text), chunk_size=chunk_size)) == dumps
+    assert list(iter_state_dumps(io.StringIO(''), chunk_size=chunk_size)) == []
+
+
+def test_missing_state_dump(make_kalgod: Callable[..., Any], suggested_params: SuggestedParams) -> None:
+    client = make_kalgod()
+    client.kavm.dump_state = False
+    accounts = dict(client._accounts)
+    txn = PaymentTxn(client._faucet_address, suggested_params, client._faucet_address, 1)
+
+    with pytest.raises(AlgodHTTPError):
+        client._eval_transactions([txn])
+    assert client._accounts == accounts
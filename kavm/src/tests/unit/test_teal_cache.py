@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from kavm.teal_cache import TealProgramCache
+
+PARSED_PGM = 'inj{SortInt{}, SortTealInputPgm{}}(\\dv{SortInt{}}("1"))'
+
+
+def fake_parser(tmp_path: Path) -> Path:
+    '''A stand-in for the Bison parser that records each of its invocations'''
+    parser = tmp_path / 'parser'
+    parser.write_text(f"#!/bin/sh\necho \"$1\" >> {tmp_path / 'calls'}\necho '{PARSED_PGM}'\n")
+    parser.chmod(0o755)
+    return parser
+
+
+def parser_calls(tmp_path: Path) -> int:
+    calls = tmp_path / 'calls'
+    return len(calls.read_text().splitlines()) if calls.exists() else 0
+
+
+def test_teal_cache_memory(tmp_path: Path) -> None:
+    cache = TealProgramCache(fake_parser(tmp_path))
+    pgm = tmp_path / 'pgm.teal'
+    pgm.write_text('int 1\n')
+    same_pgm = tmp_path / 'same.teal'
+    same_pgm.write_text('int 1\n')
+
+    first = cache.parse(pgm)
+    second = cache.parse(same_pgm)
+
+    assert first == second
+    assert first.text == PARSED_PGM
+    assert parser_calls(tmp_path) == 1
+
+
+def test_teal_cache_disk(tmp_path: Path) -> None:
+    parser = fake_parser(tmp_path)
+    cache_dir = tmp_path / 'teal-cache'
+    pgm = tmp_path / 'pgm.teal'
+    pgm.write_text('int 1\n')
+
+    TealProgramCache(parser, cache_dir).parse(pgm)
+    parsed = TealProgramCache(parser, cache_dir).parse(pgm)
+
+    assert parsed.text == PARSED_PGM
+    assert parser_calls(tmp_path) == 1
+
+
+def test_teal_cache_lru(tmp_path: Path) -> None:
+    cache = TealProgramCache(fake_parser(tmp_path), capacity=1)
+    pgm_1 = tmp_path / 'pgm_1.teal'
+    pgm_1.write_text('int 1\n')
+    pgm_2 = tmp_path / 'pgm_2.teal'
+    pgm_2.write_text('int 2\n')
+
+    cache.parse(pgm_1)
+    cache.parse(pgm_2)
+    cache.parse(pgm_1)
+
+    assert parser_calls(tmp_path) == 3
@@ -0,0 +1,52 @@
+from pathlib import Path
+from typing import List
+
+from pyk.kast.inner import KApply, KInner, KSort, KVariable
+from pyk.prelude.kint import intToken
+
+from kavm.kast.templates import cell_template, empty_config
+
+
+class CountingDefinition:
+    def __init__(self) -> None:
+        self.calls: List[str] = []
+
+    def init_config(self, sort: KSort) -> KInner:
+        self.calls.append('init_config')
+        return KApply('<account>', [KApply('<balance>', [intToken(0)])])
+
+    def empty_config(self, sort: KSort) -> KInner:
+        self.calls.append('empty_config')
+        return KApply('<account>', [KApply('<balance>', [KVariable('BALANCE_CELL')])])
+
+
+class FakeKAVM:
+    def __init__(self, definition_dir: Path) -> None:
+        self.definition_dir = definition_dir
+        self.definition = CountingDefinition()
+
+
+def test_cell_template_is_computed_once(tmp_path: Path) -> None:
+    kavm = FakeKAVM(tmp_path)
+
+    config, subst = cell_template(kavm, KSort('AccountCellMap'))
+    subst['BALANCE_CELL'] = intToken(42)
+    same_config, same_subst = cell_template(kavm, KSort('AccountCellMap'))
+
+    assert kavm.definition.calls == ['init_config']
+    assert same_config is config
+    assert config == KApply('<account>', [KApply('<balance>', [KVariable('BALANCE_CELL')])])
+    assert same_subst == {'BALANCE_CELL': intToken(0)}
+
+
+def test_templates_are_cached_per_definition_and_sort(tmp_path: Path) -> None:
+    kavm = FakeKAVM(tmp_path / 'a')
+    other_kavm = FakeKAVM(tmp_path / 'b')
+
+    for _ in range(3):
+        empty_config(kavm, KSort('TxHeaderCell'))
+        empty_config(kavm, KSort('ApplyDataCell'))
+        empty_config(other_kavm, KSort('TxHeaderCell'))
+
+    assert kavm.definition.calls == ['empty_config', 'empty_config']
+    assert other_kavm.definition.calls == ['empty_config']